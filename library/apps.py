@@ -1,6 +1,35 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search_support(sender, using, **kwargs):
+    from django.db import connections
+    from .search import install_search_support
+
+    connection = connections[using]
+    # SQLite rebuilds library_book on most schema changes, which drops the FTS triggers
+    if connection.vendor == 'sqlite':
+        install_search_support(connection)
+
+
+def install_loan_counters(sender, using, **kwargs):
+    from django.db import connections
+    from .loan_counters import has_loan_counters, install_loan_counters
+
+    connection = connections[using]
+    # Same for library_loan and the active loan counter triggers, unless migrated back past them
+    if connection.vendor == 'sqlite' and has_loan_counters(connection):
+        install_loan_counters(connection)
 
 
 class LibraryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'library'
+
+    def ready(self):
+        from .utils.metrics import install_query_wrapper
+
+        post_migrate.connect(install_search_support, sender=self)
+        post_migrate.connect(install_loan_counters, sender=self)
+        connection_created.connect(install_query_wrapper)
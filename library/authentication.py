@@ -0,0 +1,140 @@
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# User fields carried in the token; together with the id they cover UserSerializer and the permissions
+USER_CLAIMS = ('username', 'email', 'phone_number', 'role', 'is_active', 'account_status')
+# The user's claims_version when the token was issued; any change to the claimed fields bumps it
+CLAIMS_VERSION = 'claims_version'
+
+
+class ClaimsRefreshToken(RefreshToken):
+    # Access tokens derived from this refresh token copy its claims
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[CLAIMS_VERSION] = user.claims_version
+        claims_versions.remember(user.id, user.claims_version)
+        return token
+
+
+class ClaimsVersions:
+    # Memoizes each user's claims_version column for AUTH_CLAIMS_CACHE_TTL seconds, so most
+    # requests skip the lookup. Changes made in this process are seen at once, others within the TTL.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memo = {}
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AUTH_CLAIMS_CACHE_TTL', 5)
+
+    def cached(self, user_id):
+        # (True, version) while the memo is fresh, (False, None) when it has to be loaded
+        now = time.monotonic()
+        with self._lock:
+            memo = self._memo.get(user_id)
+        if memo is not None and now - memo[1] < self.ttl:
+            return True, memo[0]
+        return False, None
+
+    def load(self, user_id):
+        # None once the user is gone
+        version = get_user_model()._default_manager.filter(pk=user_id).values_list(CLAIMS_VERSION, flat=True).first()
+        self.remember(user_id, version)
+        return version
+
+    def get(self, user_id):
+        found, version = self.cached(user_id)
+        return version if found else self.load(user_id)
+
+    def remember(self, user_id, version):
+        with self._lock:
+            self._memo[user_id] = (version, time.monotonic())
+
+    def forget(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._memo.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+
+claims_versions = ClaimsVersions()
+
+
+def forget_user_claims(*user_ids):
+    # Call after bumping claims_version (see UserRepository.update_claims); without ids, forgets everyone
+    if user_ids:
+        claims_versions.forget(*user_ids)
+    else:
+        claims_versions.clear()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    # Builds request.user from the token instead of loading the row on every request. Tokens
+    # without claims, or issued before the user last changed, fall back to the database.
+    def get_user(self, validated_token):
+        claims = self.read_claims(validated_token)
+        user = None
+        if claims is not None:
+            user = self.get_claims_user(claims, claims_versions.get(claims['user_id']))
+        if user is None:
+            return super().get_user(validated_token)
+        return user
+
+    def read_claims(self, validated_token):
+        # None for tokens issued without claims
+        try:
+            claims = {claim: validated_token[claim] for claim in USER_CLAIMS}
+            claims['user_id'] = self.user_model._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+            claims[CLAIMS_VERSION] = int(validated_token[CLAIMS_VERSION])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return claims
+
+    def get_claims_user(self, claims, current_version):
+        # None when the claims are out of date and the row has to be loaded
+        if claims[CLAIMS_VERSION] != current_version:
+            return None
+        user_id = claims.pop('user_id')
+
+        # from_db expects values in model field order; other fields stay deferred and load on first access
+        claims[self.user_model._meta.pk.attname] = user_id
+        field_names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in claims]
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, field_names, [claims[name] for name in field_names])
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        # Async counterpart of authenticate(); only a database fallback leaves the event loop
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        claims = self.read_claims(validated_token)
+        user = None
+        if claims is not None:
+            found, version = claims_versions.cached(claims['user_id'])
+            if not found:
+                version = await sync_to_async(claims_versions.load)(claims['user_id'])
+            user = self.get_claims_user(claims, version)
+        if user is None:
+            user = await sync_to_async(super().get_user)(validated_token)
+        return user, validated_token
@@ -1,14 +1,38 @@
 import django_filters
-from .models import Book, Loan
+from .models import Book, Loan, User
+from .search import DEFAULT_SIMILARITY, fuzzy_search_books, search_books
 
 class BookFilter(django_filters.FilterSet):
     title = django_filters.CharFilter(lookup_expr='icontains')
     author = django_filters.CharFilter(lookup_expr='icontains')
     availability = django_filters.BooleanFilter()
+    available_now = django_filters.BooleanFilter(method='filter_available_now')
+    search = django_filters.CharFilter(method='filter_search')
+    fuzzy = django_filters.CharFilter(method='filter_fuzzy')
+    similarity = django_filters.NumberFilter(method='filter_similarity', min_value=0, max_value=1)
 
     class Meta:
         model = Book
-        fields = ['title', 'author', 'availability']
+        fields = ['title', 'author', 'availability', 'available_now', 'search', 'fuzzy', 'similarity']
+
+    def filter_available_now(self, queryset, name, value):
+        # available_copies > 0 matches the partial index on Book
+        if value:
+            return queryset.filter(available_copies__gt=0)
+        return queryset.filter(available_copies=0)
+
+    def filter_search(self, queryset, name, value):
+        return search_books(queryset, value)
+
+    def filter_fuzzy(self, queryset, name, value):
+        threshold = self.form.cleaned_data.get('similarity')
+        if threshold is None:
+            threshold = DEFAULT_SIMILARITY
+        return fuzzy_search_books(queryset, value, float(threshold))
+
+    def filter_similarity(self, queryset, name, value):
+        # Only a threshold for ?fuzzy=, applied in filter_fuzzy
+        return queryset
         
 
 class LoanFilter(django_filters.FilterSet):
@@ -18,12 +42,41 @@ class LoanFilter(django_filters.FilterSet):
     borrowed_date_before = django_filters.DateTimeFilter(field_name='borrowed_date', lookup_expr='lte')
     returned_date = django_filters.DateFromToRangeFilter(field_name='returned_date')
     is_active = django_filters.BooleanFilter(method='filter_active_loans')
+    # Read by LoanListView: list archived loans too, without a date filter reaching back to them
+    include_archived = django_filters.BooleanFilter(method='filter_include_archived')
 
     class Meta:
         model = Loan
-        fields = ['user', 'book', 'borrowed_date_after', 'borrowed_date_before', 'returned_date', 'is_active'] 
+        fields = ['user', 'book', 'borrowed_date_after', 'borrowed_date_before', 'returned_date', 'is_active', 'include_archived'] 
     
     def filter_active_loans(self, queryset, name, value):
         if value:
             return queryset.filter(returned_date__isnull=True)
-        return queryset.filter(returned_date__isnull=False)           
\ No newline at end of file
+        return queryset.filter(returned_date__isnull=False)
+
+    def filter_include_archived(self, queryset, name, value):
+        return queryset
+
+class UserFilter(django_filters.FilterSet):
+    role = django_filters.ChoiceFilter(choices=User._meta.get_field('role').choices)
+    account_status = django_filters.ChoiceFilter(choices=User._meta.get_field('account_status').choices)
+    is_active = django_filters.BooleanFilter()
+    join_date = django_filters.DateFromToRangeFilter()
+    # Case-sensitive so PostgreSQL can use the varchar_pattern_ops index on username
+    username = django_filters.CharFilter(lookup_expr='startswith')
+
+    class Meta:
+        model = User
+        fields = ['role', 'account_status', 'is_active', 'join_date', 'username']
+
+
+def filter_param_names(filterset_class):
+    # Query parameter names a FilterSet reads, e.g. join_date_after/join_date_before for a range
+    names = set()
+    for name, field in filterset_class().form.fields.items():
+        suffixes = getattr(field.widget, 'suffixes', None)
+        if suffixes:
+            names.update(f'{name}_{suffix}' for suffix in suffixes)
+        else:
+            names.add(name)
+    return names
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+# Cost parameters come from settings and are read on every use. Each hasher keeps its stock
+# algorithm name, so existing hashes still verify and are re-encoded on the next login when
+# the parameters (or the preferred hasher) change.
+
+
+class ConfigurableArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class ConfigurableScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+    @property
+    def maxmem(self):
+        # OpenSSL refuses to go above 32 MiB unless told otherwise
+        return 256 * self.work_factor * self.block_size
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
+
+
+
+HASHERS = {
+    'argon2': ConfigurableArgon2PasswordHasher,
+    'scrypt': ConfigurableScryptPasswordHasher,
+    'pbkdf2': ConfigurablePBKDF2PasswordHasher,
+}
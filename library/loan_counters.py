@@ -0,0 +1,151 @@
+# Database triggers that keep User.active_loans and User.next_due_date in step with library_loan.
+# They run inside the statement that inserts, returns or deletes a loan, so the counters are
+# never out of date and maintaining them costs no extra round trip. Counts change by +/-1 rather
+# than being recounted, so concurrent loans of the same user cannot overwrite each other's change.
+
+POSTGRES_COUNTER_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION library_loan_user_counters() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' AND OLD.returned_date IS NULL
+                AND (TG_OP = 'DELETE' OR NEW.returned_date IS NOT NULL) THEN
+            UPDATE library_user SET
+                active_loans = active_loans - 1,
+                next_due_date = (
+                    SELECT min(due_date) FROM library_loan
+                    WHERE user_id = OLD.user_id AND returned_date IS NULL
+                )
+            WHERE id = OLD.user_id;
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.returned_date IS NULL
+                AND (TG_OP = 'INSERT' OR OLD.returned_date IS NOT NULL) THEN
+            UPDATE library_user SET
+                active_loans = active_loans + 1,
+                next_due_date = least(next_due_date, NEW.due_date)
+            WHERE id = NEW.user_id;
+        END IF;
+        IF TG_OP = 'UPDATE' AND OLD.returned_date IS NULL AND NEW.returned_date IS NULL
+                AND NEW.due_date IS DISTINCT FROM OLD.due_date THEN
+            UPDATE library_user SET next_due_date = (
+                SELECT min(due_date) FROM library_loan WHERE user_id = NEW.user_id AND returned_date IS NULL
+            )
+            WHERE id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS library_loan_user_counters_trigger ON library_loan",
+    """
+    CREATE TRIGGER library_loan_user_counters_trigger
+    AFTER INSERT OR DELETE OR UPDATE OF returned_date, due_date ON library_loan
+    FOR EACH ROW EXECUTE FUNCTION library_loan_user_counters()
+    """,
+]
+
+POSTGRES_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS library_loan_user_counters_trigger ON library_loan",
+    "DROP FUNCTION IF EXISTS library_loan_user_counters()",
+]
+
+SQLITE_LOAN_OUT = """
+    UPDATE library_user SET
+        active_loans = active_loans + 1,
+        next_due_date = CASE WHEN next_due_date IS NULL OR new.due_date < next_due_date
+                             THEN new.due_date ELSE next_due_date END
+    WHERE id = new.user_id;
+"""
+SQLITE_LOAN_BACK = """
+    UPDATE library_user SET
+        active_loans = active_loans - 1,
+        next_due_date = (
+            SELECT min(due_date) FROM library_loan WHERE user_id = old.user_id AND returned_date IS NULL
+        )
+    WHERE id = old.user_id;
+"""
+SQLITE_COUNTER_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_loan_counters_insert AFTER INSERT ON library_loan
+    WHEN new.returned_date IS NULL BEGIN {SQLITE_LOAN_OUT} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_loan_counters_return AFTER UPDATE OF returned_date ON library_loan
+    WHEN old.returned_date IS NULL AND new.returned_date IS NOT NULL BEGIN {SQLITE_LOAN_BACK} END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_loan_counters_reopen AFTER UPDATE OF returned_date ON library_loan
+    WHEN old.returned_date IS NOT NULL AND new.returned_date IS NULL BEGIN {SQLITE_LOAN_OUT} END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS library_loan_counters_due AFTER UPDATE OF due_date ON library_loan
+    WHEN old.returned_date IS NULL AND new.returned_date IS NULL BEGIN
+        UPDATE library_user SET next_due_date = (
+            SELECT min(due_date) FROM library_loan WHERE user_id = new.user_id AND returned_date IS NULL
+        )
+        WHERE id = new.user_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS library_loan_counters_delete AFTER DELETE ON library_loan
+    WHEN old.returned_date IS NULL BEGIN {SQLITE_LOAN_BACK} END
+    """,
+]
+
+SQLITE_TRIGGERS = ('insert', 'return', 'reopen', 'due', 'delete')
+
+# Recounts every user, for the migration that adds the counters
+RECOUNT_SQL = """
+    UPDATE library_user SET
+        active_loans = (
+            SELECT count(*) FROM library_loan
+            WHERE library_loan.user_id = library_user.id AND returned_date IS NULL
+        ),
+        next_due_date = (
+            SELECT min(due_date) FROM library_loan
+            WHERE library_loan.user_id = library_user.id AND returned_date IS NULL
+        )
+"""
+
+
+def install_loan_counters(connection):
+    # Idempotent: also re-run after every migrate on SQLite, where table rebuilds drop the triggers
+    statements = {
+        'postgresql': POSTGRES_COUNTER_SQL,
+        'sqlite': SQLITE_COUNTER_SQL,
+    }.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def recount_loan_counters(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(RECOUNT_SQL)
+
+
+def drop_sqlite_loan_counters(connection):
+    # SQLite refuses to rebuild library_user while triggers on library_loan refer to it; migrations
+    # that alter the user table drop them first, and post_migrate puts them back
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in SQLITE_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS library_loan_counters_{name}")
+
+
+def drop_loan_counters(connection):
+    # Reverse of install_loan_counters, for unapplying the migration that adds the counter columns
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            for statement in POSTGRES_DROP_SQL:
+                cursor.execute(statement)
+    drop_sqlite_loan_counters(connection)
+
+
+def has_loan_counters(connection):
+    # False before the counter columns are migrated in, or after they are migrated out again
+    with connection.cursor() as cursor:
+        if 'library_user' not in connection.introspection.table_names(cursor):
+            return False
+        columns = connection.introspection.get_table_description(cursor, 'library_user')
+    return any(column.name == 'active_loans' for column in columns)
@@ -0,0 +1,57 @@
+import gzip
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from library.services.loan_service import ARCHIVE_BATCH_SIZE, EXPORT_COLUMNS, LoanService
+from library.utils.export import EXPORT_FORMATS, stream_export
+
+ARCHIVE_TARGETS = ('table', *EXPORT_FORMATS)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move loans returned more than N months ago out of library_loan, into the archive table "
+        "(still listed by the loan API) or into a gzipped CSV/NDJSON file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=settings.LOAN_ARCHIVE_AFTER_MONTHS)
+        parser.add_argument('--to', choices=ARCHIVE_TARGETS, default='table', dest='target')
+        parser.add_argument('--output-dir', default='.', help="Where archive files are written")
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, months, target, output_dir, batch_size, **options):
+        if months < 1 or batch_size < 1:
+            raise CommandError("--months and --batch-size must be positive.")
+        # Months are counted as 30 days; the cut-off only needs to be roughly N months back
+        before = timezone.now() - timedelta(days=30 * months)
+
+        if target == 'table':
+            archived = LoanService.archive_returned_loans(before, batch_size=batch_size)
+            self.stdout.write(f"Archived {archived} loans returned before {before:%Y-%m-%d}.")
+            return
+
+        path = os.path.join(output_dir, f"loans-before-{before:%Y%m%d}-{timezone.now():%Y%m%d%H%M%S}.{target}.gz")
+        try:
+            with gzip.open(path, 'wt', encoding='utf-8', newline='') as archive_file:
+                header_written = False
+
+                def export(loans):
+                    nonlocal header_written
+                    lines = stream_export(loans, EXPORT_COLUMNS, target)
+                    if target == 'csv' and header_written:
+                        next(lines)  # One header per file
+                    header_written = True
+                    archive_file.writelines(lines)
+
+                archived = LoanService.archive_returned_loans(before, batch_size=batch_size, export=export)
+        except OSError as e:
+            raise CommandError(f"Cannot write {path}: {e}")
+        if not archived:
+            os.remove(path)
+            self.stdout.write(f"No loans returned before {before:%Y-%m-%d}.")
+            return
+        self.stdout.write(f"Archived {archived} loans returned before {before:%Y-%m-%d} to {path}.")
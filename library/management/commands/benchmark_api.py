@@ -0,0 +1,181 @@
+import json
+import random
+import re
+import time
+from pathlib import Path
+from statistics import mean
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from library.authentication import ClaimsRefreshToken
+from library.models import Book, Loan, User
+from library.policies import may_borrow
+from library.utils.metrics import percentile
+from library.utils.response_cache import bump_catalogue_version
+from .seed_library import SEED_ADMIN_USERNAME, SEED_PASSWORD, WORDS, seeded_users
+
+SCENARIOS = ('browse', 'search', 'admin_loans', 'login', 'borrow_return')
+# Set by RequestMetricsMiddleware
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the API benchmark scenarios in-process against seeded data (see seed_library) and write "
+        "p50/p95/p99 latency and queries per request as JSON. Writes are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, dest='scenarios')
+        parser.add_argument('--iterations', type=int, default=200, help="Measured requests per scenario")
+        parser.add_argument('--warmup', type=int, default=10, help="Unmeasured requests per scenario")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the request mix")
+        parser.add_argument('--password', default=SEED_PASSWORD, help="Password the users were seeded with")
+        parser.add_argument('--cold-cache', action='store_true', help="Invalidate the catalogue cache before each request")
+        parser.add_argument('--host', default='localhost', help="Host header; must be in ALLOWED_HOSTS")
+        parser.add_argument('--label', default='', help="Free-form label stored with the results, e.g. a commit")
+        parser.add_argument('--output', help="Results file (default: benchmark-results/api-<timestamp>.json)")
+        parser.add_argument('--compare', help="Earlier results file to print p95 changes against")
+
+    def handle(self, *args, scenarios, iterations, warmup, seed, password, cold_cache, host, label, output,
+               compare, **options):
+        if iterations < 1 or warmup < 0:
+            raise CommandError("--iterations must be positive and --warmup not negative.")
+        self.admin = seeded_users().filter(username=SEED_ADMIN_USERNAME).first()
+        # Only users the borrowing policy lets borrow, so borrow/return measures successful requests
+        self.user_ids = list(
+            seeded_users().filter(may_borrow()).exclude(username=SEED_ADMIN_USERNAME).values_list('id', flat=True)
+        )
+        if self.admin is None or not self.user_ids:
+            raise CommandError("No seeded data; run `manage.py seed_library` first.")
+
+        self.client = Client(HTTP_HOST=host)
+        self.rng = random.Random(seed)
+        self.password = password
+        self.cold_cache = cold_cache
+        self.book_count = Book.objects.count()
+        self.loan_count = Loan.objects.count()
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        self.book_pages = max(1, -(-self.book_count // page_size))
+        self.loan_pages = max(1, -(-self.loan_count // page_size))
+
+        results = {
+            'label': label,
+            'started_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'password_hasher': settings.PASSWORD_HASHERS[0],
+            'dataset': {
+                'users': User.objects.count(),
+                'books': self.book_count,
+                'loans': self.loan_count,
+                'active_loans': Loan.objects.filter(returned_date__isnull=True).count(),
+            },
+            'iterations': iterations,
+            'warmup': warmup,
+            'scenarios': {},
+        }
+        try:
+            with transaction.atomic():
+                for scenario in scenarios or SCENARIOS:
+                    samples = {}
+                    run = getattr(self, f'run_{scenario}')
+                    for _ in range(warmup):
+                        run({})
+                    for _ in range(iterations):
+                        run(samples)
+                    for name, measured in samples.items():
+                        results['scenarios'][name] = self.summarize(measured)
+                        self.report(name, results['scenarios'][name])
+                raise Rollback()
+        except Rollback:
+            pass
+
+        path = Path(output or f"benchmark-results/api-{timezone.now():%Y%m%d-%H%M%S}.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2) + '\n')
+        self.stdout.write(f"Results written to {path}")
+        if compare:
+            self.compare(results, json.loads(Path(compare).read_text()))
+
+    def request(self, samples, name, method, path, expected_status, token=None, **kwargs):
+        if self.cold_cache:
+            bump_catalogue_version()
+        if token:
+            kwargs['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        started = time.perf_counter()
+        response = getattr(self.client, method)(path, **kwargs)
+        elapsed = time.perf_counter() - started
+        match = QUERY_COUNT.search(response.get('Server-Timing', ''))
+        samples.setdefault(name, []).append((
+            elapsed, int(match.group(1)) if match else None, response.status_code != expected_status,
+        ))
+        return response
+
+    def token_for(self, user):
+        return str(ClaimsRefreshToken.for_user(user).access_token)
+
+    def run_browse(self, samples):
+        page = self.rng.randint(1, self.book_pages)
+        self.request(samples, 'browse', 'get', reverse('book-list-create'), 200, data={'page': page})
+
+    def run_search(self, samples):
+        self.request(samples, 'search', 'get', reverse('book-list-create'), 200, data={'search': self.rng.choice(WORDS)})
+
+    def run_admin_loans(self, samples):
+        page = self.rng.randint(1, self.loan_pages)
+        self.request(samples, 'admin_loans', 'get', reverse('loan-list'), 200, token=self.token_for(self.admin),
+                     data={'page': page})
+
+    def run_login(self, samples):
+        user = User.objects.only('username').get(id=self.rng.choice(self.user_ids))
+        self.request(samples, 'login', 'post', reverse('login'), 200, content_type='application/json',
+                     data={'username': user.username, 'password': self.password})
+
+    def run_borrow_return(self, samples):
+        user = User.objects.get(id=self.rng.choice(self.user_ids))
+        book_id = Book.objects.filter(available_copies__gt=0).order_by('?').values_list('id', flat=True).first()
+        if book_id is None:
+            raise CommandError("Every copy is on loan; seed more books.")
+        token = self.token_for(user)
+        self.request(samples, 'borrow', 'post', reverse('borrow-book', args=[book_id]), 201, token=token)
+        self.request(samples, 'return', 'post', reverse('return-book', args=[book_id]), 200, token=token)
+
+    def summarize(self, measured):
+        latencies = sorted(elapsed * 1000 for elapsed, _, _ in measured)
+        queries = [count for _, count, _ in measured if count is not None]
+        return {
+            'requests': len(measured),
+            'errors': sum(1 for _, _, failed in measured if failed),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(mean(latencies), 3),
+            'queries_per_request': round(mean(queries), 2) if queries else None,
+            'max_queries': max(queries) if queries else None,
+        }
+
+    def report(self, name, summary):
+        self.stdout.write(
+            f"{name:<12} p50 {summary['p50_ms']:>8.1f} ms  p95 {summary['p95_ms']:>8.1f} ms  "
+            f"p99 {summary['p99_ms']:>8.1f} ms  {summary['queries_per_request']} queries/req  "
+            f"{summary['errors']}/{summary['requests']} errors"
+        )
+
+    def compare(self, results, previous):
+        for name, summary in results['scenarios'].items():
+            before = previous.get('scenarios', {}).get(name)
+            if before is None:
+                continue
+            change = (summary['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+            self.stdout.write(
+                f"{name:<12} p95 {before['p95_ms']:.1f} -> {summary['p95_ms']:.1f} ms ({change:+.1f}%), "
+                f"queries/req {before['queries_per_request']} -> {summary['queries_per_request']}"
+            )
@@ -0,0 +1,82 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from library.hashers import HASHERS
+
+BENCHMARK_PASSWORD = 'correct horse battery staple'
+COST_SETTINGS = (
+    'ARGON2_TIME_COST', 'ARGON2_MEMORY_COST', 'ARGON2_PARALLELISM',
+    'SCRYPT_WORK_FACTOR', 'SCRYPT_BLOCK_SIZE', 'SCRYPT_PARALLELISM',
+    'PBKDF2_ITERATIONS',
+)
+
+
+def apply_overrides(overrides):
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def verify_logins(hasher_name, encoded, logins, overrides):
+    # Runs in a worker process: a login's CPU cost is one verification of the stored hash
+    apply_overrides(overrides)
+    hasher = HASHERS[hasher_name]()
+    started = time.perf_counter()
+    for _ in range(logins):
+        if not hasher.verify(BENCHMARK_PASSWORD, encoded):
+            raise RuntimeError(f"{hasher_name} failed to verify its own hash")
+    return time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Measure password verification throughput (logins/sec per core) for each hasher setting"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hasher', action='append', choices=sorted(HASHERS), dest='hashers')
+        parser.add_argument('--logins', type=int, default=20, help="Verifications per process")
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--set', action='append', default=[], dest='overrides', metavar='NAME=VALUE',
+            help=f"Override a cost setting for this run, one of {', '.join(COST_SETTINGS)}",
+        )
+
+    def handle(self, *args, hashers, logins, processes, overrides, **options):
+        if logins < 1 or processes < 1:
+            raise CommandError("--logins and --processes must be positive.")
+        overrides = self.parse_overrides(overrides)
+        apply_overrides(overrides)
+
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for name in hashers or sorted(HASHERS):
+                hasher = HASHERS[name]()
+                encoded = hasher.encode(BENCHMARK_PASSWORD, hasher.salt())
+                params = ', '.join(
+                    f'{key}={value}' for key, value in hasher.safe_summary(encoded).items()
+                    if key not in ('algorithm', 'salt', 'hash')
+                )
+
+                single = verify_logins(name, encoded, logins, overrides)
+                per_core = logins / single
+
+                started = time.perf_counter()
+                list(pool.map(verify_logins, *zip(*[(name, encoded, logins, overrides)] * processes)))
+                total = processes * logins / (time.perf_counter() - started)
+
+                self.stdout.write(
+                    f"{name} ({params}): {1000 * single / logins:.1f} ms/login, "
+                    f"{per_core:.1f} logins/s per core, {total:.1f} logins/s on {processes} processes"
+                )
+
+    def parse_overrides(self, overrides):
+        parsed = {}
+        for override in overrides:
+            name, _, value = override.partition('=')
+            if name not in COST_SETTINGS:
+                raise CommandError(f"Unknown cost setting '{name}'.")
+            try:
+                parsed[name] = int(value)
+            except ValueError:
+                raise CommandError(f"{name} must be an integer.")
+        return parsed
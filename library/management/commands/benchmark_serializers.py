@@ -0,0 +1,71 @@
+import time
+
+from django.db import transaction
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from library.models import Book, Loan, User
+from library.renderers import FastJSONRenderer, orjson
+from library.repositories.book_repository import BookRepository
+from library.repositories.loan_repository import LoanRepository
+from library.serializers.book_serializers import BookSerializer
+from library.serializers.fast import book_rows, book_values, loan_rows, loan_values
+from library.serializers.loan_serializers import LoanSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of the ModelSerializer list path with the values() fast path"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help="Rows per page")
+        parser.add_argument('--repeat', type=int, default=50, help="Pages per measurement")
+        parser.add_argument('--seed', action='store_true', help="Create the rows in a transaction that is rolled back")
+
+    def handle(self, *args, rows, repeat, seed, **options):
+        if rows < 1 or repeat < 1:
+            raise CommandError("--rows and --repeat must be positive.")
+        try:
+            with transaction.atomic():
+                if seed:
+                    self.seed(rows)
+                self.run(rows, repeat)
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        user = User.objects.create_user(username='benchmark-serializers', password=None)
+        books = Book.objects.bulk_create(
+            Book(title=f'Benchmark {index}', author='Benchmark', isbn=f'B{index:012d}', page_count=100)
+            for index in range(rows)
+        )
+        Loan.objects.bulk_create(Loan(user=user, book=book) for book in books)
+
+    def run(self, rows, repeat):
+        if not orjson:
+            self.stdout.write("orjson is not installed; FastJSONRenderer uses the standard library encoder.")
+        cases = [
+            ('books', BookRepository.get_queryset(), BookSerializer, book_values, book_rows),
+            ('loans', LoanRepository.get_queryset(), LoanSerializer, loan_values, loan_rows),
+        ]
+        for name, queryset, serializer_class, values, to_rows in cases:
+            page = queryset[:rows]
+            if not page.exists():
+                raise CommandError(f"No {name} to serialize; pass --seed.")
+            paths = [
+                ('serializer + JSONRenderer', lambda: JSONRenderer().render(serializer_class(list(page), many=True).data)),
+                ('values() + JSONRenderer', lambda: JSONRenderer().render(to_rows(values(page)))),
+                ('values() + FastJSONRenderer', lambda: FastJSONRenderer().render(to_rows(values(page)))),
+            ]
+            count = len(page)
+            baseline = None
+            for label, render in paths:
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    render()
+                rate = count * repeat / (time.perf_counter() - started)
+                baseline = baseline or rate
+                self.stdout.write(f"{name:<6} {label:<28} {rate:>10.0f} rows/s  ({rate / baseline:.1f}x)")
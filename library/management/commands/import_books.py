@@ -0,0 +1,35 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from library.services.book_service import IMPORT_BATCH_SIZE, BookService
+from library.utils.book_import import IMPORT_FORMATS, detect_format, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Stream books from a CSV or JSONL file into the catalogue, upserting on ISBN"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, dest='file_format')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, path, file_format, batch_size, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+        file_format = file_format or detect_format(path)
+
+        if path == '-':
+            report = BookService.import_books(iter_rows(sys.stdin.buffer, file_format), batch_size=batch_size)
+        else:
+            try:
+                with open(path, 'rb') as stream:
+                    report = BookService.import_books(iter_rows(stream, file_format), batch_size=batch_size)
+            except OSError as e:
+                raise CommandError(f"Cannot read {path}: {e}")
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {report['processed']} rows: {report['imported']} imported, {report['failed']} failed."
+        ))
@@ -0,0 +1,65 @@
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from library.utils.metrics import percentile
+
+
+def fetch(url, headers, timeout):
+    request = urllib.request.Request(url, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def run_load(url, concurrency, requests, headers=None, timeout=30):
+    # Keeps `concurrency` requests in flight until `requests` have completed
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda _: fetch(url, headers or {}, timeout), range(requests)))
+        elapsed = time.perf_counter() - started
+    latencies = sorted(latency for _, latency in results)
+    errors = sum(1 for status, _ in results if status is None or status >= 400)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'rps': requests / elapsed,
+        'p50_ms': 1000 * percentile(latencies, 50),
+        'p95_ms': 1000 * percentile(latencies, 95),
+        'p99_ms': 1000 * percentile(latencies, 99),
+    }
+
+
+class Command(BaseCommand):
+    help = "Send concurrent GET requests to a running server and report throughput and latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help="Path to load, e.g. /api/books/ or /api/async/books/ (repeatable)",
+        )
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight at once")
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per path")
+        parser.add_argument('--token', help="Access token sent as a Bearer Authorization header")
+
+    def handle(self, *args, base_url, paths, concurrency, requests, token, **options):
+        if concurrency < 1 or requests < 1:
+            raise CommandError("--concurrency and --requests must be positive.")
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        for path in paths or ['/api/books/', '/api/async/books/']:
+            result = run_load(base_url.rstrip('/') + path, concurrency, requests, headers)
+            self.stdout.write(
+                f"{path}: {result['rps']:.1f} req/s, p50 {result['p50_ms']:.1f} ms, "
+                f"p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+                f"{result['errors']}/{result['requests']} errors"
+            )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from library.partitioning import (
+    add_months,
+    create_partitions,
+    drop_empty_partitions,
+    is_partitioned,
+    month_start,
+    partition_loans_table,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition library_loan by month of borrowed_date (PostgreSQL only) and keep partitions "
+        "created ahead of time. Run it from cron, e.g. daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help="Convert the plain table first. Copies every loan and locks the table while it runs.",
+        )
+        parser.add_argument('--ahead', type=int, default=3, help="Months of partitions to keep ready")
+        parser.add_argument(
+            '--drop-empty', action='store_true',
+            help="Drop empty partitions of past months, e.g. after archive_loans emptied them",
+        )
+
+    def handle(self, *args, convert, ahead, drop_empty, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Loan partitioning requires PostgreSQL.")
+        if ahead < 0:
+            raise CommandError("--ahead cannot be negative.")
+        this_month = month_start(timezone.now())
+        until = add_months(this_month, ahead + 1)
+
+        if not is_partitioned(connection):
+            if not convert:
+                raise CommandError("library_loan is not partitioned yet; run again with --convert.")
+            partition_loans_table(connection, until)
+            self.stdout.write("Converted library_loan to a table partitioned by month.")
+
+        for name in create_partitions(connection, this_month, until):
+            self.stdout.write(f"Created {name}")
+        if drop_empty:
+            for name in drop_empty_partitions(connection, this_month):
+                self.stdout.write(f"Dropped {name}")
@@ -0,0 +1,30 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from library.services.stats_service import StatsService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the circulation stats rollups now, instead of waiting for run_worker. By default only "
+        "the days since the last rollup are recounted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Recount from this day (YYYY-MM-DD)")
+        parser.add_argument('--full', action='store_true', help="Recount the whole loan history")
+
+    def handle(self, *args, since, full, **options):
+        if since and full:
+            raise CommandError("Pass --since or --full, not both.")
+        if since:
+            try:
+                since = date.fromisoformat(since)
+            except ValueError:
+                raise CommandError(f"Invalid --since date '{since}'.")
+        elif full:
+            since = StatsService.first_loan_day()
+        with transaction.atomic():
+            since = StatsService.rollup_loan_stats(since=since, reschedule=False)
+        self.stdout.write(f"Loan stats recounted from {since}.")
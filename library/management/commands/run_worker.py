@@ -0,0 +1,52 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from library.services.job_service import JobService
+from library.services.notification_service import NotificationService
+from library.services.stats_service import StatsService
+
+OUTCOMES = {'pending': 'failed, will retry', 'failed': 'failed'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the database queue: the periodic overdue loan scan and the email "
+        "notices it queues, and the circulation stats rollup. Runs until stopped; several workers "
+        "can share the queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due, e.g. from cron")
+        parser.add_argument('--poll-interval', type=float, default=5, help="Seconds to sleep when no job is due")
+        parser.add_argument('--max-jobs', type=int, help="Exit after this many jobs")
+
+    def handle(self, *args, once, poll_interval, max_jobs, **options):
+        if poll_interval <= 0 or (max_jobs is not None and max_jobs < 1):
+            raise CommandError("--poll-interval and --max-jobs must be positive.")
+        self.stopping = False
+        processed = 0
+        previous = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            NotificationService.schedule_overdue_scan()
+            StatsService.schedule_rollup()
+            while not self.stopping and (max_jobs is None or processed < max_jobs):
+                job = JobService.run_next()
+                if job is None:
+                    if once:
+                        break
+                    close_old_connections()  # Long-lived process: drop connections past CONN_MAX_AGE
+                    time.sleep(poll_interval)
+                    continue
+                processed += 1
+                self.stdout.write(f"{job.name}: {OUTCOMES.get(job.status, 'done')}")
+        finally:
+            NotificationService.close_connection()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+        self.stdout.write(f"Processed {processed} jobs.")
+
+    def stop(self, signum, frame):
+        # Finish the current job, then exit
+        self.stopping = True
@@ -0,0 +1,204 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from library.models import ArchivedLoan, Book, Hold, Loan, User
+from library.utils.response_cache import bump_catalogue_version
+
+# Seeded rows are recognised by exact markers that real data cannot carry: usernames of this exact
+# shape with an address under the reserved .invalid TLD, and ISBNs that are not digits at all
+SEED_USERNAME_PREFIX = 'seed-'
+SEED_ADMIN_USERNAME = 'seed-admin'
+SEED_USERNAME_PATTERN = r'^seed-user-[0-9]{6}$'
+SEED_EMAIL_DOMAIN = 'seed.invalid'
+SEED_ISBN_PREFIX = 'SEED-'
+MAX_SEED_USERS = 999999
+MAX_SEED_BOOKS = 10 ** 8  # Eight digits after the prefix fill the 13-character ISBN column
+SEED_PASSWORD = 'seed-password'
+BATCH_SIZE = 2000
+
+WORDS = (
+    'river', 'shadow', 'garden', 'winter', 'empire', 'silent', 'golden', 'night', 'city', 'stone',
+    'ocean', 'memory', 'fire', 'glass', 'forest', 'north', 'secret', 'house', 'light', 'war',
+    'child', 'storm', 'island', 'queen', 'machine', 'history', 'journey', 'song', 'mountain', 'letter',
+    'kingdom', 'dream', 'road', 'summer', 'iron', 'last', 'lost', 'hidden', 'broken', 'wild',
+    'python', 'data', 'design', 'practical', 'introduction', 'modern', 'art', 'science', 'guide', 'theory',
+)
+FIRST_NAMES = ('Ada', 'Ben', 'Chloe', 'David', 'Elif', 'Femi', 'Grace', 'Hiro', 'Ines', 'Jonas', 'Kemi', 'Liam')
+LAST_NAMES = ('Adeyemi', 'Brown', 'Chen', 'Dubois', 'Eze', 'Fischer', 'Garcia', 'Haddad', 'Ivanova', 'Jensen')
+
+
+@contextmanager
+def historical_timestamps(*fields):
+    # bulk_create would stamp auto_now_add fields with the current time
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def seeded_users():
+    return User.objects.filter(
+        Q(username=SEED_ADMIN_USERNAME) | Q(username__regex=SEED_USERNAME_PATTERN),
+        email__endswith=f'@{SEED_EMAIL_DOMAIN}',
+    )
+
+
+def seeded_books():
+    return Book.objects.filter(isbn__startswith=SEED_ISBN_PREFIX)
+
+
+def zipf_weights(count, exponent, rng):
+    # Popularity by rank, with ranks shuffled so ids carry no meaning
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return [1 / rank ** exponent for rank in ranks]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large library for benchmarking: users with skewed activity, books with "
+        "Zipf-distributed popularity, and a year of loans. Seeded rows can be removed with --reset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--books', type=int, default=10000)
+        parser.add_argument('--loans', type=int, default=50000)
+        parser.add_argument('--days', type=int, default=365, help="History covered by join and loan dates")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for repeatable datasets")
+        parser.add_argument('--password', default=SEED_PASSWORD, help="Password of every seeded user")
+        parser.add_argument('--reset', action='store_true', help="Delete previously seeded rows first")
+
+    def handle(self, *args, users, books, loans, days, seed, password, reset, **options):
+        if users < 1 or books < 1 or loans < 0 or days < 1:
+            raise CommandError("--users, --books and --days must be positive, --loans not negative.")
+        if users > MAX_SEED_USERS or books > MAX_SEED_BOOKS:
+            raise CommandError(f"At most {MAX_SEED_USERS} users and {MAX_SEED_BOOKS} books can be seeded.")
+        self.check_ownership()
+        if reset:
+            self.reset()
+        elif seeded_users().exists() or seeded_books().exists():
+            raise CommandError("Seeded rows already exist; pass --reset to replace them.")
+
+        rng = random.Random(seed)
+        now = timezone.now()
+        with transaction.atomic(), historical_timestamps(
+            User._meta.get_field('join_date'), Loan._meta.get_field('borrowed_date')
+        ):
+            user_ids = self.seed_users(users, days, password, rng, now)
+            book_copies = self.seed_books(books, rng)
+            active = self.seed_loans(loans, days, user_ids, book_copies, rng, now)
+        bump_catalogue_version()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {users} users, {books} books and {loans} loans ({active} active)."
+        ))
+
+    def check_ownership(self):
+        # Refuses to touch rows this command did not create: accounts that only share a seeded
+        # username, and real loans or holds that a reset would delete along with seeded rows
+        usernames = Q(username=SEED_ADMIN_USERNAME) | Q(username__regex=SEED_USERNAME_PATTERN)
+        if User.objects.filter(usernames).exclude(email__endswith=f'@{SEED_EMAIL_DOMAIN}').exists():
+            raise CommandError("Some users with seed usernames were not created by seed_library; rename them first.")
+        users, books = seeded_users(), seeded_books()
+        for model in (Loan, ArchivedLoan, Hold):
+            mixed = model.objects.filter(
+                Q(user__in=users) & ~Q(book__in=books) | ~Q(user__in=users) & Q(book__in=books)
+            )
+            if mixed.exists():
+                raise CommandError(
+                    f"{model._meta.verbose_name_plural.capitalize()} link seeded rows to other data; "
+                    "refusing to seed or reset."
+                )
+
+    def reset(self):
+        # Loans and holds go with their users and books
+        seeded_users().delete()
+        seeded_books().delete()
+
+    def seed_users(self, count, days, password, rng, now):
+        # One hash for everyone: hashing each password would dominate the run
+        encoded = make_password(password)
+        users = [User(
+            username=SEED_ADMIN_USERNAME, password=encoded, role='admin',
+            email=f'admin@{SEED_EMAIL_DOMAIN}', join_date=now - timedelta(days=days),
+        )]
+        for index in range(1, count + 1):
+            users.append(User(
+                username=f'{SEED_USERNAME_PREFIX}user-{index:06d}',
+                password=encoded,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f'user-{index}@{SEED_EMAIL_DOMAIN}',
+                join_date=now - timedelta(seconds=rng.uniform(0, days * 86400)),
+                # A few suspended accounts, as in any real member base
+                account_status='suspended' if rng.random() < 0.02 else 'active',
+            ))
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        return list(seeded_users().exclude(username=SEED_ADMIN_USERNAME).values_list('id', flat=True))
+
+    def seed_books(self, count, rng):
+        authors = [f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}' for _ in range(max(1, count // 8))]
+        author_weights = zipf_weights(len(authors), 1.0, rng)
+        books = []
+        for index in range(count):
+            copies = rng.choices((1, 2, 3, 5, 10), weights=(60, 20, 10, 7, 3))[0]
+            books.append(Book(
+                title=' '.join(rng.sample(WORDS, rng.randint(2, 4))).capitalize(),
+                author=rng.choices(authors, weights=author_weights)[0],
+                isbn=f'{SEED_ISBN_PREFIX}{index:08d}',
+                page_count=max(40, min(1500, int(rng.gauss(320, 120)))),
+                total_copies=copies,
+                available_copies=copies,
+            ))
+        Book.objects.bulk_create(books, batch_size=BATCH_SIZE)
+        return dict(seeded_books().values_list('id', 'total_copies'))
+
+    def seed_loans(self, count, days, user_ids, book_copies, rng, now):
+        book_ids = list(book_copies)
+        # Most loans go to a few popular books and a few heavy readers
+        book_weights = zipf_weights(len(book_ids), 1.1, rng)
+        user_weights = [rng.paretovariate(1.5) for _ in user_ids]
+        borrowers = rng.choices(user_ids, weights=user_weights, k=count)
+        borrowed = rng.choices(book_ids, weights=book_weights, k=count)
+
+        available = dict(book_copies)
+        active = set()
+        loan_period = timedelta(days=settings.LOAN_PERIOD_DAYS)
+        loans = []
+        for user_id, book_id in zip(borrowers, borrowed):
+            age = timedelta(seconds=rng.uniform(0, days * 86400))
+            borrowed_date = now - age
+            # Old loans are nearly all back; recent ones are still out in proportion to their age
+            returned = rng.random() < min(0.97, age / loan_period)
+            if not returned and (available[book_id] == 0 or (user_id, book_id) in active):
+                returned = True
+            returned_date = None
+            if returned:
+                returned_date = borrowed_date + min(age, timedelta(days=rng.uniform(1, 2 * settings.LOAN_PERIOD_DAYS)))
+            else:
+                available[book_id] -= 1
+                active.add((user_id, book_id))
+            loans.append(Loan(
+                user_id=user_id, book_id=book_id, borrowed_date=borrowed_date, returned_date=returned_date,
+                due_date=borrowed_date + loan_period,
+            ))
+        Loan.objects.bulk_create(loans, batch_size=BATCH_SIZE)
+
+        on_loan = [
+            Book(id=book_id, available_copies=copies, availability=copies > 0)
+            for book_id, copies in available.items() if copies != book_copies[book_id]
+        ]
+        Book.objects.bulk_update(on_loan, ['available_copies', 'availability'], batch_size=BATCH_SIZE)
+        return len(active)
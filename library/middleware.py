@@ -0,0 +1,125 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from .routers import DatabasePin, current_database_pin
+from .utils.metrics import (
+    REQUEST_DB_DURATION,
+    REQUEST_DB_QUERIES,
+    REQUEST_DURATION,
+    REQUEST_SERIALIZATION_DURATION,
+    RequestMetrics,
+    current_request_metrics,
+)
+
+
+class RequestMetricsMiddleware:
+    # Records query count, database time, response rendering time and wall time per view. They
+    # are returned in a Server-Timing header and aggregated into the histograms behind /metrics.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            # Named before the view runs so slow queries can be attributed to it
+            metrics.view = request.resolver_match.view_name
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook returns
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def record_render(response):
+                metrics.serialization_time += time.perf_counter() - started
+
+            response.add_post_render_callback(record_render)
+        return response
+
+    def finish(self, request, response, metrics):
+        wall_time = time.perf_counter() - metrics.started
+        labels = {'view': metrics.view or 'unmatched', 'method': request.method}
+        REQUEST_DURATION.observe(wall_time, **labels)
+        REQUEST_DB_DURATION.observe(metrics.db_time, **labels)
+        REQUEST_DB_QUERIES.observe(metrics.queries, **labels)
+        REQUEST_SERIALIZATION_DURATION.observe(metrics.serialization_time, **labels)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serialization_time * 1000:.2f}',
+            f'total;dur={wall_time * 1000:.2f}',
+        ])
+        return response
+
+
+PRIMARY_PIN_COOKIE = 'library_primary_pin'
+
+
+class PrimaryPinningMiddleware:
+    # Keeps unsafe requests, and clients that wrote in the last DATABASE_REPLICA_LAG seconds, on the
+    # primary database so they read their own writes. A cookie carries the pin between requests.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        pin = self.start(request)
+        token = current_database_pin.set(pin)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_database_pin.reset(token)
+        return self.finish(response, pin)
+
+    async def __acall__(self, request):
+        pin = self.start(request)
+        token = current_database_pin.set(pin)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_database_pin.reset(token)
+        return self.finish(response, pin)
+
+    def start(self, request):
+        return DatabasePin(pinned=request.method not in SAFE_METHODS or PRIMARY_PIN_COOKIE in request.COOKIES)
+
+    def finish(self, response, pin):
+        if pin.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_LAG, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:35
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from library.search import install_search_support
+
+
+def install_search(apps, schema_editor):
+    install_search_support(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'ordering': ['title']},
+        ),
+        migrations.AlterModelOptions(
+            name='loan',
+            options={'ordering': ['-borrowed_date']},
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_search, migrations.RunPython.noop),
+    ]
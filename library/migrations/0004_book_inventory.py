@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+def copies_from_availability(apps, schema_editor):
+    # Every existing title is a single copy; unavailable ones are out on loan
+    Book = apps.get_model('library', 'Book')
+    Book.objects.filter(availability=False).update(available_copies=0)
+
+
+def availability_from_copies(apps, schema_editor):
+    Book = apps.get_model('library', 'Book')
+    Book.objects.filter(available_copies=0).update(availability=False)
+    Book.objects.filter(available_copies__gt=0).update(availability=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_book_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='available_copies',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='total_copies',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(copies_from_availability, availability_from_copies),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('available_copies__gt', 0)), fields=['title', 'id'], name='library_book_available_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.CheckConstraint(condition=models.Q(('available_copies__lte', models.F('total_copies'))), name='library_book_available_lte_total'),
+        ),
+    ]
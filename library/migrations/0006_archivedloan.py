@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_loan_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedLoan',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('borrowed_date', models.DateTimeField()),
+                ('returned_date', models.DateTimeField()),
+                ('book', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='library.book')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-borrowed_date'],
+                'indexes': [models.Index(fields=['-borrowed_date', 'id'], name='library_archloan_borrowed_idx'), models.Index(fields=['user', '-borrowed_date'], name='library_archloan_user_idx')],
+            },
+        ),
+    ]
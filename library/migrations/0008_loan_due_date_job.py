@@ -0,0 +1,56 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:10
+
+from datetime import timedelta
+
+import django.utils.timezone
+import library.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+def due_dates_from_borrowed_dates(apps, schema_editor):
+    # Existing loans got the migration time as their due date; count from when they were borrowed
+    Loan = apps.get_model('library', 'Loan')
+    Loan.objects.update(due_date=models.F('borrowed_date') + timedelta(days=settings.LOAN_PERIOD_DAYS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0007_hold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('key', models.CharField(blank=True, default='', max_length=100)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='due_date',
+            field=models.DateTimeField(default=library.models.default_due_date),
+        ),
+        migrations.RunPython(due_dates_from_borrowed_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('returned_date__isnull', True)), fields=['due_date', 'id'], name='library_loan_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['run_at', 'id'], name='library_job_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending'), models.Q(('key', ''), _negated=True)), fields=('key',), name='library_job_one_pending_per_key'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_loan_due_date_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookDailyLoanStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('borrowed', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyLoanStats',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('borrowed', models.PositiveIntegerField(default=0)),
+                ('returned', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserLoanStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('active_loans', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedloan',
+            index=models.Index(fields=['returned_date'], name='library_archloan_returned_idx'),
+        ),
+        migrations.AddField(
+            model_name='bookdailyloanstats',
+            name='book',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='library.book'),
+        ),
+        migrations.AddIndex(
+            model_name='userloanstats',
+            index=models.Index(fields=['-active_loans', 'user'], name='library_userstats_active_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookdailyloanstats',
+            constraint=models.UniqueConstraint(fields=('date', 'book'), name='library_bookdailystats_unique'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+from library.loan_counters import drop_loan_counters, install_loan_counters, recount_loan_counters
+
+
+def install_counters(apps, schema_editor):
+    install_loan_counters(schema_editor.connection)
+    recount_loan_counters(schema_editor.connection)
+
+
+def drop_counters(apps, schema_editor):
+    drop_loan_counters(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('library', '0009_loan_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='active_loans',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='next_due_date',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(install_counters, drop_counters),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('active_loans__gt', 0)), fields=['-active_loans', 'id'], name='library_user_active_loans_idx'),
+        ),
+        # Replaced by the live User.active_loans counter
+        migrations.DeleteModel(
+            name='UserLoanStats',
+        ),
+    ]
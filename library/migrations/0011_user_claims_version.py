@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+from library.loan_counters import drop_sqlite_loan_counters, install_loan_counters
+
+
+def drop_counters(apps, schema_editor):
+    drop_sqlite_loan_counters(schema_editor.connection)
+
+
+def restore_counters(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        install_loan_counters(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_user_loan_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_counters, restore_counters),
+        migrations.AddField(
+            model_name='user',
+            name='claims_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(restore_counters, drop_counters),
+    ]
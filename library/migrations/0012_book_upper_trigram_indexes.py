@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:50
+
+from django.db import migrations
+
+from library.search import install_trigram_support
+
+
+def install_trigram_indexes(apps, schema_editor):
+    install_trigram_support(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0011_user_claims_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_trigram_indexes, migrations.RunPython.noop),
+    ]
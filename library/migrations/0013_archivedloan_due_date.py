@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0012_book_upper_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedloan',
+            name='due_date',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
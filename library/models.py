@@ -1,5 +1,13 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+
+def default_due_date():
+    return timezone.now() + timedelta(days=settings.LOAN_PERIOD_DAYS)
 
 class User(AbstractUser):
     phone_number = models.CharField(max_length=15, blank=True, null=True)
@@ -12,31 +20,202 @@ class User(AbstractUser):
     join_date = models.DateTimeField(auto_now_add=True)
     preferred_language = models.CharField(max_length=10, default='en')
     receive_email_notifications = models.BooleanField(default=True)
+    # Loans out and the earliest due date among them, kept current by database triggers on
+    # library_loan (see library.loan_counters) so the borrowing policy needs no COUNT
+    active_loans = models.PositiveIntegerField(default=0, editable=False)
+    next_due_date = models.DateTimeField(null=True, blank=True, editable=False)
+    # Bumped whenever a field carried in the user's tokens changes; see library.authentication
+    claims_version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.username
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Borrowers with the most loans out, for the stats endpoint
+            models.Index(
+                fields=['-active_loans', 'id'],
+                condition=models.Q(active_loans__gt=0),
+                name='library_user_active_loans_idx',
+            ),
+        ]
     
 class Book(models.Model):
     title = models.CharField(max_length=255)
     author = models.CharField(max_length=255)
     isbn = models.CharField(max_length=13, unique=True)
     page_count = models.IntegerField()
+    # Denormalized "any copy on the shelf" flag, kept in step with available_copies
     availability = models.BooleanField(default=True)
+    total_copies = models.PositiveIntegerField(default=1)
+    available_copies = models.PositiveIntegerField(default=1)
+    # Maintained by a database trigger on PostgreSQL, see library.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.title
     
     class Meta:
         ordering = ['title']  
+        indexes = [
+            # Default catalogue ordering and the (title, id) keyset cursor
+            models.Index(fields=['title', 'id'], name='library_book_title_id_idx'),
+            # Serves the "available now" catalogue filter in title order
+            models.Index(
+                fields=['title', 'id'],
+                condition=models.Q(available_copies__gt=0),
+                name='library_book_available_idx',
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(available_copies__lte=models.F('total_copies')),
+                name='library_book_available_lte_total',
+            ),
+        ]
 
 class Loan(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
     borrowed_date = models.DateTimeField(auto_now_add=True)
     returned_date = models.DateTimeField(null=True, blank=True)
+    due_date = models.DateTimeField(default=default_due_date)
 
     def __str__(self):
         return f"{self.user.username} - {self.book.title}"
     
     class Meta:
         ordering = ['-borrowed_date']
+        indexes = [
+            # Loan list ordering, borrowed_date range filters and the keyset cursor
+            models.Index(fields=['-borrowed_date', 'id'], name='library_loan_borrowed_idx'),
+            # ?user= in list order
+            models.Index(fields=['user', '-borrowed_date'], name='library_loan_user_borrowed_idx'),
+            # Active loans are a small slice of the table: return_book and ?is_active=true
+            models.Index(
+                fields=['user', 'book'],
+                condition=models.Q(returned_date__isnull=True),
+                name='library_loan_active_idx',
+            ),
+            models.Index(
+                fields=['returned_date'],
+                condition=models.Q(returned_date__isnull=False),
+                name='library_loan_returned_idx',
+            ),
+            # Overdue scan: active loans in due date order
+            models.Index(
+                fields=['due_date', 'id'],
+                condition=models.Q(returned_date__isnull=True),
+                name='library_loan_due_idx',
+            ),
+        ]
+
+class ArchivedLoan(models.Model):
+    # Returned loans moved out of library_loan by the archive_loans command. The id is the
+    # original loan id; only the indexes the loan list needs are kept.
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, db_index=False)
+    borrowed_date = models.DateTimeField()
+    returned_date = models.DateTimeField()
+    # Unknown for loans archived before due dates were copied
+    due_date = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.book.title}"
+
+    class Meta:
+        ordering = ['-borrowed_date']
+        indexes = [
+            models.Index(fields=['-borrowed_date', 'id'], name='library_archloan_borrowed_idx'),
+            models.Index(fields=['user', '-borrowed_date'], name='library_archloan_user_idx'),
+            # Loan stats rollups count returns by day
+            models.Index(fields=['returned_date'], name='library_archloan_returned_idx'),
+        ]
+
+class Hold(models.Model):
+    # A place in a book's queue. Waiting holds are served by priority, then first come first
+    # served; a returned copy becomes a loan for the first of them (see LoanService.return_book).
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    priority = models.PositiveSmallIntegerField(choices=[(0, 'High'), (1, 'Normal')], default=1)
+    status = models.CharField(max_length=10, choices=[('waiting', 'Waiting'), ('fulfilled', 'Fulfilled'), ('cancelled', 'Cancelled')], default='waiting')
+    created_at = models.DateTimeField(auto_now_add=True)
+    fulfilled_at = models.DateTimeField(null=True, blank=True)
+    # Not a foreign key: loans get archived, and a partitioned library_loan has no unique id to reference
+    loan_id = models.BigIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.book.title} ({self.status})"
+
+    class Meta:
+        ordering = ['priority', 'created_at', 'id']
+        indexes = [
+            # The queue itself: next holder and queue positions only touch waiting holds
+            models.Index(
+                fields=['book', 'priority', 'created_at', 'id'],
+                condition=models.Q(status='waiting'),
+                name='library_hold_queue_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'book'],
+                condition=models.Q(status='waiting'),
+                name='library_hold_one_waiting_per_user',
+            ),
+        ]
+
+class DailyLoanStats(models.Model):
+    # Loan stats rollups, rebuilt from the loan tables by StatsService.rollup_loan_stats so the
+    # stats endpoints never aggregate raw loans. Days without circulation have no row.
+    date = models.DateField(primary_key=True)
+    borrowed = models.PositiveIntegerField(default=0)
+    returned = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+
+class BookDailyLoanStats(models.Model):
+    date = models.DateField()
+    book = models.ForeignKey(Book, on_delete=models.CASCADE)
+    borrowed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves the date range scans of the most borrowed books
+            models.UniqueConstraint(fields=['date', 'book'], name='library_bookdailystats_unique'),
+        ]
+
+class Job(models.Model):
+    # Background work for the run_worker command, see library.services.job_service. Finished jobs
+    # are deleted; failed ones are kept for inspection.
+    name = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending')
+    # At most one pending job per non-empty key, e.g. for self-rescheduling jobs
+    key = models.CharField(max_length=100, blank=True, default='')
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        indexes = [
+            # Workers poll for the next due job; failed jobs stay out of the index
+            models.Index(
+                fields=['run_at', 'id'],
+                condition=models.Q(status='pending'),
+                name='library_job_pending_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status='pending') & ~models.Q(key=''),
+                name='library_job_one_pending_per_key',
+            ),
+        ]
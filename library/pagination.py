@@ -0,0 +1,163 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    # Seek pagination over a fixed, unique ordering. Each page is fetched with a
+    # WHERE clause on the last seen row instead of an OFFSET, and the total count
+    # is only computed on request, so deep pages cost the same as the first one.
+    # Results are always in `ordering`: ranked searches lose their rank order in
+    # cursor mode and are only ranked with page-number pagination.
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    results_key = 'results'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+        position, reverse = self.decode_cursor(request)
+        self.count = queryset.count() if self.include_count(request) else None
+
+        ordering = self._reverse_ordering() if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            self.results_key: data,
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': [self.results_key],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                self.results_key: schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._get_position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            values = payload['p']
+            if len(values) != len(self.fields):
+                raise ValueError()
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position(self, instance):
+        if isinstance(instance, dict):  # values() rows from the fast list path
+            instance = self.model(**{field.attname: instance[field.attname] for field in self.fields})
+        return [field.value_to_string(instance) for field in self.fields]
+
+    def _reverse_ordering(self):
+        return [name[1:] if name.startswith('-') else '-' + name for name in self.ordering]
+
+    def _seek_filter(self, ordering, position):
+        # (a, b) > (x, y) expanded as a > x OR (a = x AND b > y), which also
+        # handles orderings that mix ascending and descending columns.
+        clauses = []
+        for index, name in enumerate(ordering):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            clause = Q(**{f'{name.lstrip("-")}__{lookup}': position[index]})
+            for previous_name, value in zip(ordering[:index], position[:index]):
+                clause &= Q(**{previous_name.lstrip('-'): value})
+            clauses.append(clause)
+        return reduce(or_, clauses)
+
+
+class BookKeysetPagination(KeysetPagination):
+    ordering = ('title', 'id')
+
+
+class LoanKeysetPagination(KeysetPagination):
+    ordering = ('-borrowed_date', 'id')
+
+
+class UserKeysetPagination(KeysetPagination):
+    # The user endpoints wrap their payload in 'data'
+    ordering = ('id',)
+    results_key = 'data'
+
+
+def get_paginator(view, request):
+    # Cursor mode is opt-in so existing page-number clients keep working.
+    keyset_class = getattr(view, 'keyset_pagination_class', None)
+    params = request.query_params
+    if keyset_class and (params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params):
+        return keyset_class()
+    return getattr(view, 'pagination_class', PageNumberPagination)()
@@ -0,0 +1,138 @@
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+
+from .loan_counters import install_loan_counters
+
+# PostgreSQL declarative partitioning of library_loan by month of borrowed_date. Django keeps
+# treating the table as a plain one: migrations that add columns or indexes apply to the parent
+# and PostgreSQL propagates them to every partition.
+LOAN_TABLE = 'library_loan'
+DEFAULT_PARTITION = f'{LOAN_TABLE}_default'
+PARTITION_NAME = LOAN_TABLE + '_p{:%Y_%m}'
+PARTITION_PATTERN = re.compile(rf'^{LOAN_TABLE}_p(\d{{4}})_(\d{{2}})$')
+UNPARTITIONED_TABLE = f'{LOAN_TABLE}_unpartitioned'
+ID_SEQUENCE = f'{LOAN_TABLE}_id_seq'
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    years, month = divmod(value.month - 1 + months, 12)
+    return value.replace(year=value.year + years, month=month + 1)
+
+
+def is_partitioned(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [LOAN_TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def monthly_partitions(cursor):
+    # {month start: partition name} for the existing monthly partitions
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(%s)",
+        [LOAN_TABLE],
+    )
+    partitions = {}
+    for (name,) in cursor.fetchall():
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def create_partitions(connection, start, end):
+    # Monthly partitions covering [start, end). Rows that already landed in the default partition
+    # for a new month are moved into it, since PostgreSQL refuses to attach over them.
+    created = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        existing = monthly_partitions(cursor)
+        month = month_start(start)
+        while month < end:
+            if month not in existing:
+                name = PARTITION_NAME.format(month)
+                bounds = [month, add_months(month, 1)]
+                cursor.execute(f"CREATE TABLE {name} (LIKE {LOAN_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    f"WHERE borrowed_date >= %s AND borrowed_date < %s RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved",
+                    bounds,
+                )
+                cursor.execute(f"ALTER TABLE {LOAN_TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", bounds)
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def drop_empty_partitions(connection, before):
+    # Monthly partitions that ended before `before` and hold no rows, e.g. once archived
+    dropped = []
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for month, name in sorted(monthly_partitions(cursor).items()):
+            if add_months(month, 1) > before:
+                continue
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {name})")
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"DROP TABLE {name}")
+                dropped.append(name)
+    return dropped
+
+
+def partition_loans_table(connection, until):
+    # One-off conversion of the plain table: copies every row into a table partitioned by
+    # month, then recreates the indexes, foreign keys and triggers under their original names. The
+    # table is locked for the duration. The primary key becomes (id, borrowed_date), since
+    # PostgreSQL requires the partition key in unique constraints.
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {LOAN_TABLE} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname <> %s",
+            [LOAN_TABLE, f'{LOAN_TABLE}_pkey'],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s) "
+            "AND contype = 'f'",
+            [LOAN_TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT min(borrowed_date), max(id) FROM {LOAN_TABLE}")
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {LOAN_TABLE} RENAME TO {UNPARTITIONED_TABLE}")
+        cursor.execute(
+            f"CREATE TABLE {LOAN_TABLE} (LIKE {UNPARTITIONED_TABLE} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (borrowed_date)"
+        )
+        # The old identity sequence goes with the old table; ids continue from a plain sequence
+        cursor.execute(f"CREATE SEQUENCE {ID_SEQUENCE}_partitioned OWNED BY {LOAN_TABLE}.id")
+        cursor.execute(f"ALTER TABLE {LOAN_TABLE} ALTER COLUMN id SET DEFAULT nextval('{ID_SEQUENCE}_partitioned')")
+        cursor.execute(f"SELECT setval('{ID_SEQUENCE}_partitioned', %s, false)", [(max_id or 0) + 1])
+
+        month = month_start(oldest or until)
+        while month < until:
+            cursor.execute(
+                f"CREATE TABLE {PARTITION_NAME.format(month)} PARTITION OF {LOAN_TABLE} FOR VALUES FROM (%s) TO (%s)",
+                [month, add_months(month, 1)],
+            )
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {LOAN_TABLE} DEFAULT")
+        cursor.execute(f"INSERT INTO {LOAN_TABLE} SELECT * FROM {UNPARTITIONED_TABLE}")
+        cursor.execute(f"DROP TABLE {UNPARTITIONED_TABLE}")
+        cursor.execute(f"ALTER SEQUENCE {ID_SEQUENCE}_partitioned RENAME TO {ID_SEQUENCE}")
+
+        cursor.execute(f"ALTER TABLE {LOAN_TABLE} ADD CONSTRAINT {LOAN_TABLE}_pkey PRIMARY KEY (id, borrowed_date)")
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {LOAN_TABLE} ADD CONSTRAINT {name} {definition}")
+        # Triggers went with the old table; the copied rows are already counted
+        install_loan_counters(connection)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+# Why a borrow was refused, by rule
+REFUSALS = {
+    'account': "Your account cannot borrow books.",
+    'loan_limit': "You have reached your limit of books on loan.",
+    'overdue': "Return your overdue books before borrowing more.",
+}
+
+
+def borrowing_rules(prefix='', now=None):
+    # {rule: Q} a user must match to borrow, built from the settings. Every rule reads only the
+    # user row (see the counters in library.loan_counters), so they can be checked by the
+    # statement that locks it. `prefix` applies them through a relation, e.g. 'user__'.
+    now = now or timezone.now()
+    rules = {
+        'account': Q(**{
+            f'{prefix}is_active': True,
+            f'{prefix}account_status__in': settings.BORROWING_ACCOUNT_STATUSES,
+        }),
+    }
+    # Roles without a limit may borrow any number of books
+    limits = {role: limit for role, limit in settings.MAX_ACTIVE_LOANS.items() if limit is not None}
+    if limits:
+        loan_limit = ~Q(**{f'{prefix}role__in': list(limits)})
+        for role, limit in limits.items():
+            loan_limit |= Q(**{f'{prefix}role': role, f'{prefix}active_loans__lt': limit})
+        rules['loan_limit'] = loan_limit
+    if settings.BLOCK_BORROWING_WHEN_OVERDUE:
+        rules['overdue'] = Q(**{f'{prefix}next_due_date__isnull': True}) | Q(**{f'{prefix}next_due_date__gt': now})
+    return rules
+
+
+def may_borrow(prefix='', now=None):
+    condition = Q()
+    for rule in borrowing_rules(prefix, now).values():
+        condition &= rule
+    return condition
@@ -0,0 +1,22 @@
+from .base_repository import BaseRepository
+from .loan_repository import LoanRepository
+from ..models import ArchivedLoan
+
+ARCHIVE_FIELDS = ('id', 'user_id', 'book_id', 'borrowed_date', 'returned_date', 'due_date')
+
+class ArchivedLoanRepository(BaseRepository):
+    model = ArchivedLoan
+    # Serialized by LoanSerializer, like live loans
+    select_related = LoanRepository.select_related
+    only_fields = LoanRepository.only_fields
+
+    @classmethod
+    def newest_borrowed_date(cls):
+        return cls.model.objects.order_by('-borrowed_date').values_list('borrowed_date', flat=True).first()
+
+    @classmethod
+    def copy_loans(cls, loans):
+        # Ids are kept, so a batch that was copied but not yet deleted is skipped on the next run
+        cls.model.objects.bulk_create(
+            [cls.model(**row) for row in loans.values(*ARCHIVE_FIELDS)], ignore_conflicts=True
+        )
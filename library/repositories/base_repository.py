@@ -2,15 +2,30 @@ from django.core.exceptions import ObjectDoesNotExist
 
 class BaseRepository:
     model = None
+    # Default relation loading and column projection applied to every read
+    select_related = ()
+    prefetch_related = ()
+    only_fields = ()
+
+    @classmethod
+    def get_queryset(cls, using=None):
+        queryset = cls.model.objects.using(using)
+        if cls.select_related:
+            queryset = queryset.select_related(*cls.select_related)
+        if cls.prefetch_related:
+            queryset = queryset.prefetch_related(*cls.prefetch_related)
+        if cls.only_fields:
+            queryset = queryset.only(*cls.only_fields)
+        return queryset
 
     @classmethod
     def get_all(cls):
-        return cls.model.objects.all()
+        return cls.get_queryset()
 
     @classmethod
-    def get_by_id(cls, id):
+    def get_by_id(cls, id, using=None):
         try:
-            return cls.model.objects.get(id=id)
+            return cls.get_queryset(using).get(id=id)
         except ObjectDoesNotExist:
             return None
 
@@ -18,13 +33,28 @@ class BaseRepository:
     def create(cls, **kwargs):
         return cls.model.objects.create(**kwargs)
 
+    @classmethod
+    def bulk_create(cls, instances, batch_size=None):
+        return cls.model.objects.bulk_create(instances, batch_size=batch_size)
+
+    @classmethod
+    def bulk_upsert(cls, instances, unique_fields, update_fields, batch_size=None):
+        return cls.model.objects.bulk_create(
+            instances,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+
     @classmethod
     def update(cls, instance, **kwargs):
         for key, value in kwargs.items():
             setattr(instance, key, value)
-        instance.save()
+        # Only write the changed columns, so counters maintained with F() are not overwritten
+        instance.save(update_fields=list(kwargs) or None)
         return instance
 
     @classmethod
     def delete(cls, instance):
-        instance.delete()
\ No newline at end of file
+        instance.delete()
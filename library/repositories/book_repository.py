@@ -1,5 +1,43 @@
+from django.db.models import Case, F, Value, When
 from .base_repository import BaseRepository
 from ..models import Book
 
 class BookRepository(BaseRepository):
-    model = Book
\ No newline at end of file
+    model = Book
+    # search_vector is only read by the database, never by the serializers
+    only_fields = ('id', 'title', 'author', 'isbn', 'page_count', 'availability', 'total_copies', 'available_copies')
+
+    @classmethod
+    def claim(cls, book_id):
+        # Conditional UPDATE: when copies run out, only as many borrowers as there were copies see a row updated.
+        # The right-hand sides read the pre-update row, hence "> 1" for the copy being taken.
+        return cls.model.objects.filter(id=book_id, available_copies__gt=0).update(
+            available_copies=F('available_copies') - 1,
+            availability=Case(When(available_copies__gt=1, then=Value(True)), default=Value(False)),
+        ) == 1
+
+    @classmethod
+    def release(cls, book_id):
+        return cls.model.objects.filter(id=book_id, available_copies__lt=F('total_copies')).update(
+            available_copies=F('available_copies') + 1,
+            availability=True,
+        ) == 1
+
+    @classmethod
+    def set_total_copies(cls, book_id, total_copies):
+        # Copies on loan stay on loan: refuse to shrink the stock below them
+        on_loan_limit = F('total_copies') - total_copies
+        return cls.model.objects.filter(id=book_id, available_copies__gte=on_loan_limit).update(
+            available_copies=F('available_copies') + total_copies - F('total_copies'),
+            total_copies=total_copies,
+            availability=Case(When(available_copies__gt=on_loan_limit, then=Value(True)), default=Value(False)),
+        ) == 1
+
+    @classmethod
+    def lock(cls, book_id):
+        # Row-locks the book until the end of the transaction; None when it does not exist
+        return cls.model.objects.select_for_update().filter(id=book_id).values_list('available_copies', flat=True).first()
+
+    @classmethod
+    def exists(cls, book_id):
+        return cls.model.objects.filter(id=book_id).exists()
@@ -0,0 +1,43 @@
+from django.db.models import Q
+from .base_repository import BaseRepository
+from ..models import Hold
+from ..policies import may_borrow
+
+class HoldRepository(BaseRepository):
+    model = Hold
+
+    @classmethod
+    def next_waiting(cls, book_id, exclude=()):
+        # Locks the hold; holds another transaction is already serving are skipped, and so are
+        # holders the borrowing policy stops from borrowing right now (they keep their place)
+        return (
+            cls.model.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(may_borrow('user__'), book_id=book_id, status='waiting')
+            .exclude(id__in=exclude)
+            .order_by('priority', 'created_at', 'id')
+            .first()
+        )
+
+    @classmethod
+    def get_waiting(cls, user, book_id):
+        return cls.model.objects.filter(user=user, book_id=book_id, status='waiting').first()
+
+    @classmethod
+    def position(cls, hold):
+        # 1-based place in the queue, counted on the queue index
+        ahead = (
+            Q(priority__lt=hold.priority)
+            | Q(priority=hold.priority, created_at__lt=hold.created_at)
+            | Q(priority=hold.priority, created_at=hold.created_at, id__lt=hold.id)
+        )
+        return cls.model.objects.filter(ahead, book_id=hold.book_id, status='waiting').count() + 1
+
+    @classmethod
+    def fulfil(cls, hold, loan):
+        return cls.model.objects.filter(id=hold.id, status='waiting').update(
+            status='fulfilled', loan_id=loan.id, fulfilled_at=loan.borrowed_date
+        ) == 1
+
+    @classmethod
+    def cancel(cls, hold):
+        return cls.model.objects.filter(id=hold.id, status='waiting').update(status='cancelled') == 1
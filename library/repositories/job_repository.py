@@ -0,0 +1,24 @@
+from .base_repository import BaseRepository
+from ..models import Job
+
+class JobRepository(BaseRepository):
+    model = Job
+
+    @classmethod
+    def enqueue_many(cls, jobs):
+        # A job whose key already has a pending job is dropped
+        return cls.model.objects.bulk_create(jobs, ignore_conflicts=True)
+
+    @classmethod
+    def claim_next(cls, now):
+        # Locks the next due job until the end of the transaction; jobs other workers hold are skipped
+        return (
+            cls.model.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', run_at__lte=now)
+            .order_by('run_at', 'id')
+            .first()
+        )
+
+    @classmethod
+    def has_pending(cls, key):
+        return cls.model.objects.filter(key=key, status='pending').exists()
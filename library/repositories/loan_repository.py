@@ -1,5 +1,59 @@
+from django.db.models import Q
 from .base_repository import BaseRepository
 from ..models import Loan
 
 class LoanRepository(BaseRepository):
-    model = Loan
\ No newline at end of file
+    model = Loan
+    # LoanSerializer nests UserSerializer and BookSerializer, so load both in the same query
+    select_related = ('user', 'book')
+    only_fields = (
+        'id', 'borrowed_date', 'returned_date', 'due_date', 'user', 'book',
+        'user__id', 'user__username', 'user__email', 'user__phone_number', 'user__role',
+        'book__id', 'book__title', 'book__author', 'book__isbn', 'book__page_count', 'book__availability',
+        'book__total_copies', 'book__available_copies',
+    )
+
+    @classmethod
+    def get_active_loan(cls, user, book_id):
+        return cls.get_queryset().filter(user=user, book_id=book_id, returned_date__isnull=True).first()
+
+    @classmethod
+    def mark_returned(cls, loan_id, returned_date):
+        return cls.model.objects.filter(id=loan_id, returned_date__isnull=True).update(returned_date=returned_date) == 1
+
+    @classmethod
+    def returned_before(cls, before, limit):
+        # Loan ids ready for the archive; borrowed_date lets PostgreSQL skip newer partitions
+        return list(
+            cls.model.objects.filter(returned_date__lt=before, borrowed_date__lt=before)
+            .order_by().values_list('id', flat=True)[:limit]
+        )
+
+    @classmethod
+    def delete_returned(cls, loan_ids, before):
+        return cls.model.objects.filter(id__in=loan_ids, borrowed_date__lt=before, returned_date__isnull=False).delete()[0]
+
+    @classmethod
+    def overdue(cls, since, until, after, limit):
+        # Ids of active loans that fell due in [since, until), in due date order from the
+        # (due_date, id) key `after`; walks the overdue index
+        queryset = cls.model.objects.filter(returned_date__isnull=True, due_date__lt=until)
+        if since is not None:
+            queryset = queryset.filter(due_date__gte=since)
+        if after is not None:
+            queryset = queryset.filter(Q(due_date__gt=after[0]) | Q(due_date=after[0], id__gt=after[1]))
+        return queryset.order_by('due_date', 'id').values_list('due_date', 'id')[:limit]
+
+    @classmethod
+    def get_for_notice(cls, loan_ids):
+        # Still-active loans whose borrowers take email, with what the notice needs
+        return (
+            cls.model.objects.filter(
+                id__in=loan_ids, returned_date__isnull=True,
+                user__is_active=True, user__receive_email_notifications=True,
+            )
+            .exclude(user__email='')
+            .select_related('user', 'book')
+            .only('id', 'due_date', 'user__username', 'user__email', 'book__title')
+            .order_by('id')
+        )
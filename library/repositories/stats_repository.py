@@ -0,0 +1,75 @@
+from collections import defaultdict
+
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate
+from .base_repository import BaseRepository
+from ..models import ArchivedLoan, BookDailyLoanStats, DailyLoanStats, Loan
+
+# Archived loans still count towards the history
+LOAN_MODELS = (Loan, ArchivedLoan)
+
+
+def count_by_day(model, field, since, *group_by):
+    return (
+        model.objects.filter(**{f'{field}__gte': since})
+        .annotate(day=TruncDate(field))
+        .values('day', *group_by)
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+
+class DailyLoanStatsRepository(BaseRepository):
+    model = DailyLoanStats
+
+    @classmethod
+    def last_day(cls):
+        return cls.model.objects.order_by('-date').values_list('date', flat=True).first()
+
+    @classmethod
+    def first_loan_date(cls):
+        dates = [model.objects.aggregate(first=Min('borrowed_date'))['first'] for model in LOAN_MODELS]
+        return min((date for date in dates if date is not None), default=None)
+
+    @classmethod
+    def rebuild_from(cls, since):
+        # Replaces the rows from the day of `since` (a start of day) onwards
+        counts = defaultdict(lambda: [0, 0])
+        for model in LOAN_MODELS:
+            for slot, field in enumerate(('borrowed_date', 'returned_date')):
+                for row in count_by_day(model, field, since):
+                    counts[row['day']][slot] += row['count']
+        cls.model.objects.filter(date__gte=since.date()).delete()
+        cls.model.objects.bulk_create(
+            [cls.model(date=day, borrowed=borrowed, returned=returned) for day, (borrowed, returned) in counts.items()]
+        )
+
+    @classmethod
+    def in_range(cls, start, end):
+        return cls.model.objects.filter(date__range=(start, end)).values('date', 'borrowed', 'returned')
+
+
+class BookDailyLoanStatsRepository(BaseRepository):
+    model = BookDailyLoanStats
+
+    @classmethod
+    def rebuild_from(cls, since):
+        counts = defaultdict(int)
+        for model in LOAN_MODELS:
+            for row in count_by_day(model, 'borrowed_date', since, 'book_id'):
+                counts[row['day'], row['book_id']] += row['count']
+        cls.model.objects.filter(date__gte=since.date()).delete()
+        cls.model.objects.bulk_create(
+            [cls.model(date=day, book_id=book_id, borrowed=count) for (day, book_id), count in counts.items()],
+            batch_size=2000,
+        )
+
+    @classmethod
+    def most_borrowed(cls, start, end, limit):
+        return (
+            cls.model.objects.filter(date__range=(start, end))
+            .values('book_id', 'book__title', 'book__author', 'book__isbn')
+            .annotate(borrowed=Sum('borrowed'))
+            .order_by('-borrowed', 'book_id')[:limit]
+        )
+
@@ -1,5 +1,56 @@
+from django.db.models import BooleanField, ExpressionWrapper, F
 from .base_repository import BaseRepository
 from ..models import User
+from ..policies import borrowing_rules, may_borrow
 
 class UserRepository(BaseRepository):
-    model = User
\ No newline at end of file
+    model = User
+
+    @classmethod
+    def existing_usernames(cls, usernames):
+        return set(cls.model.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+    @classmethod
+    def update_claims(cls, instance, **kwargs):
+        # Saves kwargs together with a new claims_version, so tokens issued before the change are no
+        # longer trusted. The attribute is deferred afterwards and reloads on first access.
+        cls.update(instance, **kwargs, claims_version=F('claims_version') + 1)
+        del instance.claims_version
+        return instance
+
+    @classmethod
+    def update_matching(cls, queryset, **changes):
+        # One UPDATE for every user in queryset, bumping claims_version in the same statement
+        return queryset.update(**changes, claims_version=F('claims_version') + 1)
+
+    @classmethod
+    def update_many(cls, user_ids, **changes):
+        # One UPDATE for the whole batch; returns the ids that were present
+        matched = list(cls.model.objects.filter(id__in=user_ids).select_for_update().values_list('id', flat=True))
+        if matched:
+            cls.update_matching(cls.model.objects.filter(id__in=matched), **changes)
+        return matched
+
+    @classmethod
+    def most_active_borrowers(cls, limit):
+        return (
+            cls.model.objects.filter(active_loans__gt=0)
+            .values('id', 'username', 'active_loans')
+            .order_by('-active_loans', 'id')[:limit]
+        )
+
+    @classmethod
+    def lock_borrower(cls, user_id):
+        # Conditional UPDATE that matches only when the user passes the borrowing policy, and keeps
+        # their row locked until the end of the transaction. A concurrent borrow by the same user
+        # waits for the lock, then re-checks the policy against the counters the first one left.
+        return cls.model.objects.filter(may_borrow(), id=user_id).update(active_loans=F('active_loans')) == 1
+
+    @classmethod
+    def failed_borrowing_rules(cls, user_id):
+        # Names of the borrowing rules the user fails, evaluated in one query
+        rules = borrowing_rules()
+        row = cls.model.objects.filter(id=user_id).values(
+            **{name: ExpressionWrapper(rule, output_field=BooleanField()) for name, rule in rules.items()}
+        ).first()
+        return [name for name in rules if row is not None and not row[name]]
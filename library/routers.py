@@ -0,0 +1,55 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+class DatabasePin:
+    # Per-request routing state, set up by PrimaryPinningMiddleware
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+current_database_pin = ContextVar('library_database_pin', default=None)
+
+
+def pin_to_primary():
+    pin = current_database_pin.get()
+    if pin is not None:
+        pin.pinned = True
+
+
+def read_alias():
+    # Database for reads that may trail the primary by up to DATABASE_REPLICA_LAG seconds. A request
+    # sticks to one replica, so its queries see the same snapshot. Pinned requests, and anything
+    # outside a request (commands, the worker), read from the primary.
+    pin = current_database_pin.get()
+    if pin is None or pin.pinned or not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS
+    if pin.replica is None:
+        pin.replica = random.choice(settings.DATABASE_REPLICAS)
+    return pin.replica
+
+
+class PrimaryReplicaRouter:
+    # Reads only go to a replica when a service asks for read_alias(); everything else, and every
+    # write, uses the primary. A write pins the rest of its request there, so it reads its own writes.
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db  # Related rows come from the same database
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin = current_database_pin.get()
+        if pin is not None:
+            pin.pinned = pin.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the same rows
+        return True
@@ -0,0 +1,11 @@
+from django.urls import path
+from ..views.async_views import AsyncBookListCreateView, AsyncBookDetailView, AsyncBorrowBookView, AsyncReturnBookView
+from ..views.auth_views import AsyncLoginView
+
+urlpatterns = [
+    path('auth/login/', AsyncLoginView.as_view(), name='async-login'),
+    path('books/', AsyncBookListCreateView.as_view(), name='async-book-list-create'),
+    path('books/<int:book_id>/', AsyncBookDetailView.as_view(), name='async-book-detail'),
+    path('books/<int:book_id>/borrow/', AsyncBorrowBookView.as_view(), name='async-borrow-book'),
+    path('books/<int:book_id>/return/', AsyncReturnBookView.as_view(), name='async-return-book'),
+]
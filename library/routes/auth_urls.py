@@ -1,7 +1,8 @@
 from django.urls import path
-from ..views.auth_views import UserRegistrationView, CustomTokenObtainPairView
+from ..views.auth_views import UserRegistrationView, CustomTokenObtainPairView, AsyncLoginView
 
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('login/', CustomTokenObtainPairView.as_view(), name='login'),
+    path('login/async/', AsyncLoginView.as_view(), name='login-async'),
 ]
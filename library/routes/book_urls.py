@@ -1,10 +1,15 @@
 from django.urls import path
-from ..views.book_views import BookListCreateView, BookDetailView
+from ..views.book_views import BookListCreateView, BookDetailView, BookImportView, BookExportView, CatalogueCacheStatsView
 from ..views.loan_views import BorrowBookView, ReturnBookView
+from ..views.hold_views import PlaceHoldView
 
 urlpatterns = [
     path('', BookListCreateView.as_view(), name='book-list-create'),
+    path('import/', BookImportView.as_view(), name='book-import'),
+    path('export/', BookExportView.as_view(), name='book-export'),
+    path('cache-stats/', CatalogueCacheStatsView.as_view(), name='book-cache-stats'),
     path('<int:book_id>/', BookDetailView.as_view(), name='book-detail'),
     path('<int:book_id>/borrow/', BorrowBookView.as_view(), name='borrow-book'),
     path('<int:book_id>/return/', ReturnBookView.as_view(), name='return-book'),
+    path('<int:book_id>/hold/', PlaceHoldView.as_view(), name='place-hold'),
 ]
@@ -0,0 +1,7 @@
+from django.urls import path
+from ..views.hold_views import HoldListView, HoldDetailView
+
+urlpatterns = [
+    path('', HoldListView.as_view(), name='hold-list'),
+    path('<int:hold_id>/', HoldDetailView.as_view(), name='hold-detail'),
+]
@@ -1,6 +1,7 @@
 from django.urls import path
-from ..views.loan_views import LoanListView
+from ..views.loan_views import LoanListView, LoanExportView
 
 urlpatterns = [
     path('', LoanListView.as_view(), name='loan-list'),
+    path('export/', LoanExportView.as_view(), name='loan-export'),
 ]
@@ -0,0 +1,8 @@
+from django.urls import path
+from ..views.stats_views import ActiveBorrowersView, DailyLoanStatsView, MostBorrowedBooksView
+
+urlpatterns = [
+    path('loans/daily/', DailyLoanStatsView.as_view(), name='stats-daily-loans'),
+    path('books/most-borrowed/', MostBorrowedBooksView.as_view(), name='stats-most-borrowed-books'),
+    path('users/active-loans/', ActiveBorrowersView.as_view(), name='stats-active-borrowers'),
+]
@@ -1,7 +1,8 @@
 from django.urls import path
 from ..views.user_views import (
     UserListView, UserDetailView, UserProfileView,
-    UserDeactivateView, UserReactivateView
+    UserDeactivateView, UserReactivateView,
+    UserBulkCreateView, UserBulkDeactivateView, UserBulkReactivateView, UserBulkRoleView
 )
 
 urlpatterns = [
@@ -10,4 +11,8 @@ urlpatterns = [
     path('<int:user_id>/deactivate/', UserDeactivateView.as_view(), name='user-deactivate'),
     path('<int:user_id>/reactivate/', UserReactivateView.as_view(), name='user-reactivate'),
     path('profile/', UserProfileView.as_view(), name='user-profile'),
+    path('bulk/', UserBulkCreateView.as_view(), name='user-bulk-create'),
+    path('bulk/deactivate/', UserBulkDeactivateView.as_view(), name='user-bulk-deactivate'),
+    path('bulk/reactivate/', UserBulkReactivateView.as_view(), name='user-bulk-reactivate'),
+    path('bulk/role/', UserBulkRoleView.as_view(), name='user-bulk-role'),
 ]
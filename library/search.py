@@ -0,0 +1,245 @@
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+SEARCH_CONFIG = 'english'
+# Relative weight of title and author matches (PostgreSQL 'A'/'B' labels, FTS5 bm25 weights)
+TITLE_WEIGHT = 10.0
+AUTHOR_WEIGHT = 5.0
+DEFAULT_SIMILARITY = 0.3  # pg_trgm's default similarity_threshold
+FUZZY_INDEX_MAX_AGE = 300
+FUZZY_MAX_RESULTS = 500
+
+POSTGRES_SEARCH_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION library_book_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.{SEARCH_CONFIG}', coalesce(NEW.author, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS library_book_search_vector_trigger ON library_book",
+    """
+    CREATE TRIGGER library_book_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, author ON library_book
+    FOR EACH ROW EXECUTE FUNCTION library_book_search_vector_update()
+    """,
+    "UPDATE library_book SET title = title WHERE search_vector IS NULL",
+    "CREATE INDEX IF NOT EXISTS library_book_search_vector_idx ON library_book USING gin (search_vector)",
+]
+
+SQLITE_SEARCH_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS library_book_fts USING fts5(
+        title, author, content='library_book', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS library_book_fts_insert AFTER INSERT ON library_book BEGIN
+        INSERT INTO library_book_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS library_book_fts_delete AFTER DELETE ON library_book BEGIN
+        INSERT INTO library_book_fts(library_book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS library_book_fts_update AFTER UPDATE OF title, author ON library_book BEGIN
+        INSERT INTO library_book_fts(library_book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO library_book_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END
+    """,
+    "INSERT INTO library_book_fts(library_book_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_TRIGRAM_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS library_book_title_trgm_idx ON library_book USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS library_book_author_trgm_idx ON library_book USING gin (author gin_trgm_ops)",
+    # The title/author filters are icontains, which Django compiles to UPPER(column::text) LIKE
+    # UPPER(...); only an index on that same expression can serve them
+    "CREATE INDEX IF NOT EXISTS library_book_title_upper_trgm_idx "
+    "ON library_book USING gin ((UPPER(title::text)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS library_book_author_upper_trgm_idx "
+    "ON library_book USING gin ((UPPER(author::text)) gin_trgm_ops)",
+]
+
+
+def install_search_support(connection):
+    # Idempotent: also re-run after every migrate on SQLite, where table rebuilds drop the triggers
+    statements = {
+        'postgresql': POSTGRES_SEARCH_SQL,
+        'sqlite': SQLITE_SEARCH_SQL,
+    }.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_trigram_support(connection):
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        # Managed databases may refuse CREATE EXTENSION; fuzzy search then uses BookTrigramIndex
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for statement in POSTGRES_TRIGRAM_SQL:
+                cursor.execute(statement)
+    except DatabaseError:
+        pass
+
+
+_trigram_support = {}
+
+
+def has_trigram_support(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    if connection.alias not in _trigram_support:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_support[connection.alias] = cursor.fetchone() is not None
+    return _trigram_support[connection.alias]
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def search_books(queryset, query):
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        # Every term is matched as a prefix, so "tolk ring" finds "Tolkien ... Rings"
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-search_rank', 'title', 'id')
+
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        matching_ids = RawSQL('SELECT rowid FROM library_book_fts WHERE library_book_fts MATCH %s', (match,))
+        rank = RawSQL(
+            'SELECT -bm25(library_book_fts, %s, %s) FROM library_book_fts '
+            'WHERE library_book_fts MATCH %s AND rowid = library_book.id',
+            (TITLE_WEIGHT, AUTHOR_WEIGHT, match),
+        )
+        return queryset.filter(id__in=matching_ids).annotate(
+            search_rank=rank
+        ).order_by('-search_rank', 'title', 'id')
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(author__icontains=term)
+    return queryset.filter(condition)
+
+
+def trigrams(text):
+    # Same extraction as pg_trgm: lower-cased alphanumeric words padded with
+    # two leading spaces and one trailing space.
+    grams = set()
+    for word in re.findall(r'[^\W_]+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class BookTrigramIndex:
+    # In-process stand-in for the pg_trgm GIN indexes on backends without the extension.
+    # Built lazily from the Book table and rebuilt when invalidated or older than max_age.
+    def __init__(self, max_age=FUZZY_INDEX_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._postings = None
+        self._sizes = None
+        self._built_at = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+
+    def _build(self):
+        from .models import Book
+
+        postings = defaultdict(list)
+        sizes = {}
+        rows = Book.objects.order_by().values_list('id', 'title', 'author').iterator(chunk_size=2000)
+        for book_id, title, author in rows:
+            for column, text in enumerate((title, author)):
+                grams = trigrams(text)
+                sizes[book_id, column] = len(grams)
+                for gram in grams:
+                    postings[gram].append((book_id, column))
+        return postings, sizes
+
+    def _current(self):
+        with self._lock:
+            if self._postings is None or time.monotonic() - self._built_at > self.max_age:
+                self._postings, self._sizes = self._build()
+                self._built_at = time.monotonic()
+            return self._postings, self._sizes
+
+    def lookup(self, query, threshold, limit=FUZZY_MAX_RESULTS):
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        postings, sizes = self._current()
+
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for key in postings.get(gram, ()):
+                shared[key] += 1
+
+        scores = {}
+        for (book_id, column), common in shared.items():
+            similarity = common / (len(query_grams) + sizes[book_id, column] - common)
+            if similarity >= threshold and similarity > scores.get(book_id, 0):
+                scores[book_id] = similarity
+        return sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+
+book_trigram_index = BookTrigramIndex()
+
+
+def fuzzy_search_books(queryset, query, threshold=DEFAULT_SIMILARITY):
+    query = query.strip()
+    if not query:
+        return queryset
+
+    connection = connections[queryset.db]
+    if has_trigram_support(connection):
+        # The % operator is what the GIN indexes serve; it reads the session threshold
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT set_limit(%s)', [threshold])
+        return queryset.filter(
+            Q(title__trigram_similar=query) | Q(author__trigram_similar=query)
+        ).annotate(
+            similarity=Greatest(TrigramSimilarity('title', query), TrigramSimilarity('author', query))
+        ).filter(similarity__gte=threshold).order_by('-similarity', 'title', 'id')
+
+    matches = book_trigram_index.lookup(query, threshold)
+    if not matches:
+        return queryset.none()
+    return queryset.filter(id__in=[book_id for book_id, _ in matches]).annotate(
+        similarity=Case(
+            *[When(id=book_id, then=Value(score)) for book_id, score in matches],
+            output_field=FloatField(),
+        )
+    ).order_by('-similarity', 'title', 'id')
@@ -1,7 +1,15 @@
 from rest_framework import serializers
 from ..models import Book
+from .sparse import SparseFieldsetMixin
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = ['id', 'title', 'author', 'isbn', 'page_count', 'availability']
\ No newline at end of file
+        fields = ['id', 'title', 'author', 'isbn', 'page_count', 'availability', 'total_copies', 'available_copies']
+        # Circulation state is maintained by borrowing and returning; admins set total_copies
+        read_only_fields = ['availability', 'available_copies']
+
+class BookImportSerializer(BookSerializer):
+    class Meta(BookSerializer.Meta):
+        # Existing ISBNs are upserted, so skip the per-row uniqueness query
+        extra_kwargs = {'isbn': {'validators': []}}
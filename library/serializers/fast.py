@@ -0,0 +1,49 @@
+from rest_framework import serializers
+from .book_serializers import BookSerializer
+from .user_serializers import UserSerializer
+
+# Read-only list path: rows come straight from QuerySet.values() and are shaped like the
+# default BookSerializer/LoanSerializer output without instantiating models or fields.
+BOOK_FIELDS = tuple(BookSerializer.Meta.fields)
+USER_FIELDS = tuple(UserSerializer.Meta.fields)
+LOAN_USER_COLUMNS = tuple((field, f'user__{field}') for field in USER_FIELDS)
+LOAN_BOOK_COLUMNS = tuple((field, f'book__{field}') for field in BOOK_FIELDS)
+LOAN_COLUMNS = (
+    'id',
+    *(column for _, column in LOAN_USER_COLUMNS),
+    *(column for _, column in LOAN_BOOK_COLUMNS),
+    'borrowed_date',
+    'returned_date',
+    'due_date',
+)
+
+# Same formatting (DATETIME_FORMAT, time zone, trailing Z) as the serializers' DateTimeField
+_datetime_field = serializers.DateTimeField()
+
+
+def book_values(queryset):
+    return queryset.values(*BOOK_FIELDS)
+
+
+def book_rows(rows):
+    # Every BookSerializer field is a plain column, so values() rows are already the output
+    return list(rows)
+
+
+def loan_values(queryset):
+    return queryset.values(*LOAN_COLUMNS)
+
+
+def loan_rows(rows):
+    to_datetime = _datetime_field.to_representation
+    return [
+        {
+            'id': row['id'],
+            'user': {field: row[column] for field, column in LOAN_USER_COLUMNS},
+            'book': {field: row[column] for field, column in LOAN_BOOK_COLUMNS},
+            'borrowed_date': to_datetime(row['borrowed_date']),
+            'returned_date': to_datetime(row['returned_date']),
+            'due_date': to_datetime(row['due_date']),
+        }
+        for row in rows
+    ]
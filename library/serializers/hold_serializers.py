@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from ..models import Hold
+
+class HoldSerializer(serializers.ModelSerializer):
+    # Place in the book's queue, set by HoldService on waiting holds
+    position = serializers.IntegerField(read_only=True, default=None)
+
+    class Meta:
+        model = Hold
+        fields = ['id', 'user', 'book', 'priority', 'status', 'position', 'created_at', 'fulfilled_at', 'loan_id']
+        read_only_fields = ['user', 'book', 'status', 'created_at', 'fulfilled_at', 'loan_id']
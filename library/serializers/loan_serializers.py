@@ -2,14 +2,16 @@ from rest_framework import serializers
 from ..models import Loan, Book
 from .user_serializers import UserSerializer
 from .book_serializers import BookSerializer
+from .sparse import SparseFieldsetMixin
 
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     book = BookSerializer(read_only=True)
+    expandable_fields = ('user', 'book')
 
     class Meta:
         model = Loan
-        fields = ['id', 'user', 'book', 'borrowed_date', 'returned_date']
+        fields = ['id', 'user', 'book', 'borrowed_date', 'returned_date', 'due_date']
 
 class LoanCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,83 @@
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
+
+
+def sparse_fieldset(request):
+    # ?fields=id,book.title&expand=user -> serializer kwargs; {} keeps the full default shape
+    shape = {}
+    for param in (FIELDS_QUERY_PARAM, EXPAND_QUERY_PARAM):
+        value = request.query_params.get(param, '')
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        if names:
+            shape[param] = names
+    return shape
+
+
+class SparseFieldsetMixin:
+    # Accepts `fields` (names to keep, dotted for nested ones) and `expand` (relations to nest).
+    # Once either is given, relations that are not expanded render as their primary key, and
+    # optimize_queryset() loads only the columns and joins the kept fields need.
+    expandable_fields = ()
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = fields is not None or expand is not None
+        if self.sparse:
+            self.shape(fields, expand or ())
+
+    def shape(self, fields, expand):
+        nested = {}
+        keep = None
+        if fields is not None:
+            keep = set()
+            for path in fields:
+                name, _, rest = path.partition('.')
+                keep.add(name)
+                if rest:
+                    nested.setdefault(name, []).append(rest)
+        expand = set(expand) | set(nested)
+
+        errors = {}
+        unknown = (keep or set()) - set(self.fields)
+        if unknown:
+            errors[FIELDS_QUERY_PARAM] = [f"Unknown field(s): {', '.join(sorted(unknown))}."]
+        unknown = expand - set(self.expandable_fields)
+        if unknown:
+            errors[EXPAND_QUERY_PARAM] = [f"Cannot expand: {', '.join(sorted(unknown))}."]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        for name in list(self.fields):
+            if keep is not None and name not in keep:
+                self.fields.pop(name)
+            elif name in self.expandable_fields:
+                if name in expand:
+                    self.fields[name].sparse = True
+                    self.fields[name].shape(nested.get(name), ())
+                else:
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    def selected_columns(self, prefix=''):
+        columns, related = [], []
+        for field in self.fields.values():
+            path = prefix + field.source
+            columns.append(path)
+            if isinstance(field, SparseFieldsetMixin):
+                related.append(path)
+                nested_columns, nested_related = field.selected_columns(path + '__')
+                columns += nested_columns
+                related += nested_related
+        return columns, related
+
+    def optimize_queryset(self, queryset, always=()):
+        # `always` lists extra columns the caller reads, e.g. the keyset pagination ordering
+        if not self.sparse:
+            return queryset
+        columns, related = self.selected_columns()
+        always = [name.lstrip('-') for name in always]
+        queryset = queryset.select_related(None)
+        if related:  # select_related() without arguments would follow every foreign key
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns, *always)
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+# Date range of the stats endpoints when none is given, ending today
+DEFAULT_STATS_DAYS = 30
+
+class StatsQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+    def validate(self, data):
+        data['end'] = data.get('end') or timezone.localdate()
+        data['start'] = data.get('start') or data['end'] - timedelta(days=DEFAULT_STATS_DAYS - 1)
+        if data['start'] > data['end']:
+            raise serializers.ValidationError("start must not be after end.")
+        return data
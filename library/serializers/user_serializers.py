@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from ..models import User
+from .sparse import SparseFieldsetMixin
 
-class UserSerializer(serializers.ModelSerializer):
+MAX_BULK_CREATE = 500
+MAX_BULK_IDS = 10000
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'phone_number', 'role']
@@ -40,4 +44,27 @@ class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'phone_number', 'role', 'is_active']
-        read_only_fields = ['id', 'role', 'is_active']  # Users cannot change these fields
\ No newline at end of file
+        read_only_fields = ['id', 'role', 'is_active']  # Users cannot change these fields
+
+class UserBulkCreateItemSerializer(UserRegistrationSerializer):
+    class Meta(UserRegistrationSerializer.Meta):
+        # Usernames are checked for the whole batch in one query
+        extra_kwargs = {'username': {'validators': []}}
+
+class UserBulkCreateSerializer(serializers.Serializer):
+    # Items are validated one by one by the service so each gets its own outcome
+    users = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=MAX_BULK_CREATE)
+
+class UserBulkActionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_BULK_IDS, required=False)
+    filters = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError("Provide either ids or filters.")
+        if 'filters' in attrs and not attrs['filters']:
+            raise serializers.ValidationError({"filters": "At least one filter is required."})
+        return attrs
+
+class UserBulkRoleSerializer(UserBulkActionSerializer):
+    role = serializers.ChoiceField(choices=User._meta.get_field('role').choices)
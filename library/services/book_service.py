@@ -1,23 +1,59 @@
+from django.db import transaction
 from ..repositories.book_repository import BookRepository
+from ..routers import read_alias
+from .hold_service import HoldService
+from ..search import book_trigram_index
+from ..serializers.book_serializers import BookImportSerializer
+from ..utils.response_cache import bump_catalogue_version
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_IMPORT_ERRORS = 1000
+# Circulation state and stock of existing titles are left alone when an import updates them
+IMPORT_UPDATE_FIELDS = ['title', 'author', 'page_count']
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('author', 'author'),
+    ('isbn', 'isbn'),
+    ('page_count', 'page_count'),
+    ('availability', 'availability'),
+    ('total_copies', 'total_copies'),
+    ('available_copies', 'available_copies'),
+]
 
 class BookService:
     @staticmethod
     def get_all_books():
-        return BookRepository.get_all()
+        return BookRepository.get_all().using(read_alias())
 
     @staticmethod
     def get_book_by_id(book_id):
-        return BookRepository.get_by_id(book_id)
+        return BookRepository.get_by_id(book_id, using=read_alias())
 
     @staticmethod
     def create_book(**kwargs):
-        return BookRepository.create(**kwargs)
+        total_copies = kwargs.get('total_copies', 1)
+        book = BookRepository.create(**kwargs, available_copies=total_copies, availability=total_copies > 0)
+        book_trigram_index.invalidate()
+        bump_catalogue_version()
+        return book
 
     @staticmethod
     def update_book(book_id, **kwargs):
         book = BookRepository.get_by_id(book_id)
         if book:
-            return BookRepository.update(book, **kwargs)
+            total_copies = kwargs.pop('total_copies', None)
+            with transaction.atomic():
+                if total_copies is not None and total_copies != book.total_copies:
+                    if not BookRepository.set_total_copies(book_id, total_copies):
+                        raise ValueError("Cannot reduce total copies below the number on loan.")
+                    if total_copies > book.total_copies:
+                        HoldService.allocate_available(book_id)  # New copies go to the hold queue first
+                    book.refresh_from_db(fields=['total_copies', 'available_copies', 'availability'])
+                book = BookRepository.update(book, **kwargs)
+            book_trigram_index.invalidate()
+            bump_catalogue_version()
+            return book
         return None
 
     @staticmethod
@@ -25,5 +61,49 @@ class BookService:
         book = BookRepository.get_by_id(book_id)
         if book:
             BookRepository.delete(book)
+            book_trigram_index.invalidate()
+            bump_catalogue_version()
             return True
-        return False
\ No newline at end of file
+        return False
+
+    @staticmethod
+    def import_books(rows, batch_size=IMPORT_BATCH_SIZE):
+        report = {'processed': 0, 'imported': 0, 'failed': 0, 'errors': []}
+        batch = {}
+
+        def flush():
+            with transaction.atomic():
+                BookRepository.bulk_upsert(
+                    list(batch.values()),
+                    unique_fields=['isbn'],
+                    update_fields=IMPORT_UPDATE_FIELDS,
+                )
+            report['imported'] += len(batch)
+            batch.clear()
+
+        for line, row, error in rows:
+            report['processed'] += 1
+            errors = {'non_field_errors': [error]} if error else None
+            if errors is None:
+                serializer = BookImportSerializer(data=row)
+                if serializer.is_valid():
+                    # Keyed on ISBN: a batch may not upsert the same row twice
+                    data = serializer.validated_data
+                    total_copies = data.get('total_copies', 1)
+                    batch[data['isbn']] = BookRepository.model(
+                        **data, available_copies=total_copies, availability=total_copies > 0
+                    )
+                    if len(batch) >= batch_size:
+                        flush()
+                    continue
+                errors = serializer.errors
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_IMPORT_ERRORS:
+                report['errors'].append({'line': line, 'errors': errors})
+
+        if batch:
+            flush()
+        if report['imported']:
+            book_trigram_index.invalidate()
+            bump_catalogue_version()
+        return report
\ No newline at end of file
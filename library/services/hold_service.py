@@ -0,0 +1,78 @@
+from django.db import transaction
+from ..repositories.book_repository import BookRepository
+from ..repositories.hold_repository import HoldRepository
+from ..repositories.loan_repository import LoanRepository
+from ..repositories.user_repository import UserRepository
+from ..models import Book
+
+class HoldService:
+    @staticmethod
+    def place_hold(user, book_id):
+        # Returns (hold, created); placing the same hold twice returns the existing one
+        with transaction.atomic():
+            # return_book releases under the same row lock, so a copy cannot slip past a new hold
+            available_copies = BookRepository.lock(book_id)
+            if available_copies is None:
+                raise Book.DoesNotExist("Book not found.")
+            if available_copies > 0:
+                raise ValueError("Book is available; borrow it instead.")
+            hold = HoldRepository.get_waiting(user, book_id)
+            created = hold is None
+            if created:
+                hold = HoldRepository.create(user=user, book_id=book_id)
+        hold.position = HoldRepository.position(hold)
+        return hold, created
+
+    @staticmethod
+    def get_hold(hold_id):
+        hold = HoldRepository.get_by_id(hold_id)
+        if hold and hold.status == 'waiting':
+            hold.position = HoldRepository.position(hold)
+        return hold
+
+    @staticmethod
+    def get_user_holds(user):
+        holds = list(HoldRepository.get_queryset().filter(user=user, status='waiting'))
+        for hold in holds:
+            hold.position = HoldRepository.position(hold)
+        return holds
+
+    @staticmethod
+    def set_priority(hold, priority):
+        hold = HoldRepository.update(hold, priority=priority)
+        if hold.status == 'waiting':
+            hold.position = HoldRepository.position(hold)
+        return hold
+
+    @staticmethod
+    def cancel_hold(hold):
+        return HoldRepository.cancel(hold)
+
+    @staticmethod
+    def next_holder(book_id):
+        # The next waiting hold whose holder may borrow. Their row stays locked as in borrow_book,
+        # so a borrow of their own cannot take them past the loan limit before the loan is counted.
+        skipped = []
+        while True:
+            hold = HoldRepository.next_waiting(book_id, exclude=skipped)
+            if hold is None or UserRepository.lock_borrower(hold.user_id):
+                return hold
+            skipped.append(hold.id)  # Reached the limit since the queue was read; keeps their place
+
+    @staticmethod
+    def fulfil(hold):
+        # Turns the hold into a loan for a copy the caller already took off the shelf
+        loan = LoanRepository.create(user_id=hold.user_id, book_id=hold.book_id)
+        HoldRepository.fulfil(hold, loan)
+        return loan
+
+    @staticmethod
+    def allocate_available(book_id):
+        # Hands copies on the shelf to waiting holders, e.g. after the stock grew. Call it inside
+        # the transaction that made the copies available.
+        loans = []
+        while True:
+            hold = HoldService.next_holder(book_id)
+            if hold is None or not BookRepository.claim(book_id):
+                return loans
+            loans.append(HoldService.fulfil(hold))
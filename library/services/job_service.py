@@ -0,0 +1,55 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from ..models import Job
+from ..repositories.job_repository import JobRepository
+
+logger = logging.getLogger('library.jobs')
+
+# Job name -> handler called with the job's payload as keyword arguments, see JobService.register
+JOB_HANDLERS = {}
+# First retry delay in seconds; doubled on every further attempt
+RETRY_DELAY = 60
+
+class JobService:
+    @staticmethod
+    def register(name, handler):
+        JOB_HANDLERS[name] = handler
+
+    @staticmethod
+    def enqueue(name, payload=None, run_at=None, key=''):
+        JobService.enqueue_batch(name, [payload or {}], run_at=run_at, key=key)
+
+    @staticmethod
+    def enqueue_batch(name, payloads, run_at=None, key=''):
+        run_at = run_at or timezone.now()
+        JobRepository.enqueue_many([Job(name=name, payload=payload, run_at=run_at, key=key) for payload in payloads])
+
+    @staticmethod
+    def run_next():
+        # Runs the next due job and returns it, or None when nothing is due. The job row stays
+        # locked while the handler runs, so a worker that dies mid-job leaves it pending for
+        # another worker, and the handler's own writes commit together with the job's removal.
+        now = timezone.now()
+        with transaction.atomic():
+            job = JobRepository.claim_next(now)
+            if job is None:
+                return None
+            # Running jobs are outside the one-pending-per-key constraint, so a job can enqueue its successor
+            JobRepository.update(job, status='running', attempts=job.attempts + 1)
+            try:
+                with transaction.atomic():
+                    JOB_HANDLERS[job.name](**job.payload)
+            except Exception as e:
+                logger.exception("Job %s (%s) failed on attempt %s", job.id, job.name, job.attempts)
+                if job.attempts >= settings.JOB_MAX_ATTEMPTS or (job.key and JobRepository.has_pending(job.key)):
+                    JobRepository.update(job, status='failed', last_error=repr(e))
+                else:
+                    retry_at = now + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+                    JobRepository.update(job, status='pending', run_at=retry_at, last_error=repr(e))
+            else:
+                JobRepository.delete(job)
+        return job
@@ -1,12 +1,36 @@
 from ..repositories.loan_repository import LoanRepository
 from ..repositories.book_repository import BookRepository
+from ..repositories.archived_loan_repository import ArchivedLoanRepository
+from ..repositories.user_repository import UserRepository
+from .hold_service import HoldService
 from ..models import Book
+from ..policies import REFUSALS
+from ..routers import read_alias
+from ..utils.response_cache import bump_catalogue_version
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Value
 from django.utils import timezone
 
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('book_id', 'book_id'),
+    ('book_title', 'book__title'),
+    ('book_isbn', 'book__isbn'),
+    ('borrowed_date', 'borrowed_date'),
+    ('returned_date', 'returned_date'),
+    ('due_date', 'due_date'),
+]
+ARCHIVE_BATCH_SIZE = 5000
+# LoanFilter parameters that can reach back into archived history
+ARCHIVE_DATE_FILTERS = ('borrowed_date_after', 'borrowed_date_before', 'returned_date')
+
 class LoanService:
     @staticmethod
     def get_all_loans():
-        return LoanRepository.get_all()
+        return LoanRepository.get_all().using(read_alias())
 
     @staticmethod
     def get_loan_by_id(loan_id):
@@ -33,21 +57,103 @@ class LoanService:
 
     @staticmethod
     def borrow_book(user, book_id):
-        book = BookRepository.get_by_id(book_id)
-        if book.availability:
-            loan = LoanRepository.create(user=user, book=book)
-            book.availability = False
-            book.save()
-            return loan
-        return None
+        # The transaction only spans the claim and the insert, so the row locks are held briefly.
+        # The book is claimed before the user row is locked, the same order as the loan insert
+        # trigger and hold fulfilment take them in. The policy check holds the user row until the
+        # insert's trigger has counted the loan, so concurrent borrows cannot pass the limit.
+        with transaction.atomic():
+            if not BookRepository.claim(book_id):
+                if not BookRepository.exists(book_id):
+                    raise Book.DoesNotExist("Book not found.")
+                refused = UserRepository.failed_borrowing_rules(user.id)
+                if refused:
+                    raise PermissionDenied(REFUSALS[refused[0]])
+                return None
+            if not UserRepository.lock_borrower(user.id):
+                # Raising rolls the claim back
+                refused = UserRepository.failed_borrowing_rules(user.id)
+                raise PermissionDenied(REFUSALS[refused[0]] if refused else REFUSALS['account'])
+            loan = LoanRepository.create(user=user, book_id=book_id)
+        bump_catalogue_version()  # After commit, so readers cannot re-cache the old availability
+        loan.book = BookRepository.get_by_id(book_id)
+        return loan
 
     @staticmethod
     def return_book(user, book_id):
-        loan = LoanRepository.model.objects.filter(user=user, book_id=book_id, returned_date__isnull=True).first()
+        loan = LoanRepository.get_active_loan(user, book_id)
         if loan:
-            loan.returned_date = timezone.now()
-            loan.book.availability = True
-            loan.book.save()
-            loan.save()
+            returned_date = timezone.now()
+            with transaction.atomic():
+                if not LoanRepository.mark_returned(loan.id, returned_date):
+                    return None  # Returned concurrently
+                # Releasing locks the book row, so a hold placed concurrently (see HoldService.place_hold)
+                # is either committed and found below, or sees this copy on the shelf
+                released = BookRepository.release(book_id)
+                hold = HoldService.next_holder(book_id) if released else None
+                if hold is not None and BookRepository.claim(book_id):
+                    # The copy goes straight to the next holder instead of back on the shelf
+                    HoldService.fulfil(hold)
+                    released = False
+            bump_catalogue_version()
+            loan.returned_date = returned_date
+            if released:
+                loan.book.available_copies += 1
+                loan.book.availability = True
             return loan
-        return None
\ No newline at end of file
+        return None
+    @staticmethod
+    def get_archived_loans():
+        return ArchivedLoanRepository.get_all().using(read_alias())
+
+    @staticmethod
+    def needs_archive(filters):
+        # `filters` is LoanFilter's cleaned data. Archived loans are all returned and borrowed no
+        # later than the newest archived loan, so only date filters reaching that far (or an
+        # explicit include_archived) need the archive table.
+        if filters.get('is_active'):
+            return False
+        if not filters.get('include_archived') and not any(filters.get(name) for name in ARCHIVE_DATE_FILTERS):
+            return False
+        newest = ArchivedLoanRepository.newest_borrowed_date()
+        if newest is None:
+            return False
+        borrowed_after = filters.get('borrowed_date_after')
+        return borrowed_after is None or borrowed_after <= newest
+
+    @staticmethod
+    def get_loan_history(loans, archived_loans):
+        # Both tables in list order; rows are (id, borrowed_date, archived) keys for fetch_history_page
+        live = loans.order_by().values('id', 'borrowed_date', archived=Value(False))
+        archived = archived_loans.order_by().values('id', 'borrowed_date', archived=Value(True))
+        return live.union(archived, all=True).order_by('-borrowed_date', 'id')
+
+    @staticmethod
+    def fetch_history_page(page, loans, archived_loans):
+        # Loads a page of get_loan_history() keys from the matching table, keeping the page order.
+        # The querysets may yield instances or values() rows.
+        ids = {False: [], True: []}
+        for key in page:
+            ids[bool(key['archived'])].append(key['id'])
+        found = {}
+        for archived, queryset in ((False, loans), (True, archived_loans)):
+            if ids[archived]:
+                for item in queryset.filter(id__in=ids[archived]):
+                    found[archived, item['id'] if isinstance(item, dict) else item.id] = item
+        return [found[bool(key['archived']), key['id']] for key in page]
+
+    @staticmethod
+    def archive_returned_loans(before, batch_size=ARCHIVE_BATCH_SIZE, export=None):
+        # Moves loans returned before `before` out of library_loan, one transaction per batch.
+        # They go to the ArchivedLoan table, or to export(queryset) when given (e.g. a file).
+        archived = 0
+        while True:
+            with transaction.atomic():
+                loan_ids = LoanRepository.returned_before(before, batch_size)
+                if not loan_ids:
+                    return archived
+                batch = LoanRepository.get_all().filter(id__in=loan_ids)
+                if export is None:
+                    ArchivedLoanRepository.copy_loans(batch)
+                else:
+                    export(batch)
+                archived += LoanRepository.delete_returned(loan_ids, before)
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from ..repositories.loan_repository import LoanRepository
+from ..utils.mail import SharedConnection
+from ..utils.rate_limit import RateLimiter
+from .job_service import JobService
+
+OVERDUE_SCAN_JOB = 'scan_overdue_loans'
+OVERDUE_NOTICE_JOB = 'send_overdue_notice'
+OVERDUE_SCAN_BATCH_SIZE = 1000
+# Shared by every notice job the worker process runs
+email_rate_limiter = RateLimiter()
+email_connection = SharedConnection()
+
+class NotificationService:
+    @staticmethod
+    def schedule_overdue_scan(since=None, run_at=None):
+        # No-op while a scan is already pending
+        payload = {'since': since.isoformat() if since else None}
+        JobService.enqueue(OVERDUE_SCAN_JOB, payload, run_at=run_at, key=OVERDUE_SCAN_JOB)
+
+    @staticmethod
+    def scan_overdue_loans(since=None, batch_size=OVERDUE_SCAN_BATCH_SIZE):
+        # Queues notices for the loans that went overdue since the previous scan, so each loan
+        # is picked up once, then schedules the next scan. Returns the number of loans found.
+        until = timezone.now()
+        since = parse_datetime(since) if since else None
+        found = 0
+        after = None
+        while True:
+            keys = list(LoanRepository.overdue(since, until, after, batch_size))
+            if not keys:
+                break
+            # One job per notice: a failed send is retried on its own, without emailing the others again
+            JobService.enqueue_batch(OVERDUE_NOTICE_JOB, [{'loan_id': loan_id} for _, loan_id in keys])
+            found += len(keys)
+            after = keys[-1]
+        NotificationService.schedule_overdue_scan(
+            since=until, run_at=until + timedelta(seconds=settings.OVERDUE_SCAN_INTERVAL)
+        )
+        return found
+
+    @staticmethod
+    def send_overdue_notice(loan_id):
+        # Loans returned since the scan, and borrowers who opted out, get no email
+        loan = LoanRepository.get_for_notice([loan_id]).first()
+        if loan is None:
+            return 0
+        message = EmailMessage(
+            subject=f"Overdue: {loan.book.title}",
+            body=(
+                f"Hi {loan.user.username},\n\n"
+                f"\"{loan.book.title}\" was due back on {loan.due_date:%d %B %Y}. "
+                f"Please return it as soon as you can.\n"
+            ),
+            to=[loan.user.email],
+        )
+        email_rate_limiter.wait(1, settings.EMAIL_RATE_LIMIT)
+        return email_connection.send(message, settings.EMAIL_BATCH_SIZE)
+
+    @staticmethod
+    def close_connection():
+        email_connection.close()
+
+
+JobService.register(OVERDUE_SCAN_JOB, NotificationService.scan_overdue_loans)
+JobService.register(OVERDUE_NOTICE_JOB, NotificationService.send_overdue_notice)
@@ -0,0 +1,51 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from ..repositories.stats_repository import BookDailyLoanStatsRepository, DailyLoanStatsRepository
+from ..repositories.user_repository import UserRepository
+from ..routers import read_alias
+from .job_service import JobService
+
+STATS_ROLLUP_JOB = 'rollup_loan_stats'
+
+class StatsService:
+    @staticmethod
+    def schedule_rollup(run_at=None):
+        # No-op while a rollup is already pending
+        JobService.enqueue(STATS_ROLLUP_JOB, run_at=run_at, key=STATS_ROLLUP_JOB)
+
+    @staticmethod
+    def first_loan_day():
+        first = DailyLoanStatsRepository.first_loan_date()
+        return timezone.localdate(first) if first else timezone.localdate()
+
+    @staticmethod
+    def rollup_loan_stats(since=None, reschedule=True):
+        # Recounts the daily and per-book rollups from `since` (a date; by default the last day
+        # already rolled up, so each run only reads the latest loans). Run it inside a transaction
+        # so readers never see a half-built day.
+        if since is None:
+            since = DailyLoanStatsRepository.last_day() or StatsService.first_loan_day()
+        start = timezone.make_aware(datetime.combine(since, time.min))  # Days as TruncDate sees them
+        DailyLoanStatsRepository.rebuild_from(start)
+        BookDailyLoanStatsRepository.rebuild_from(start)
+        if reschedule:
+            StatsService.schedule_rollup(run_at=timezone.now() + timedelta(seconds=settings.STATS_ROLLUP_INTERVAL))
+        return since
+
+    @staticmethod
+    def get_daily_loans(start, end):
+        return DailyLoanStatsRepository.in_range(start, end).using(read_alias())
+
+    @staticmethod
+    def get_most_borrowed_books(start, end, limit):
+        return BookDailyLoanStatsRepository.most_borrowed(start, end, limit).using(read_alias())
+
+    @staticmethod
+    def get_most_active_borrowers(limit):
+        # Read from the live User.active_loans counters rather than a rollup
+        return UserRepository.most_active_borrowers(limit).using(read_alias())
+
+
+JobService.register(STATS_ROLLUP_JOB, StatsService.rollup_loan_stats)
@@ -1,4 +1,13 @@
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import IntegrityError, transaction
 from ..repositories.user_repository import UserRepository
+from ..authentication import forget_user_claims
+from ..filters import UserFilter, filter_param_names
+from ..serializers.user_serializers import UserBulkCreateItemSerializer
+from ..utils.hashing import get_hashing_executor
+
+BULK_UPDATE_BATCH_SIZE = 1000
+BULK_CREATE_BATCH_SIZE = 500
 
 class UserService:
     @staticmethod
@@ -17,7 +26,9 @@ class UserService:
     def update_user(user_id, **kwargs):
         user = UserRepository.get_by_id(user_id)
         if user:
-            return UserRepository.update(user, **kwargs)
+            user = UserRepository.update_claims(user, **kwargs)
+            forget_user_claims(user.id)
+            return user
         return None
 
     @staticmethod
@@ -25,6 +36,7 @@ class UserService:
         user = UserRepository.get_by_id(user_id)
         if user:
             UserRepository.delete(user)
+            forget_user_claims(user_id)
             return True
         return False
     
@@ -37,8 +49,8 @@ class UserService:
     def deactivate_user(user_id):
         user = UserRepository.get_by_id(user_id)
         if user:
-            user.is_active = False
-            user.save()
+            UserRepository.update_claims(user, is_active=False)
+            forget_user_claims(user.id)
             return True
         return False
 
@@ -46,21 +58,104 @@ class UserService:
     def reactivate_user(user_id):
         user = UserRepository.get_by_id(user_id)
         if user:
-            user.is_active = True
-            user.save()
+            UserRepository.update_claims(user, is_active=True)
+            forget_user_claims(user.id)
             return True
         return False 
     
     @staticmethod
     def update_user_password(user, new_password):
         user.set_password(new_password)
-        user.save()
+        UserRepository.update_claims(user, password=user.password)
+        forget_user_claims(user.id)
         
     @staticmethod
     def change_password(user, old_password, new_password):
-        # Verify the old password
-        if not user.check_password(old_password):
+        # Verify the old password without the rehash-on-login upgrade; the hash is replaced below anyway
+        if not check_password(old_password, user.password):
             raise ValueError("Old password is incorrect.")
 
         # Update the password
-        UserService.update_user_password(user, new_password)    
\ No newline at end of file
+        UserService.update_user_password(user, new_password)
+
+    @staticmethod
+    def bulk_update_users(changes, user_ids=None, filters=None):
+        # Applies changes to an explicit id list, or in a single UPDATE to every user matching
+        # UserFilter params. Either way their tokens' claims are re-checked against the database.
+        if filters is not None:
+            allowed = filter_param_names(UserFilter)
+            if set(filters) - allowed or any(value in ('', None) for value in filters.values()):
+                raise ValueError({"filters": f"Filters must be non-blank values of: {', '.join(sorted(allowed))}."})
+            filterset = UserFilter(filters, queryset=UserRepository.get_all())
+            if not filterset.is_valid():
+                raise ValueError({"filters": filterset.errors})
+            updated = UserRepository.update_matching(filterset.qs, **changes)
+            if updated:
+                forget_user_claims()
+            return {'updated': updated}
+
+        user_ids = list(dict.fromkeys(user_ids))
+        updated = []
+        with transaction.atomic():
+            for start in range(0, len(user_ids), BULK_UPDATE_BATCH_SIZE):
+                batch = user_ids[start:start + BULK_UPDATE_BATCH_SIZE]
+                updated += UserRepository.update_many(batch, **changes)
+        if updated:
+            forget_user_claims(*updated)
+
+        found = set(updated)
+        return {
+            'updated': len(updated),
+            'not_found': len(user_ids) - len(found),
+            'results': [
+                {'id': user_id, 'status': 'updated' if user_id in found else 'not_found'}
+                for user_id in user_ids
+            ],
+        }
+
+    @staticmethod
+    def bulk_create_users(items):
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = UserBulkCreateItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'failed', 'errors': serializer.errors}
+
+        model = UserRepository.model
+        taken = UserRepository.existing_usernames([model.normalize_username(data['username']) for _, data in valid])
+        pending = []
+        for index, data in valid:
+            username = model.normalize_username(data['username'])
+            if username in taken:
+                results[index] = {
+                    'index': index, 'status': 'failed',
+                    'errors': {'username': ['A user with that username already exists.']},
+                }
+                continue
+            taken.add(username)
+            pending.append((index, username, data))
+
+        # Hashing dominates; spread it over the bounded hashing pool instead of one core
+        passwords = get_hashing_executor().map(make_password, [data['password'] for _, _, data in pending])
+        users = [
+            model(
+                username=username,
+                email=model.objects.normalize_email(data.get('email', '')),
+                phone_number=data.get('phone_number', ''),
+                role=data.get('role', 'user'),
+                password=password,
+            )
+            for (_, username, data), password in zip(pending, passwords)
+        ]
+        try:
+            with transaction.atomic():
+                UserRepository.bulk_create(users, batch_size=BULK_CREATE_BATCH_SIZE)
+        except IntegrityError:
+            raise ValueError("Some usernames were registered concurrently; retry the batch.")
+
+        for (index, _, _), user in zip(pending, users):
+            results[index] = {'index': index, 'status': 'created', 'id': user.id, 'username': user.username}
+        return {'created': len(users), 'failed': len(items) - len(users), 'results': results}
@@ -0,0 +1,12 @@
+from django.core.cache import cache
+
+from ..authentication import claims_versions
+
+
+class IsolatedCacheMixin:
+    # Cached book responses, the catalogue version and the claims version memo outlive a test,
+    # and ids are reused once its rows roll back, so every test starts with them empty
+    def _pre_setup(self):
+        super()._pre_setup()
+        cache.clear()
+        claims_versions.clear()
@@ -0,0 +1,109 @@
+import gzip
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import ArchivedLoan, Book, Loan
+from ..partitioning import is_partitioned
+
+User = get_user_model()
+
+def make_loan(user, book, days_ago, returned_days_ago=None):
+    loan = Loan.objects.create(user=user, book=book)
+    now = timezone.now()
+    returned_date = None if returned_days_ago is None else now - timedelta(days=returned_days_ago)
+    Loan.objects.filter(id=loan.id).update(borrowed_date=now - timedelta(days=days_ago), returned_date=returned_date)
+    return loan.id
+
+class LoanArchiveTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        self.old_ids = [make_loan(self.user, self.book, 800 + i, 790 + i) for i in range(3)]
+        self.overdue_id = make_loan(self.user, self.book, 700)  # Never returned: stays live
+        self.recent_id = make_loan(self.user, self.book, 10, 5)
+        self.client.force_authenticate(user=self.admin)
+
+    def archive(self, *args):
+        call_command('archive_loans', '--months', '12', '--batch-size', '2', *args, stdout=StringIO())
+
+    def listed_ids(self, **params):
+        response = self.client.get(reverse('loan-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [loan['id'] for loan in response.data['results']]
+
+    def test_archives_old_returned_loans(self):
+        self.archive()
+        self.assertEqual(sorted(ArchivedLoan.objects.values_list('id', flat=True)), sorted(self.old_ids))
+        self.assertEqual(sorted(Loan.objects.values_list('id', flat=True)), sorted([self.overdue_id, self.recent_id]))
+        self.archive()  # Nothing left to move
+        self.assertEqual(ArchivedLoan.objects.count(), 3)
+
+    def test_list_reads_archive_only_for_old_dates(self):
+        expected = self.listed_ids(borrowed_date_after=(timezone.now() - timedelta(days=900)).isoformat())
+        self.archive()
+
+        self.assertEqual(self.listed_ids(), [self.recent_id, self.overdue_id])
+        old = (timezone.now() - timedelta(days=900)).isoformat()
+        self.assertEqual(self.listed_ids(borrowed_date_after=old), expected)
+        self.assertEqual(self.listed_ids(include_archived='true'), expected)
+        self.assertEqual(self.listed_ids(borrowed_date_after=old, is_active='true'), [self.overdue_id])
+        recent = (timezone.now() - timedelta(days=30)).isoformat()
+        self.assertEqual(self.listed_ids(borrowed_date_after=recent), [self.recent_id])
+
+        response = self.client.get(reverse('loan-list'), {'include_archived': 'true', 'page': 1})
+        self.assertEqual(response.data['count'], 5)
+        archived = response.data['results'][-1]
+        self.assertEqual(archived['user']['username'], "testuser")
+        self.assertEqual(archived['book']['isbn'], "1234567890123")
+        self.assertIsNotNone(archived['due_date'])  # Copied with the loan
+
+        response = self.client.get(reverse('loan-list'), {'include_archived': 'true', 'fields': 'id,book.title'})
+        self.assertEqual([loan['id'] for loan in response.data['results']], expected)
+        self.assertEqual(response.data['results'][-1], {'id': expected[-1], 'book': {'title': "Test Book"}})
+
+    def test_archive_to_csv_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.archive('--to', 'csv', '--output-dir', directory)
+            [name] = os.listdir(directory)
+            with gzip.open(os.path.join(directory, name), 'rt') as archive_file:
+                lines = archive_file.read().splitlines()
+        self.assertEqual(lines[0], 'id,user_id,username,book_id,book_title,book_isbn,borrowed_date,returned_date,due_date')
+        self.assertEqual(sorted(int(line.split(',')[0]) for line in lines[1:]), sorted(self.old_ids))
+        self.assertFalse(Loan.objects.filter(id__in=self.old_ids).exists())
+        self.assertEqual(ArchivedLoan.objects.count(), 0)
+
+
+class PartitionLoansTest(TestCase):
+    def test_requires_postgresql(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('PostgreSQL is supported')
+        with self.assertRaises(CommandError):
+            call_command('partition_loans', '--convert', stdout=StringIO())
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Declarative partitioning is PostgreSQL-only')
+    def test_convert_and_maintain(self):
+        user = User.objects.create_user(username="testuser", password="testpass")
+        book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        loan_id = make_loan(user, book, 400, 390)
+        call_command('partition_loans', '--convert', '--ahead', '2', stdout=StringIO())
+        self.assertTrue(is_partitioned(connection))
+        self.assertTrue(Loan.objects.filter(id=loan_id).exists())
+        self.assertGreater(Loan.objects.create(user=user, book=book).id, loan_id)
+
+        call_command('archive_loans', '--months', '12', stdout=StringIO())
+        out = StringIO()
+        call_command('partition_loans', '--drop-empty', stdout=out)
+        self.assertIn('Dropped library_loan_p', out.getvalue())
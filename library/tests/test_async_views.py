@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book, Loan
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class AsyncViewsTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", email="test@example.com")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        for i in range(12):
+            Book.objects.create(title=f"Book {i:02}", author="Test Author", isbn=f"{i:013}", page_count=100 + i)
+        self.book = Book.objects.get(title="Book 00")
+
+    def login(self, username, password):
+        response = self.client.post(reverse('async-login'), {"username": username, "password": password}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+
+    def test_book_list_matches_sync_view(self):
+        queries = (
+            '', '?page=2', '?author=Test+Author&page=2', '?available_now=true', '?fields=id,title&page=2',
+            '?pagination=cursor', '?pagination=cursor&fields=isbn&include_count=true',
+        )
+        for query in queries:
+            expected = self.client.get(reverse('book-list-create') + query).json()
+            for link in ('next', 'previous'):
+                if expected[link]:
+                    expected[link] = expected[link].replace('/api/books/', '/api/async/books/')
+            response = self.client.get(reverse('async-book-list-create') + query)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), expected)
+        self.assertEqual(self.client.get(reverse('async-book-list-create') + '?page=3').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('async-book-list-create') + '?cursor=bad').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('async-book-list-create') + '?fields=nope').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_following_the_cursor(self):
+        url = reverse('async-book-list-create') + '?pagination=cursor'
+        titles = []
+        while url:
+            data = self.client.get(url).json()
+            titles += [book['title'] for book in data['results']]
+            url = data['next']
+        self.assertEqual(titles, sorted(f"Book {i:02}" for i in range(12)))
+
+    def test_book_responses_are_cached(self):
+        for url in (reverse('async-book-list-create') + '?page=2', reverse('async-book-detail', args=[self.book.id])):
+            first = self.client.get(url)
+            self.assertEqual(first['X-Cache'], 'MISS')
+            second = self.client.get(url)
+            self.assertEqual((second['X-Cache'], second.json()), ('HIT', first.json()))
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_book_detail(self):
+        response = self.client.get(reverse('async-book-detail', args=[self.book.id]))
+        self.assertEqual(response.json(), self.client.get(reverse('book-detail', args=[self.book.id])).json())
+        self.assertEqual(self.client.get(reverse('async-book-detail', args=[999])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writes_require_admin(self):
+        data = {"title": "New Book", "author": "New Author", "isbn": "9999999999999", "page_count": 10}
+        response = self.client.post(reverse('async-book-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.login("testuser", "testpass")
+        response = self.client.post(reverse('async-book-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.login("admin", "adminpass")
+        response = self.client.post(reverse('async-book-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        book = Book.objects.get(isbn="9999999999999")
+
+        response = self.client.put(reverse('async-book-detail', args=[book.id]), {**data, "total_copies": 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['available_copies'], 3)
+
+        response = self.client.delete(reverse('async-book-detail', args=[book.id]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Book.objects.filter(id=book.id).exists())
+
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+        response = self.client.post(reverse('async-borrow-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    def test_borrow_and_return(self):
+        self.login("testuser", "testpass")
+        response = self.client.post(reverse('async-borrow-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()['user']['email'], "test@example.com")
+        self.assertEqual(response.json()['book']['available_copies'], 0)
+
+        response = self.client.post(reverse('async-borrow-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('async-borrow-book', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(reverse('async-return-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.json()['returned_date'])
+        self.assertTrue(Loan.objects.get().returned_date)
+        response = self.client.post(reverse('async-return-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LoadTestCommandTest(LiveServerTestCase):
+    def test_reports_throughput_and_latency(self):
+        Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        out = StringIO()
+        call_command(
+            'loadtest', '--base-url', self.live_server_url, '--path', '/api/async/books/',
+            '--concurrency', '4', '--requests', '8', stdout=out,
+        )
+        self.assertIn("/api/async/books/:", out.getvalue())
+        self.assertIn("0/8 errors", out.getvalue())
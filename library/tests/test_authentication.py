@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from ..models import Book
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class ClaimsAuthenticationTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", email="test@example.com")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(
+            title="Test Book", author="Test Author", isbn="1234567890123", page_count=200
+        )
+
+    def login(self, username, password):
+        response = self.client.post(reverse('login'), {"username": username, "password": password}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def user_queries(self, queries):
+        return [query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'FROM "library_user"' in query['sql']]
+
+    def test_borrow_and_return_do_not_load_the_user(self):
+        self.login("testuser", "testpass")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('borrow-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['user']['email'], "test@example.com")
+        self.assertEqual(self.user_queries(queries.captured_queries), [])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('return-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user_queries(queries.captured_queries), [])
+
+    def test_registration_token_carries_claims(self):
+        data = {"username": "newuser", "email": "new@example.com", "password": "newpass123", "role": "user"}
+        response = self.client.post(reverse('register'), data, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.data['username'], "newuser")
+        self.assertEqual(queries.captured_queries, [])
+
+    def test_deactivated_user_is_rejected_immediately(self):
+        self.login("testuser", "testpass")
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(reverse('user-deactivate', args=[self.user.id]))
+        self.client.force_authenticate(user=None)
+
+        response = self.client.post(reverse('borrow-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_is_read_from_the_database(self):
+        self.login("admin", "adminpass")
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_200_OK)
+
+        data = {"username": "admin", "email": "", "phone_number": "", "role": "user"}
+        self.client.put(reverse('user-detail', args=[self.admin.id]), data, format='json')
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_revocation_survives_cache_eviction_and_other_processes(self):
+        self.login("admin", "adminpass")
+        self.client.get(reverse('user-list'))
+        # Another process changes the role; this one keeps its memo until the TTL runs out
+        User.objects.filter(id=self.admin.id).update(role="user", claims_version=F('claims_version') + 1)
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_200_OK)
+        with self.settings(AUTH_CLAIMS_CACHE_TTL=0):
+            self.assertEqual(self.client.get(reverse('user-list')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_change_password_with_claims_user(self):
+        self.login("testuser", "testpass")
+        data = {"old_password": "testpass", "new_password": "newpass123"}
+        response = self.client.post(reverse('change-password'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpass123"))
+        self.assertEqual(self.user.username, "testuser")
+
+    def test_token_without_claims_falls_back_to_database(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], "testuser")
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F, Q
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from ..models import Book, Loan
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class SeedLibraryTest(TestCase):
+    def seed(self, *args):
+        call_command('seed_library', '--users', '20', '--books', '50', '--loans', '400', *args, stdout=StringIO())
+
+    def test_seeds_a_consistent_library(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(username__startswith='seed-user-').count(), 20)
+        self.assertEqual(User.objects.get(username='seed-admin').role, 'admin')
+        self.assertEqual(Book.objects.count(), 50)
+        self.assertEqual(Loan.objects.count(), 400)
+        self.assertTrue(Loan.objects.filter(returned_date__isnull=True).exists())
+        self.assertFalse(Loan.objects.filter(returned_date__lt=F('borrowed_date')).exists())
+
+        books = Book.objects.annotate(on_loan=Count('loan', filter=Q(loan__returned_date__isnull=True)))
+        for book in books:
+            self.assertEqual(book.available_copies, book.total_copies - book.on_loan)
+            self.assertEqual(book.availability, book.available_copies > 0)
+
+    def test_same_seed_same_data_and_reset(self):
+        self.seed()
+        titles = list(Book.objects.order_by('isbn').values_list('title', flat=True))
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed('--reset')
+        self.assertEqual(list(Book.objects.order_by('isbn').values_list('title', flat=True)), titles)
+        self.assertEqual(Loan.objects.count(), 400)
+
+    def test_reset_leaves_other_rows_alone(self):
+        # Look-alikes of the seeded markers, as real data can have
+        member = User.objects.create_user(username="seed-reader", password="testpass")
+        book = Book.objects.create(title="Real Book", author="Someone", isbn="0000000000001", page_count=10)
+        self.seed()
+        self.seed('--reset')
+        self.assertTrue(User.objects.filter(id=member.id).exists())
+        self.assertTrue(Book.objects.filter(id=book.id).exists())
+
+        # A real loan of a seeded book would go with it, so the command refuses
+        Loan.objects.create(user=member, book=Book.objects.filter(isbn__startswith='SEED-').first())
+        with self.assertRaises(CommandError):
+            self.seed('--reset')
+
+    def test_refuses_accounts_it_did_not_create(self):
+        User.objects.create_user(username="seed-user-000001", password="testpass", email="someone@example.com")
+        with self.assertRaises(CommandError):
+            self.seed()
+
+
+class BenchmarkApiTest(IsolatedCacheMixin, TestCase):
+    def setUp(self):
+        call_command('seed_library', '--users', '10', '--books', '30', '--loans', '100', stdout=StringIO())
+
+    def test_writes_latency_and_query_counts(self):
+        loans = Loan.objects.count()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            out = StringIO()
+            call_command(
+                'benchmark_api', '--iterations', '3', '--warmup', '1', '--host', 'testserver',
+                '--output', output, stdout=out,
+            )
+            call_command(
+                'benchmark_api', '--iterations', '2', '--warmup', '0', '--host', 'testserver',
+                '--scenario', 'browse', '--output', os.path.join(directory, 'again.json'), '--compare', output,
+                stdout=out,
+            )
+            with open(output) as results_file:
+                results = json.load(results_file)
+
+        self.assertEqual(results['dataset']['books'], 30)
+        self.assertEqual(
+            set(results['scenarios']), {'browse', 'search', 'admin_loans', 'login', 'borrow', 'return'}
+        )
+        for name, summary in results['scenarios'].items():
+            self.assertEqual(summary['errors'], 0, name)
+            self.assertEqual(summary['requests'], 3)
+            self.assertLessEqual(summary['p50_ms'], summary['p95_ms'])
+            self.assertLessEqual(summary['p95_ms'], summary['p99_ms'])
+            self.assertGreater(summary['queries_per_request'], 0)
+        self.assertIn("browse       p95", out.getvalue())
+        # Borrow/return and login writes are rolled back
+        self.assertEqual(Loan.objects.count(), loans)
+
+    def test_requires_seeded_data(self):
+        call_command('seed_library', '--users', '1', '--books', '1', '--loans', '0', '--reset', stdout=StringIO())
+        User.objects.filter(username='seed-admin').delete()
+        with self.assertRaises(CommandError):
+            call_command('benchmark_api', '--host', 'testserver', stdout=StringIO())
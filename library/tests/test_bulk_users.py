@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..authentication import ClaimsRefreshToken
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class UserBulkAdminTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.members = [
+            User.objects.create_user(username=f"member{index}", password="testpass", account_status="suspended" if index % 2 else "active")
+            for index in range(4)
+        ]
+        self.client.force_authenticate(user=self.admin)
+
+    def test_deactivate_by_ids_reports_each_id(self):
+        ids = [self.members[0].id, self.members[1].id, 9999]
+        with self.assertNumQueries(4):  # savepoint, SELECT ... FOR UPDATE, UPDATE, release
+            response = self.client.post(reverse('user-bulk-deactivate'), {"ids": ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual((data['updated'], data['not_found']), (2, 1))
+        self.assertEqual([result['status'] for result in data['results']], ['updated', 'updated', 'not_found'])
+        self.assertEqual(User.objects.filter(is_active=False).count(), 2)
+
+    def test_reactivate_by_filters(self):
+        User.objects.filter(username__startswith="member").update(is_active=False)
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse('user-bulk-reactivate'), {"filters": {"account_status": "suspended"}}, format='json'
+            )
+        self.assertEqual(response.data['data'], {'updated': 2})
+        self.assertEqual(set(User.objects.filter(is_active=True, role='user').values_list('account_status', flat=True)), {'suspended'})
+
+    def test_change_role(self):
+        response = self.client.post(reverse('user-bulk-role'), {"ids": [self.members[2].id], "role": "admin"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.members[2].refresh_from_db()
+        self.assertEqual(self.members[2].role, "admin")
+
+    def test_rejects_ambiguous_or_blank_selection(self):
+        url = reverse('user-bulk-deactivate')
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {"ids": [1], "filters": {"role": "user"}}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        for filters in ({"role": ""}, {"unknown": "x"}, {"role": "superuser"}):
+            response = self.client.post(url, {"filters": filters}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, filters)
+        self.assertFalse(User.objects.filter(is_active=False).exists())
+
+    def test_bulk_create_reports_each_item(self):
+        users = [
+            {"username": "new1", "email": "new1@example.com", "password": "newpass123"},
+            {"username": "member0", "email": "dup@example.com", "password": "newpass123"},
+            {"username": "new2", "email": "not-an-email", "password": "newpass123"},
+            {"username": "new1", "email": "again@example.com", "password": "newpass123"},
+            {"username": "new3", "email": "new3@example.com", "password": "newpass123", "role": "admin"},
+        ]
+        response = self.client.post(reverse('user-bulk-create'), {"users": users}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual((data['created'], data['failed']), (2, 3))
+        self.assertEqual([result['status'] for result in data['results']], ['created', 'failed', 'failed', 'failed', 'created'])
+        self.assertIn('email', data['results'][2]['errors'])
+
+        created = User.objects.get(username="new3")
+        self.assertEqual(created.id, data['results'][4]['id'])
+        self.assertEqual(created.role, "admin")
+        self.assertTrue(created.check_password("newpass123"))
+
+    def test_bulk_create_without_email(self):
+        users = [{"username": "new1", "password": "newpass123"}]
+        response = self.client.post(reverse('user-bulk-create'), {"users": users}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['created'], 1)
+        self.assertEqual(User.objects.get(username="new1").email, "")
+
+    def test_regular_users_are_forbidden(self):
+        self.client.force_authenticate(user=self.members[0])
+        response = self.client.post(reverse('user-bulk-deactivate'), {"ids": [self.admin.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_deactivation_revokes_every_token(self):
+        User.objects.bulk_create([User(username=f"reader{index}") for index in range(600)])
+        tokens = [
+            str(ClaimsRefreshToken.for_user(user).access_token)
+            for user in User.objects.filter(username__in=["reader0", "reader599"])
+        ]
+        response = self.client.post(reverse('user-bulk-deactivate'), {"filters": {"username": "reader"}}, format='json')
+        self.assertEqual(response.data['data'], {'updated': 600})
+
+        self.client.force_authenticate(user=None)
+        cache.clear()
+        for token in tokens:
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            self.assertEqual(self.client.get(reverse('user-profile')).status_code, status.HTTP_401_UNAUTHORIZED)
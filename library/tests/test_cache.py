@@ -0,0 +1,67 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book
+from ..utils.response_cache import catalogue_cache_stats
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class CatalogueCacheTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        catalogue_cache_stats.reset()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(
+            title="Test Book", author="Test Author", isbn="1234567890123", page_count=200
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        url = reverse('book-detail', args=[self.book.id])
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+    def test_query_params_are_normalized(self):
+        url = reverse('book-list-create')
+        self.client.get(url, {'title': 'test', 'author': 'author', 'availability': ''})
+        response = self.client.get(url + '?author=author&title=test')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_matching_etag_returns_not_modified(self):
+        url = reverse('book-list-create')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_borrow_invalidates_cached_availability(self):
+        url = reverse('book-detail', args=[self.book.id])
+        etag = self.client.get(url)['ETag']
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('borrow-book', args=[self.book.id]))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['availability'])
+
+    def test_admin_update_invalidates_cache(self):
+        url = reverse('book-detail', args=[self.book.id])
+        self.client.get(url)
+        self.client.force_authenticate(user=self.admin)
+        data = {"title": "New Title", "author": "Test Author", "isbn": "1234567890123", "page_count": 200}
+        self.client.put(url, data, format='json')
+        self.assertEqual(self.client.get(url).data['title'], "New Title")
+
+    def test_stats(self):
+        url = reverse('book-list-create')
+        self.client.get(url)
+        self.client.get(url)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('book-cache-stats'))
+        self.assertEqual(response.data['hit'], 1)
+        self.assertEqual(response.data['miss'], 1)
+        self.assertEqual(response.data['hit_ratio'], 0.5)
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from unittest import SkipTest
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db import close_old_connections, connection
+from django.test import TransactionTestCase, override_settings
+from ..models import Book, Loan
+from ..services.loan_service import LoanService
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+class ConcurrentBorrowTest(TransactionTestCase):
+    threads = 8
+    rounds = 25
+
+    @classmethod
+    def setUpClass(cls):
+        # Checked here, against the test database: an in-memory SQLite test database is one
+        # shared-cache connection that locks its tables against the worker threads
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise SkipTest("Worker threads need their own connections to a shared test database")
+        super().setUpClass()
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"reader{index}", password="testpass")
+            for index in range(self.threads)
+        ]
+        self.books = [
+            Book.objects.create(title=f"Book {index}", author="Test Author", isbn=f"{index:013d}", page_count=100)
+            for index in range(4)
+        ]
+
+    def _run(self, target):
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def worker(user):
+            try:
+                barrier.wait()
+                target(user)
+            except Exception as e:  # Surface failures from the worker threads
+                errors.append(e)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in self.users]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        self.assertEqual(errors, [])
+        return time.perf_counter() - started
+
+    def test_no_double_lending_under_contention(self):
+        attempts = []
+
+        def borrow_and_return(user):
+            for round_number in range(self.rounds):
+                book = self.books[round_number % len(self.books)]
+                loan = LoanService.borrow_book(user, book.id)
+                attempts.append(loan is not None)
+                if loan:
+                    LoanService.return_book(user, book.id)
+
+        elapsed = self._run(borrow_and_return)
+        successful = sum(attempts)
+        logger.info(
+            "%d borrow attempts (%d successful) across %d threads in %.2fs: %.0f borrows/s",
+            len(attempts), successful, self.threads, elapsed, len(attempts) / elapsed,
+        )
+
+        self.assertGreater(successful, 0)
+        self.assertEqual(Loan.objects.count(), successful)
+        self.assertFalse(Loan.objects.filter(returned_date__isnull=True).exists())
+        self.assertEqual(Book.objects.filter(availability=True).count(), len(self.books))
+        # No copy was ever on loan to two users at the same time
+        for book in self.books:
+            loans = list(Loan.objects.filter(book=book).order_by('borrowed_date', 'id'))
+            for earlier, later in zip(loans, loans[1:]):
+                self.assertLessEqual(earlier.returned_date, later.borrowed_date)
+
+    def test_single_copy_is_lent_once(self):
+        book = self.books[0]
+        results = []
+        self._run(lambda user: results.append(LoanService.borrow_book(user, book.id)))
+        self.assertEqual(sum(loan is not None for loan in results), 1)
+        self.assertEqual(Loan.objects.filter(book=book).count(), 1)
+
+    @override_settings(MAX_ACTIVE_LOANS={'user': 2})
+    def test_loan_limit_holds_under_contention(self):
+        # One user borrowing a different book from every thread
+        user = self.users[0]
+        books = self.books + [
+            Book.objects.create(title=f"Book {index}", author="Test Author", isbn=f"{index:013d}", page_count=100)
+            for index in range(len(self.books), self.threads)
+        ]
+        results = []
+
+        def borrow(worker_user):
+            try:
+                results.append(LoanService.borrow_book(user, books[self.users.index(worker_user)].id))
+            except PermissionDenied:
+                results.append(None)
+
+        self._run(borrow)
+        self.assertEqual(sum(loan is not None for loan in results), 2)
+        user.refresh_from_db()
+        self.assertEqual(user.active_loans, 2)
+        self.assertEqual(Book.objects.filter(availability=False).count(), 2)
@@ -0,0 +1,53 @@
+import csv
+import json
+from io import StringIO
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book, Loan
+
+User = get_user_model()
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(
+            title="Test Book", author="Test Author", isbn="1234567890123", page_count=200
+        )
+        self.other = Book.objects.create(
+            title="Other Book", author="Someone Else", isbn="9876543210987", page_count=100, availability=False
+        )
+        self.active = Loan.objects.create(user=self.user, book=self.other)
+        self.client.force_authenticate(user=self.admin)
+
+    def _content(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_book_csv_export_honours_filters(self):
+        response = self.client.get(reverse('book-export'), {'availability': 'true'})
+        rows = list(csv.DictReader(StringIO(self._content(response))))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual([row['isbn'] for row in rows], [self.book.isbn])
+
+    def test_loan_ndjson_export(self):
+        response = self.client.get(reverse('loan-export'), {'export_format': 'ndjson', 'is_active': 'true'})
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], self.active.id)
+        self.assertEqual(rows[0]['username'], "testuser")
+        self.assertIsNone(rows[0]['returned_date'])
+        self.assertIsNotNone(rows[0]['due_date'])
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('loan-export'), {'export_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_admin(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('book-export'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
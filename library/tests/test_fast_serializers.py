@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from django.contrib.auth import get_user_model
+from ..models import Book, Loan
+from ..renderers import FastJSONRenderer
+from ..repositories.book_repository import BookRepository
+from ..repositories.loan_repository import LoanRepository
+from ..serializers.book_serializers import BookSerializer
+from ..serializers.fast import book_rows, book_values, loan_rows, loan_values
+from ..serializers.loan_serializers import LoanSerializer
+
+User = get_user_model()
+
+class FastListPathTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", email="test@example.com")
+        self.book = Book.objects.create(title="Tést Böok", author="Test Author", isbn="1234567890123", page_count=200)
+        Book.objects.create(title="Other", author="Someone", isbn="9876543210987", page_count=10, total_copies=3, available_copies=2)
+        loan = Loan.objects.create(user=self.user, book=self.book)
+        Loan.objects.filter(id=loan.id).update(returned_date=timezone.now() + timedelta(microseconds=123456))
+        Loan.objects.create(user=self.user, book=self.book)
+
+    def test_book_rows_match_serializer(self):
+        queryset = BookRepository.get_queryset()
+        expected = BookSerializer(queryset, many=True).data
+        rows = book_rows(book_values(queryset))
+        self.assertEqual(rows, expected)
+        self.assertEqual(JSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_loan_rows_match_serializer(self):
+        queryset = LoanRepository.get_queryset()
+        expected = LoanSerializer(queryset, many=True).data
+        rows = loan_rows(loan_values(queryset))
+        self.assertEqual(JSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {
+            'text': "line\u2028separator, ünïcode and \"quotes\"",
+            'lazy': gettext_lazy("Hello"),
+            'when': datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'numbers': [1, 2.5, None, True],
+            1: 'non-string key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_serializers', '--rows', '5', '--repeat', '2', stdout=out)
+        self.assertIn("values() + FastJSONRenderer", out.getvalue())
+        self.assertEqual(Book.objects.count(), 2)
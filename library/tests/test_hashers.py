@@ -0,0 +1,82 @@
+from io import StringIO
+
+from django.contrib.auth.hashers import identify_hasher
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+# Cheap costs keep the suite fast; the behaviour does not depend on them
+FAST_HASHING = {
+    'PASSWORD_HASHERS': [
+        'library.hashers.ConfigurableArgon2PasswordHasher',
+        'library.hashers.ConfigurablePBKDF2PasswordHasher',
+    ],
+    'ARGON2_TIME_COST': 1,
+    'ARGON2_MEMORY_COST': 1024,
+    'ARGON2_PARALLELISM': 1,
+    'PBKDF2_ITERATIONS': 1000,
+}
+
+@override_settings(**FAST_HASHING)
+class PasswordHashingTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+
+    def login(self, url_name='login', password="testpass"):
+        return self.client.post(reverse(url_name), {"username": "testuser", "password": password}, format='json')
+
+    def stored_hasher(self):
+        self.user.refresh_from_db()
+        return identify_hasher(self.user.password)
+
+    def test_new_passwords_use_preferred_hasher(self):
+        self.assertEqual(self.stored_hasher().algorithm, 'argon2')
+
+    def test_login_upgrades_legacy_hash(self):
+        with self.settings(PASSWORD_HASHERS=FAST_HASHING['PASSWORD_HASHERS'][::-1]):
+            self.user.set_password("testpass")
+            self.user.save()
+        self.assertEqual(self.stored_hasher().algorithm, 'pbkdf2_sha256')
+
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.stored_hasher().algorithm, 'argon2')
+
+    def test_login_rehashes_when_cost_changes(self):
+        with self.settings(ARGON2_TIME_COST=2):
+            self.assertTrue(self.stored_hasher().must_update(self.user.password))
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+            self.assertFalse(self.stored_hasher().must_update(self.user.password))
+
+    def test_async_login(self):
+        response = self.login('login-async')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("access", response.json())
+        self.assertEqual(response.json()['user']['username'], "testuser")
+
+        self.assertEqual(self.login('login-async', password="wrong").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_login_upgrades_hash(self):
+        with self.settings(ARGON2_TIME_COST=2):
+            self.assertEqual(self.login('login-async').status_code, status.HTTP_200_OK)
+            self.assertFalse(self.stored_hasher().must_update(self.user.password))
+
+    def test_async_login_rejects_unknown_and_inactive_users(self):
+        response = self.client.post(reverse('login-async'), {"username": "nobody", "password": "x"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertEqual(self.login('login-async').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command(
+            'benchmark_hashers', '--hasher', 'pbkdf2', '--logins', '2', '--processes', '1',
+            '--set', 'PBKDF2_ITERATIONS=1000', stdout=out,
+        )
+        self.assertIn("pbkdf2 (iterations=1000)", out.getvalue())
+        self.assertIn("logins/s per core", out.getvalue())
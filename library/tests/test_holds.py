@@ -0,0 +1,135 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book, Hold, Loan
+from ..repositories.user_repository import UserRepository
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class HoldQueueTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.borrower = User.objects.create_user(username="borrower", password="testpass")
+        self.first = User.objects.create_user(username="first", password="testpass")
+        self.second = User.objects.create_user(username="second", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(
+            title="Test Book", author="Test Author", isbn="1234567890123", page_count=200,
+            total_copies=1, available_copies=1
+        )
+        self.client.force_authenticate(user=self.borrower)
+        self.client.post(reverse('borrow-book', args=[self.book.id]))
+
+    def place_hold(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('place-hold', args=[self.book.id]))
+
+    def test_queue_positions(self):
+        response = self.place_hold(self.first)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['status'], response.data['position']), ('waiting', 1))
+        response = self.place_hold(self.second)
+        self.assertEqual(response.data['position'], 2)
+
+        again = self.place_hold(self.second)
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.data['id'], response.data['id'])
+
+        response = self.client.get(reverse('hold-detail', args=[again.data['id']]))
+        self.assertEqual(response.data['position'], 2)
+        response = self.client.get(reverse('hold-list'))
+        self.assertEqual([hold['position'] for hold in response.data], [2])
+
+    def test_cannot_hold_available_or_missing_book(self):
+        other = Book.objects.create(title="Other", author="Someone", isbn="9876543210987", page_count=10)
+        self.client.force_authenticate(user=self.first)
+        response = self.client.post(reverse('place-hold', args=[other.id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('place-hold', args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_return_lends_the_copy_to_the_next_holder(self):
+        first_hold = self.place_hold(self.first).data
+        second_hold = self.place_hold(self.second).data
+
+        self.client.force_authenticate(user=self.borrower)
+        response = self.client.post(reverse('return-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['book']['available_copies'], 0)
+
+        hold = Hold.objects.get(id=first_hold['id'])
+        self.assertEqual(hold.status, 'fulfilled')
+        loan = Loan.objects.get(id=hold.loan_id)
+        self.assertEqual((loan.user, loan.book, loan.returned_date), (self.first, self.book, None))
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.available_copies, self.book.availability), (0, False))
+
+        self.client.force_authenticate(user=self.second)
+        response = self.client.get(reverse('hold-detail', args=[second_hold['id']]))
+        self.assertEqual(response.data['position'], 1)
+
+    def test_holder_refused_at_the_user_row_keeps_their_place(self):
+        # The first holder passed the queue's policy filter but reached the limit before their row
+        # was locked, e.g. by borrowing another book concurrently
+        first_hold = self.place_hold(self.first).data
+        second_hold = self.place_hold(self.second).data
+        lock_borrower = UserRepository.lock_borrower.__func__
+
+        def refuse_first(cls, user_id):
+            return user_id != self.first.id and lock_borrower(cls, user_id)
+
+        self.client.force_authenticate(user=self.borrower)
+        with mock.patch.object(UserRepository, 'lock_borrower', classmethod(refuse_first)):
+            self.client.post(reverse('return-book', args=[self.book.id]))
+
+        self.assertEqual(Hold.objects.get(id=first_hold['id']).status, 'waiting')
+        hold = Hold.objects.get(id=second_hold['id'])
+        self.assertEqual((hold.status, Loan.objects.get(id=hold.loan_id).user), ('fulfilled', self.second))
+        self.assertEqual(Loan.objects.filter(user=self.first).count(), 0)
+
+    def test_priority_tier_goes_first(self):
+        self.place_hold(self.first)
+        second_hold = self.place_hold(self.second).data
+
+        self.client.force_authenticate(user=self.second)
+        response = self.client.patch(reverse('hold-detail', args=[second_hold['id']]), {'priority': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(reverse('hold-detail', args=[second_hold['id']]), {'priority': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['position'], 1)
+
+        self.client.force_authenticate(user=self.borrower)
+        self.client.post(reverse('return-book', args=[self.book.id]))
+        self.assertEqual(Loan.objects.get(returned_date__isnull=True).user, self.second)
+
+    def test_cancel_hold(self):
+        hold = self.place_hold(self.first).data
+        self.client.force_authenticate(user=self.second)
+        self.assertEqual(self.client.delete(reverse('hold-detail', args=[hold['id']])).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.first)
+        self.assertEqual(self.client.delete(reverse('hold-detail', args=[hold['id']])).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.delete(reverse('hold-detail', args=[hold['id']])).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.borrower)
+        self.client.post(reverse('return-book', args=[self.book.id]))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.available_copies, 1)
+
+    def test_new_copies_go_to_holders(self):
+        self.place_hold(self.first)
+        self.place_hold(self.second)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.put(reverse('book-detail', args=[self.book.id]), {
+            "title": "Test Book", "author": "Test Author", "isbn": "1234567890123", "page_count": 200,
+            "total_copies": 4,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_copies'], 1)
+        self.assertEqual(Hold.objects.filter(status='fulfilled').count(), 2)
+        self.assertEqual(Loan.objects.filter(returned_date__isnull=True).count(), 3)
@@ -0,0 +1,103 @@
+import json
+import tempfile
+from io import BytesIO, StringIO
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ..models import Book
+from ..services.book_service import BookService
+from ..utils.book_import import iter_rows
+
+User = get_user_model()
+
+class BookImportAPITest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(
+            title="Old Title", author="Test Author", isbn="1234567890123", page_count=200, availability=False
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_csv_import_upserts_and_reports_errors(self):
+        content = (
+            "title,author,isbn,page_count,availability\n"
+            "New Book,New Author,9876543210987,300,true\n"
+            "Broken Book,Some Author,1111111111111,not-a-number,true\n"
+            "New Title,Test Author,1234567890123,250,true\n"
+        )
+        upload = SimpleUploadedFile("books.csv", content.encode(), content_type="text/csv")
+        response = self.client.post(reverse('book-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 3)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+        self.assertIn('page_count', response.data['errors'][0]['errors'])
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "New Title")
+        self.assertFalse(self.book.availability)  # Circulation state is not overwritten
+        self.assertTrue(Book.objects.filter(isbn="9876543210987").exists())
+
+    def test_non_utf8_csv_is_a_parse_error(self):
+        content = "title,author,isbn,page_count\nA,B,4,1\nCaf\u00e9,B,5,1\nC,B,6,1\n".encode('latin-1')
+        upload = SimpleUploadedFile("books.csv", content, content_type="text/csv")
+        response = self.client.post(reverse('book-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['imported'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['line'], 3)
+
+    def test_import_requires_admin(self):
+        self.client.force_authenticate(user=User.objects.create_user(username="reader", password="testpass"))
+        upload = SimpleUploadedFile("books.csv", b"title\n", content_type="text/csv")
+        response = self.client.post(reverse('book-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class BookImportServiceTest(TestCase):
+    def _jsonl(self, rows):
+        return BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+    def test_writes_in_batches(self):
+        rows = [
+            {"title": f"Book {index}", "author": "Author", "isbn": f"{index:013d}", "page_count": 100}
+            for index in range(50)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            report = BookService.import_books(iter_rows(self._jsonl(rows), 'jsonl'), batch_size=20)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(report['imported'], 50)
+        self.assertEqual(Book.objects.count(), 50)
+
+    def test_invalid_json_line_is_reported(self):
+        stream = BytesIO(b'{"title": "A", "author": "B", "isbn": "1", "page_count": 1}\n{not json}\n')
+        report = BookService.import_books(iter_rows(stream, 'jsonl'))
+        self.assertEqual(report['imported'], 1)
+        self.assertEqual(report['errors'], [{'line': 2, 'errors': {'non_field_errors': ["Invalid JSON."]}}])
+
+    def test_non_utf8_lines_are_reported(self):
+        stream = BytesIO(
+            b'{"title": "A", "author": "B", "isbn": "1", "page_count": 1}\n'
+            b'{"title": "Caf\xe9", "author": "B", "isbn": "2", "page_count": 1}\n'
+            b'{"title": "C", "author": "B", "isbn": "3", "page_count": 1}\n'
+        )
+        report = BookService.import_books(iter_rows(stream, 'jsonl'))
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual(report['errors'], [{'line': 2, 'errors': {'non_field_errors': ["Not valid UTF-8."]}}])
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as handle:
+            handle.write(json.dumps({"title": "A", "author": "B", "isbn": "42", "page_count": 10}) + "\n")
+            handle.flush()
+            out = StringIO()
+            call_command('import_books', handle.name, stdout=out)
+        self.assertIn("1 imported", out.getvalue())
+        self.assertTrue(Book.objects.filter(isbn="42").exists())
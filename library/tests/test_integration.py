@@ -3,13 +3,14 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from ..models import Book, Loan
+from .base import IsolatedCacheMixin
 from datetime import timedelta
 from django.utils import timezone
 from urllib.parse import quote_plus
 
 User = get_user_model()
 
-class BookIntegrationTest(APITestCase):
+class BookIntegrationTest(IsolatedCacheMixin, APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="testuser", password="testpass")
         self.admin = User.objects.create_superuser(username="admin", password="adminpass", role="admin")
@@ -0,0 +1,94 @@
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book, Loan
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class BookInventoryTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.other = User.objects.create_user(username="otheruser", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            isbn="1234567890123",
+            page_count=200,
+            total_copies=2,
+            available_copies=2
+        )
+
+    def borrow(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(reverse('borrow-book', args=[self.book.id]))
+
+    def test_borrow_takes_one_copy_at_a_time(self):
+        response = self.borrow(self.user)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['book']['available_copies'], 1)
+        self.assertTrue(response.data['book']['availability'])
+
+        response = self.borrow(self.other)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['book']['available_copies'], 0)
+        self.assertFalse(response.data['book']['availability'])
+
+        third = User.objects.create_user(username="thirduser", password="testpass")
+        response = self.borrow(third)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Loan.objects.count(), 2)
+
+    def test_return_puts_copy_back(self):
+        self.borrow(self.user)
+        self.borrow(self.other)
+        response = self.client.post(reverse('return-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.available_copies, 1)
+        self.assertTrue(self.book.availability)
+
+    def test_create_book_stocks_all_copies(self):
+        self.client.force_authenticate(user=self.admin)
+        data = {"title": "New Book", "author": "New Author", "isbn": "9876543210987", "page_count": 150, "total_copies": 3}
+        response = self.client.post(reverse('book-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        book = Book.objects.get(isbn="9876543210987")
+        self.assertEqual((book.total_copies, book.available_copies), (3, 3))
+
+    def test_admin_resizes_stock_around_loans(self):
+        self.borrow(self.user)
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('book-detail', args=[self.book.id])
+        data = {"title": "Test Book", "author": "Test Author", "isbn": "1234567890123", "page_count": 200}
+
+        response = self.client.put(url, {**data, "total_copies": 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_copies'], 4)
+
+        response = self.client.put(url, {**data, "total_copies": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_copies'], 0)
+        self.assertFalse(response.data['availability'])
+
+        response = self.client.put(url, {**data, "total_copies": 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.total_copies, 1)
+
+    def test_available_now_filter(self):
+        Book.objects.create(
+            title="Out Book", author="Test Author", isbn="1111111111111", page_count=100,
+            available_copies=0, availability=False
+        )
+        response = self.client.get(reverse('book-list-create'), {'available_now': 'true'})
+        self.assertEqual([book['title'] for book in response.data['results']], ["Test Book"])
+        response = self.client.get(reverse('book-list-create'), {'available_now': 'false'})
+        self.assertEqual([book['title'] for book in response.data['results']], ["Out Book"])
+
+    def test_available_copies_cannot_exceed_total(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Book.objects.filter(id=self.book.id).update(available_copies=3)
@@ -0,0 +1,155 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from ..models import Book, Job, Loan
+from ..services.job_service import JobService
+from ..services.notification_service import OVERDUE_NOTICE_JOB, OVERDUE_SCAN_JOB
+from ..utils.mail import SharedConnection
+from ..utils.rate_limit import RateLimiter
+
+User = get_user_model()
+
+class DueDateTest(APITestCase):
+    def test_borrowing_sets_due_date(self):
+        user = User.objects.create_user(username="testuser", password="testpass")
+        book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        self.client.force_authenticate(user=user)
+        self.client.post(reverse('borrow-book', args=[book.id]))
+        loan = Loan.objects.get()
+        self.assertAlmostEqual((loan.due_date - loan.borrowed_date).total_seconds(), 21 * 86400, delta=60)
+
+
+@override_settings(EMAIL_RATE_LIMIT=0, EMAIL_BATCH_SIZE=2)
+class OverdueNoticeTest(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        self.users = [
+            User.objects.create_user(username=f"reader{i}", email=f"reader{i}@example.com", password="testpass")
+            for i in range(3)
+        ]
+        self.opted_out = User.objects.create_user(
+            username="quiet", email="quiet@example.com", password="testpass", receive_email_notifications=False
+        )
+        for user in self.users + [self.opted_out]:
+            self.make_loan(user, due_days_ago=2)
+        self.make_loan(self.users[0], due_days_ago=2, returned=True)
+        self.make_loan(self.users[1], due_days_ago=-5)  # Not due yet
+
+    def make_loan(self, user, due_days_ago, returned=False):
+        loan = Loan.objects.create(user=user, book=self.book)
+        Loan.objects.filter(id=loan.id).update(
+            due_date=timezone.now() - timedelta(days=due_days_ago),
+            returned_date=timezone.now() if returned else None,
+        )
+        return loan
+
+    def run_worker(self):
+        out = StringIO()
+        call_command('run_worker', '--once', stdout=out)
+        return out.getvalue()
+
+    def test_notifies_each_overdue_loan_once(self):
+        output = self.run_worker()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [user.email for user in self.users])
+        # One notice job per overdue loan; the opted-out borrower's sends nothing
+        self.assertEqual(output.count(f"{OVERDUE_NOTICE_JOB}: done"), 4)
+
+        # The next scan only looks at loans that fell due since this one
+        scan = Job.objects.get(name=OVERDUE_SCAN_JOB, status='pending')
+        self.assertGreater(scan.run_at, timezone.now())
+        Job.objects.filter(id=scan.id).update(run_at=timezone.now())
+        late = self.make_loan(self.users[2], due_days_ago=0)
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertIn(self.book.title, mail.outbox[-1].subject)
+        self.assertEqual(Job.objects.filter(name=OVERDUE_SCAN_JOB, status='pending').count(), 1)
+
+        # Returned before the notice went out
+        Job.objects.filter(name=OVERDUE_SCAN_JOB, status='pending').update(run_at=timezone.now())
+        self.make_loan(self.users[0], due_days_ago=0)
+        Loan.objects.filter(id=late.id).update(returned_date=timezone.now())
+        Loan.objects.filter(returned_date__isnull=True, user=self.users[0]).update(returned_date=timezone.now())
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_failed_notice_is_retried_alone(self):
+        send_messages = mail.get_connection().__class__.send_messages
+        failing = {self.users[1].email}
+
+        def send_or_fail(backend, messages):
+            if messages[0].to[0] in failing:
+                raise OSError("Connection reset")
+            return send_messages(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', send_or_fail):
+            with self.assertLogs('library.jobs', 'ERROR'):
+                self.run_worker()
+            self.assertEqual(sorted(message.to[0] for message in mail.outbox), [self.users[0].email, self.users[2].email])
+            failing.clear()
+            Job.objects.filter(name=OVERDUE_NOTICE_JOB).update(run_at=timezone.now())
+            self.run_worker()
+        # Only the failed notice went out again
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox), sorted(user.email for user in self.users)
+        )
+
+    def test_failed_jobs_are_retried_then_kept(self):
+        JobService.enqueue('no_such_job')
+        with self.assertLogs('library.jobs', 'ERROR'):
+            job = JobService.run_next()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('no_such_job', job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        with self.settings(JOB_MAX_ATTEMPTS=2), self.assertLogs('library.jobs', 'ERROR'):
+            JobService.run_next()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNone(JobService.run_next())
+
+
+class RateLimiterTest(TestCase):
+    def test_spaces_out_batches(self):
+        now = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(clock=lambda: now[0], sleep=sleep)
+        limiter.wait(10, 5)
+        limiter.wait(10, 5)  # The first ten take two seconds at five a second
+        now[0] += 5
+        limiter.wait(1, 5)
+        self.assertEqual(slept, [2.0])
+
+
+class SharedConnectionTest(TestCase):
+    def test_reuses_then_replaces_the_connection(self):
+        opened = []
+
+        def factory():
+            connection = mail.get_connection()
+            opened.append(connection)
+            return connection
+
+        shared = SharedConnection(factory)
+        for index in range(3):
+            shared.send(mail.EmailMessage(subject=str(index), to=["reader@example.com"]), limit=2)
+        self.assertEqual(len(opened), 2)
+        with mock.patch.object(opened[-1], 'send_messages', side_effect=OSError), self.assertRaises(OSError):
+            shared.send(mail.EmailMessage(to=["reader@example.com"]), limit=2)
+        shared.send(mail.EmailMessage(to=["reader@example.com"]), limit=2)
+        self.assertEqual(len(opened), 3)  # Dropped after the failure
+        self.assertEqual(len(mail.outbox), 4)
@@ -0,0 +1,82 @@
+import os
+import re
+import runpy
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from library_management import settings as settings_module
+from ..models import Book
+from ..utils.metrics import reset_metrics
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class RequestMetricsTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        reset_metrics()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+
+    def server_timing(self, response):
+        return dict(
+            (name, float(duration)) for name, duration in re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing'])
+        )
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        timings = self.server_timing(response)
+        self.assertEqual(set(timings), {'db', 'serialize', 'total'})
+        self.assertGreater(timings['serialize'], 0)
+        self.assertGreaterEqual(timings['total'], timings['db'] + timings['serialize'])
+
+    def test_async_views_are_measured(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('async-book-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        self.assertGreater(self.server_timing(response)['serialize'], 0)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('book-list-create'))
+        self.client.get(reverse('book-detail', args=[self.book.id]))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE library_request_duration_seconds histogram', body)
+        self.assertIn('library_request_duration_seconds_count{view="book-list-create",method="GET"} 1', body)
+        self.assertIn('library_request_db_queries_bucket{view="book-detail",method="GET",le="+Inf"} 1', body)
+        self.assertIn('library_request_serialization_duration_seconds_sum{view="book-detail",method="GET"}', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metrics_closed_without_token_in_production(self):
+        # DEBUG as the settings module parses it from the environment
+        with mock.patch.dict(os.environ, {'DEBUG': 'False'}):
+            debug = runpy.run_path(settings_module.__file__)['DEBUG']
+        with self.settings(METRICS_TOKEN='', DEBUG=debug):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_query_log_names_the_service_method(self):
+        self.client.force_authenticate(user=self.user)
+        with self.assertLogs('library.slow_queries', level='WARNING') as logs:
+            response = self.client.post(reverse('borrow-book', args=[self.book.id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(any(
+            'LoanService.borrow_book in borrow-book' in line and 'library_loan' in line for line in logs.output
+        ))
@@ -0,0 +1,133 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from datetime import timedelta
+from ..models import Book, Loan
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class BookKeysetPaginationTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        # Duplicate titles make sure the id tie-breaker keeps pages disjoint
+        for index in range(25):
+            Book.objects.create(
+                title=f"Book {index % 8:02d}",
+                author="Test Author",
+                isbn=f"{index:013d}",
+                page_count=100 + index
+            )
+
+    def _collect(self, url):
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(book['id'] for book in response.data['results'])
+            url = response.data['next']
+        return seen
+
+    def test_cursor_pages_follow_title_then_id(self):
+        url = reverse('book-list-create') + '?pagination=cursor&page_size=4'
+        seen = self._collect(url)
+        expected = list(Book.objects.order_by('title', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_cursor_mode_skips_count_unless_requested(self):
+        url = reverse('book-list-create') + '?pagination=cursor'
+        response = self.client.get(url)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(url + '&include_count=true')
+        self.assertEqual(response.data['count'], 25)
+
+    def test_previous_link_returns_prior_page(self):
+        url = reverse('book-list-create') + '?pagination=cursor&page_size=5'
+        first = self.client.get(url)
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_invalid_cursor(self):
+        url = reverse('book-list-create') + '?cursor=not-a-cursor'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_is_default(self):
+        response = self.client.get(reverse('book-list-create'))
+        self.assertEqual(response.data['count'], 25)
+
+class LoanKeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        borrowed = timezone.now()
+        for index in range(12):
+            loan = Loan.objects.create(user=self.user, book=book)
+            # Pairs of loans share a timestamp to exercise the id tie-breaker
+            Loan.objects.filter(id=loan.id).update(borrowed_date=borrowed - timedelta(hours=index // 2))
+        self.client.force_authenticate(user=self.admin)
+
+    def test_cursor_pages_follow_borrowed_date_desc(self):
+        url = reverse('loan-list') + '?pagination=cursor&page_size=5'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(loan['id'] for loan in response.data['results'])
+            url = response.data['next']
+        expected = list(Loan.objects.order_by('-borrowed_date', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+class UserListPaginationTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        for index in range(14):
+            User.objects.create_user(
+                username=f"{'alice' if index < 4 else 'bob'}{index}",
+                password="testpass",
+                account_status="suspended" if index % 3 == 0 else "active",
+                address="A long postal address that the list never needs",
+            )
+        User.objects.filter(username="bob13").update(join_date=timezone.now() - timedelta(days=400))
+        self.client.force_authenticate(user=self.admin)
+
+    def test_cursor_pages_follow_id(self):
+        url = reverse('user-list') + '?page_size=4'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['message'], 'Users retrieved successfully')
+            seen.extend(user['id'] for user in response.data['data'])
+            url = response.data['next']
+        self.assertEqual(seen, list(User.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_list_reads_only_serialized_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('user-list'))
+        [select] = [query['sql'] for query in queries.captured_queries if 'FROM "library_user"' in query['sql']]
+        self.assertNotIn('"address"', select)
+        self.assertNotIn('"password"', select)
+
+    def test_filters(self):
+        def usernames(params):
+            response = self.client.get(reverse('user-list'), {**params, 'page_size': 100})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return {user['username'] for user in response.data['data']}
+
+        self.assertEqual(usernames({'username': 'alice'}), {'alice0', 'alice1', 'alice2', 'alice3'})
+        self.assertEqual(usernames({'username': 'alice', 'account_status': 'suspended'}), {'alice0', 'alice3'})
+        self.assertEqual(usernames({'role': 'admin'}), {'admin'})
+        before = (timezone.now() - timedelta(days=30)).date().isoformat()
+        self.assertEqual(usernames({'join_date_before': before}), {'bob13'})
+
+    def test_count_on_request(self):
+        response = self.client.get(reverse('user-list'), {'include_count': 'true', 'is_active': 'true'})
+        self.assertEqual(response.data['count'], 15)
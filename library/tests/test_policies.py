@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book, Hold, Loan
+from ..policies import REFUSALS
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+@override_settings(MAX_ACTIVE_LOANS={'user': 2})
+class BorrowingPolicyTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.books = [
+            Book.objects.create(title=f"Book {i}", author="Test Author", isbn=f"{i:013d}", page_count=100)
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def borrow(self, book):
+        return self.client.post(reverse('borrow-book', args=[book.id]))
+
+    def counters(self):
+        self.user.refresh_from_db()
+        return self.user.active_loans, self.user.next_due_date
+
+    def test_counters_follow_loans(self):
+        self.borrow(self.books[0])
+        first = Loan.objects.get(book=self.books[0])
+        self.assertEqual(self.counters(), (1, first.due_date))
+        self.borrow(self.books[1])
+        self.assertEqual(self.counters(), (2, first.due_date))
+
+        self.client.post(reverse('return-book', args=[self.books[0].id]))
+        second = Loan.objects.get(book=self.books[1])
+        self.assertEqual(self.counters(), (1, second.due_date))
+        Loan.objects.filter(id=second.id).update(due_date=second.due_date - timedelta(days=7))
+        self.assertEqual(self.counters(), (1, second.due_date - timedelta(days=7)))
+        second.delete()
+        self.assertEqual(self.counters(), (0, None))
+
+    def test_loan_limit(self):
+        self.borrow(self.books[0])
+        self.borrow(self.books[1])
+        response = self.borrow(self.books[2])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data['detail'], REFUSALS['loan_limit'])
+        self.books[2].refresh_from_db()
+        self.assertEqual(self.books[2].available_copies, 1)
+
+        self.client.post(reverse('return-book', args=[self.books[0].id]))
+        self.assertEqual(self.borrow(self.books[2]).status_code, status.HTTP_201_CREATED)
+
+        with self.settings(MAX_ACTIVE_LOANS={}):
+            self.assertEqual(self.borrow(self.books[0]).status_code, status.HTTP_201_CREATED)
+
+    def test_suspended_and_overdue_borrowers(self):
+        self.borrow(self.books[0])
+        Loan.objects.update(due_date=timezone.now() - timedelta(days=1))
+        response = self.borrow(self.books[1])
+        self.assertEqual((response.status_code, response.data['detail']), (status.HTTP_403_FORBIDDEN, REFUSALS['overdue']))
+        with self.settings(BLOCK_BORROWING_WHEN_OVERDUE=False):
+            self.assertEqual(self.borrow(self.books[1]).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(reverse('async-login'), {"username": "testuser", "password": "testpass"}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+        User.objects.filter(id=self.user.id).update(account_status='suspended')
+        response = self.client.post(reverse('async-borrow-book', args=[self.books[2].id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.json()['detail'], REFUSALS['account'])
+
+    def test_holds_skip_holders_who_cannot_borrow(self):
+        other = User.objects.create_user(username="other", password="testpass")
+        suspended = User.objects.create_user(username="suspended", password="testpass")
+        self.borrow(self.books[0])
+        for holder in (suspended, other):
+            self.client.force_authenticate(user=holder)
+            self.client.post(reverse('place-hold', args=[self.books[0].id]))
+        User.objects.filter(id=suspended.id).update(account_status='suspended')
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('return-book', args=[self.books[0].id]))
+        self.assertEqual(Loan.objects.get(book=self.books[0], returned_date__isnull=True).user, other)
+        self.assertTrue(Hold.objects.filter(user=suspended, status='waiting').exists())
@@ -0,0 +1,148 @@
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from ..filters import BookFilter, LoanFilter
+from ..models import Book, Loan
+from ..pagination import BookKeysetPagination, LoanKeysetPagination
+from ..repositories.book_repository import BookRepository
+from ..repositories.loan_repository import LoanRepository
+
+User = get_user_model()
+
+SEED_USERS = 200
+SEED_BOOKS = 2000
+SEED_LOANS = 20000
+PAGE_SIZE = 10
+
+# A full read of a table, as opposed to an index search or an ordered index walk
+SEQUENTIAL_SCAN = {
+    'sqlite': r'\bSCAN (library_book|library_loan)$',
+    'postgresql': r'Seq Scan on (library_book|library_loan)\b',
+}
+
+NOW = timezone.now()
+
+BOOK_FILTER_CASES = [
+    {},
+    {'availability': 'true'},
+    {'available_now': 'true'},
+    {'search': 'tolkien'},
+    {'search': 'rings', 'available_now': 'true'},
+]
+# Substring matches need the pg_trgm indexes (on UPPER(column) for icontains); other backends walk the title index instead
+POSTGRES_BOOK_FILTER_CASES = [
+    {'title': 'ring'},
+    {'author': 'tolk'},
+    {'fuzzy': 'tolkein'},
+]
+
+LOAN_FILTER_CASES = [
+    {},
+    {'user': '7'},
+    {'book': '42'},
+    {'is_active': 'true'},
+    {'is_active': 'false'},
+    {'user': '7', 'is_active': 'true'},
+    {'user': '7', 'book': '42'},
+    {'borrowed_date_after': (NOW - timedelta(days=7)).isoformat()},
+    {'borrowed_date_before': (NOW - timedelta(days=300)).isoformat()},
+    {
+        'borrowed_date_after': (NOW - timedelta(days=60)).isoformat(),
+        'borrowed_date_before': (NOW - timedelta(days=30)).isoformat(),
+    },
+    {
+        'returned_date_after': (NOW - timedelta(days=14)).date().isoformat(),
+        'returned_date_before': (NOW - timedelta(days=7)).date().isoformat(),
+    },
+    {'user': '7', 'borrowed_date_after': (NOW - timedelta(days=90)).isoformat()},
+]
+
+
+class QueryPlanTest(TestCase):
+    # Seeds enough rows that the planner prefers an index whenever one applies, then
+    # fails if any filter path falls back to reading a whole table.
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(username=f'user{index}', email=f'user{index}@example.com', password='!')
+            for index in range(SEED_USERS)
+        )
+        Book.objects.bulk_create(
+            Book(
+                title=f'Title {index:05d}' if index % 100 else f'The Lord of the Rings {index}',
+                author=f'Author {index % 300}' if index % 100 else 'J.R.R. Tolkien',
+                isbn=f'{index:013d}',
+                page_count=100 + index % 500,
+                available_copies=index % 7 and 1,
+                availability=bool(index % 7),
+            )
+            for index in range(SEED_BOOKS)
+        )
+        user_ids = list(User.objects.values_list('id', flat=True))
+        book_ids = list(Book.objects.values_list('id', flat=True))
+
+        # Raw insert: borrowed_date is auto_now_add and would be overwritten by bulk_create
+        rows = []
+        for index in range(SEED_LOANS):
+            borrowed = NOW - timedelta(minutes=30 * index)
+            # Most loans are historical; only the most recent few hundred are still out
+            returned = None if index < 500 else borrowed + timedelta(days=14)
+            rows.append((
+                user_ids[index % len(user_ids)],
+                book_ids[(index * 7) % len(book_ids)],
+                connection.ops.adapt_datetimefield_value(borrowed),
+                connection.ops.adapt_datetimefield_value(returned),
+                connection.ops.adapt_datetimefield_value(borrowed + timedelta(days=21)),
+            ))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO library_loan (user_id, book_id, borrowed_date, returned_date, due_date) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+            cursor.execute('ANALYZE')
+
+    def assertNoSequentialScan(self, queryset, label):
+        pattern = SEQUENTIAL_SCAN.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f'No plan check for {connection.vendor}')
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            # SQLite prefixes each plan row with node ids
+            line = re.sub(r'^[\d\s]+', '', line.strip())
+            self.assertIsNone(re.search(pattern, line), f'{label} regressed to a sequential scan:\n{plan}')
+
+    def check_filters(self, filterset_class, base_queryset, cases, keyset_ordering):
+        for params in cases:
+            with self.subTest(params=params):
+                filterset = filterset_class(params, queryset=base_queryset)
+                self.assertTrue(filterset.is_valid(), filterset.errors)
+                queryset = filterset.qs
+                self.assertNoSequentialScan(queryset[:PAGE_SIZE], f'{params} (page)')
+                # Cursor mode re-sorts every result, ranked searches included, by the keyset ordering
+                keyset = queryset.order_by(*keyset_ordering)
+                self.assertNoSequentialScan(keyset[:PAGE_SIZE + 1], f'{params} (cursor)')
+
+    def test_book_filters(self):
+        cases = list(BOOK_FILTER_CASES)
+        if connection.vendor == 'postgresql':
+            cases += POSTGRES_BOOK_FILTER_CASES
+        self.check_filters(BookFilter, BookRepository.get_queryset(), cases, BookKeysetPagination.ordering)
+
+    def test_loan_filters(self):
+        self.check_filters(LoanFilter, LoanRepository.get_queryset(), LOAN_FILTER_CASES, LoanKeysetPagination.ordering)
+
+    def test_active_loan_lookup(self):
+        user = User.objects.get(username='user7')
+        book_id = Loan.objects.filter(user=user).values_list('book_id', flat=True).first()
+        queryset = LoanRepository.get_queryset().filter(user=user, book_id=book_id, returned_date__isnull=True)
+        self.assertNoSequentialScan(queryset[:1], 'return_book active loan lookup')
+
+    def test_overdue_scan(self):
+        since = NOW - timedelta(days=1)
+        self.assertNoSequentialScan(LoanRepository.overdue(since, NOW, None, 1000), 'overdue scan')
+        self.assertNoSequentialScan(LoanRepository.overdue(since, NOW, (since, 42), 1000), 'overdue scan (next batch)')
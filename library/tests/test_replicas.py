@@ -0,0 +1,102 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..middleware import PRIMARY_PIN_COOKIE
+from ..models import Book, Loan
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+# Any second test database that is not a mirror of the primary can stand in for a replica that
+# has fallen behind: rows written during a test only reach it when copied there explicitly.
+# For example, with SQLite: DATABASES['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+REPLICA = next((
+    alias for alias, database in settings.DATABASES.items()
+    if alias != 'default' and not database.get('TEST', {}).get('MIRROR')
+), None)
+
+@skipUnless(REPLICA, "Needs a second, unmirrored test database to stand in for a lagging replica")
+@override_settings(DATABASE_REPLICAS=[REPLICA], DATABASE_REPLICA_LAG=5)
+class ReplicaRoutingTest(IsolatedCacheMixin, APITestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        # The replica has caught up with everything so far
+        self.replicate(self.user, self.admin, self.book)
+
+    def replicate(self, *instances):
+        for instance in instances:
+            instance.save(using=REPLICA)
+
+    def book_data(self, **changes):
+        return {"title": "Test Book", "author": "Test Author", "isbn": "1234567890123", "page_count": 200, **changes}
+
+    def test_catalogue_reads_use_the_replica(self):
+        Book.objects.filter(id=self.book.id).update(title="Renamed")
+        response = self.client.get(reverse('book-detail', args=[self.book.id]))
+        self.assertEqual(response.data['title'], "Test Book")
+        response = self.client.get(reverse('book-list-create'))
+        self.assertEqual([book['title'] for book in response.data['results']], ["Test Book"])
+        response = self.client.get(reverse('async-book-detail', args=[self.book.id]))
+        self.assertEqual(response.json()['title'], "Test Book")
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('borrow-book', args=[self.book.id]))
+        self.assertEqual(response.data['book']['available_copies'], 0)
+        self.assertEqual(response.cookies[PRIMARY_PIN_COOKIE]['max-age'], 5)
+
+        cache.clear()  # Past the catalogue change window
+        response = self.client.get(reverse('book-detail', args=[self.book.id]))
+        self.assertEqual(response.data['available_copies'], 0)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+        cache.clear()
+        response = self.client_class().get(reverse('book-detail', args=[self.book.id]))
+        self.assertEqual(response.data['available_copies'], 1)
+
+    def test_unsafe_requests_read_from_the_primary(self):
+        # Neither has reached the replica yet
+        book = Book.objects.create(title="New Book", author="Someone", isbn="9876543210987", page_count=10)
+        User.objects.create_user(username="newuser", password="testpass")
+        self.assertEqual(self.client.get(reverse('book-detail', args=[book.id])).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.put(reverse('book-detail', args=[book.id]), self.book_data(isbn="9876543210987"), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('register'), {
+            "username": "newuser", "email": "newuser@example.com", "password": "newpass123", "role": "user"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)  # Username checked on the primary
+
+    def test_catalogue_changes_are_cached_from_the_primary(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.put(reverse('book-detail', args=[self.book.id]), self.book_data(title="Renamed"), format='json')
+
+        reader = self.client_class()
+        response = reader.get(reverse('book-detail', args=[self.book.id]))
+        self.assertEqual((response.data['title'], response['X-Cache']), ("Renamed", 'MISS'))
+        response = reader.get(reverse('book-detail', args=[self.book.id]))
+        self.assertEqual((response.data['title'], response['X-Cache']), ("Renamed", 'HIT'))
+
+    def test_loan_listing_exports_and_stats_use_the_replica(self):
+        loan = Loan.objects.create(user=self.user, book=self.book)
+        self.client.force_authenticate(user=self.admin)
+
+        def read():
+            loans = self.client.get(reverse('loan-list')).data['results']
+            export = b"".join(self.client.get(reverse('loan-export')).streaming_content).decode()
+            borrowers = self.client.get(reverse('stats-active-borrowers')).data['results']
+            return len(loans), len(export.splitlines()) - 1, [user['username'] for user in borrowers]
+
+        self.assertEqual(read(), (0, 0, []))
+        self.replicate(loan)
+        self.assertEqual(read(), (1, 1, ['testuser']))
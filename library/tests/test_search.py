@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from ..models import Book
+from ..search import book_trigram_index, trigrams
+from .base import IsolatedCacheMixin
+
+class BookSearchTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.rings = Book.objects.create(
+            title="The Lord of the Rings", author="J.R.R. Tolkien", isbn="1000000000001", page_count=1200
+        )
+        self.hobbit = Book.objects.create(
+            title="The Hobbit", author="J.R.R. Tolkien", isbn="1000000000002", page_count=300
+        )
+        self.biography = Book.objects.create(
+            title="Tolkien: A Biography", author="Humphrey Carpenter", isbn="1000000000003", page_count=250
+        )
+        Book.objects.create(title="Rings of Saturn", author="W.G. Sebald", isbn="1000000000004", page_count=300)
+
+    def _search(self, query):
+        response = self.client.get(reverse('book-list-create'), {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book['id'] for book in response.data['results']]
+
+    def test_prefix_match_across_title_and_author(self):
+        self.assertEqual(set(self._search('tolk')), {self.rings.id, self.hobbit.id, self.biography.id})
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._search('tolkien ring'), [self.rings.id])
+
+    def test_title_matches_rank_above_author_matches(self):
+        self.assertEqual(self._search('tolkien')[0], self.biography.id)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.hobbit.title = "There and Back Again"
+        self.hobbit.save()
+        self.assertEqual(self._search('back again'), [self.hobbit.id])
+        self.hobbit.delete()
+        cache.clear()
+        self.assertEqual(self._search('back again'), [])
+
+
+class BookFuzzySearchTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.rings = Book.objects.create(
+            title="The Lord of the Rings", author="J.R.R. Tolkien", isbn="1000000000001", page_count=1200
+        )
+        self.dune = Book.objects.create(
+            title="Dune", author="Frank Herbert", isbn="1000000000002", page_count=600
+        )
+        book_trigram_index.invalidate()
+
+    def _fuzzy(self, **params):
+        response = self.client.get(reverse('book-list-create'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book['id'] for book in response.data['results']]
+
+    def test_trigrams_match_pg_trgm(self):
+        self.assertEqual(trigrams("Cat"), {"  c", " ca", "cat", "at "})
+
+    def test_misspelled_author_is_found(self):
+        self.assertEqual(self._fuzzy(fuzzy="Tolkein", similarity=0.2), [self.rings.id])
+
+    def test_similarity_threshold(self):
+        self.assertEqual(self._fuzzy(fuzzy="Herbet", similarity=0.3), [self.dune.id])
+        self.assertEqual(self._fuzzy(fuzzy="Herbet", similarity=0.9), [])
+
+    def test_results_ordered_by_similarity(self):
+        closer = Book.objects.create(
+            title="Unfinished Tales", author="Tolkien", isbn="1000000000003", page_count=300
+        )
+        book_trigram_index.invalidate()
+        self.assertEqual(self._fuzzy(fuzzy="Tolkein", similarity=0.2), [closer.id, self.rings.id])
+
+    def test_invalid_threshold(self):
+        response = self.client.get(reverse('book-list-create'), {'fuzzy': 'dune', 'similarity': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -134,7 +134,9 @@ class BookSerializerTest(TestCase):
             "author": "Test Author",
             "isbn": "1234567890123",
             "page_count": 200,
-            "availability": True
+            "availability": True,
+            "total_copies": 1,
+            "available_copies": 1
         }
         self.book = Book.objects.create(**self.book_data)
         self.book_data['id'] = self.book.id
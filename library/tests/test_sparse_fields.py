@@ -0,0 +1,72 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Book, Loan
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+class SparseFieldsetTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass", email="test@example.com")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.book = Book.objects.create(title="Test Book", author="Test Author", isbn="1234567890123", page_count=200)
+        for _ in range(3):
+            Loan.objects.create(user=self.user, book=self.book)
+        self.client.force_authenticate(user=self.admin)
+
+    def get_loans(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('loan-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        page_query = queries.captured_queries[-1]['sql']
+        return response.data['results'], page_query
+
+    def test_default_shape_is_unchanged(self):
+        results, _ = self.get_loans()
+        self.assertEqual(results[0]['user']['username'], "testuser")
+        self.assertEqual(results[0]['book']['title'], "Test Book")
+
+    def test_fields_limit_output_and_columns(self):
+        results, query = self.get_loans(fields='id,borrowed_date')
+        self.assertEqual(set(results[0]), {'id', 'borrowed_date'})
+        self.assertNotIn('JOIN', query)
+        self.assertNotIn('"returned_date"', query)
+
+    def test_unexpanded_relations_render_as_ids(self):
+        results, query = self.get_loans(expand='book')
+        self.assertEqual(results[0]['user'], self.user.id)
+        self.assertEqual(results[0]['book']['isbn'], "1234567890123")
+        self.assertIn('"library_book"', query)
+        self.assertNotIn('"library_user"', query)
+
+    def test_nested_fields_imply_expansion(self):
+        results, query = self.get_loans(fields='id,user.email,book.title')
+        self.assertEqual(results[0]['user'], {'email': "test@example.com"})
+        self.assertEqual(results[0]['book'], {'title': "Test Book"})
+        self.assertNotIn('"page_count"', query)
+
+    def test_cursor_mode_keeps_ordering_columns(self):
+        url = reverse('loan-list')
+        first = self.client.get(url, {'pagination': 'cursor', 'page_size': 2, 'fields': 'id'})
+        with self.assertNumQueries(1):
+            second = self.client.get(first.data['next'])
+        ids = [loan['id'] for loan in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, list(Loan.objects.order_by('-borrowed_date', 'id').values_list('id', flat=True)))
+
+    def test_books_and_users(self):
+        response = self.client.get(reverse('book-list-create'), {'fields': 'id,title'})
+        self.assertEqual(response.data['results'], [{'id': self.book.id, 'title': "Test Book"}])
+        response = self.client.get(reverse('user-list'), {'fields': 'username'})
+        self.assertEqual({user['username'] for user in response.data['data']}, {"testuser", "admin"})
+        self.assertEqual(set(response.data['data'][0]), {'username'})
+
+    def test_unknown_names_are_rejected(self):
+        for params in ({'fields': 'id,password'}, {'expand': 'author'}):
+            response = self.client.get(reverse('book-list-create'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+        response = self.client.get(reverse('loan-list'), {'fields': 'book.secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
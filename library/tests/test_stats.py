@@ -0,0 +1,88 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import ArchivedLoan, Book, Job, Loan
+from ..services.job_service import JobService
+from ..services.stats_service import STATS_ROLLUP_JOB
+from .base import IsolatedCacheMixin
+
+User = get_user_model()
+
+def make_loan(user, book, days_ago, returned_days_ago=None):
+    loan = Loan.objects.create(user=user, book=book)
+    now = timezone.now()
+    returned_date = None if returned_days_ago is None else now - timedelta(days=returned_days_ago)
+    Loan.objects.filter(id=loan.id).update(borrowed_date=now - timedelta(days=days_ago), returned_date=returned_date)
+
+class CirculationStatsTest(IsolatedCacheMixin, APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.reader = User.objects.create_user(username="reader", password="testpass")
+        self.other = User.objects.create_user(username="other", password="testpass")
+        self.popular = Book.objects.create(title="Popular", author="Author", isbn="1111111111111", page_count=100, total_copies=5, available_copies=5)
+        self.niche = Book.objects.create(title="Niche", author="Author", isbn="2222222222222", page_count=100, availability=False, available_copies=0)
+        make_loan(self.reader, self.popular, 3, 1)
+        make_loan(self.other, self.popular, 3)
+        make_loan(self.reader, self.niche, 3)
+        make_loan(self.reader, self.popular, 1)
+        # Archived loans still count towards history
+        long_ago = timezone.now() - timedelta(days=400)
+        ArchivedLoan.objects.create(id=10 ** 6, user=self.other, book=self.niche, borrowed_date=long_ago,
+                                    returned_date=long_ago + timedelta(days=5))
+        call_command('rollup_loan_stats', stdout=StringIO())
+        self.client.force_authenticate(user=self.admin)
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_daily_loans(self):
+        today = timezone.localdate()
+        with self.assertNumQueries(1):
+            data = self.get('stats-daily-loans')
+        self.assertEqual((data['borrowed'], data['returned']), (4, 1))
+        self.assertEqual(
+            [(day['date'], day['borrowed'], day['returned']) for day in data['days']],
+            [(today - timedelta(days=3), 3, 0), (today - timedelta(days=1), 1, 1)],
+        )
+        data = self.get('stats-daily-loans', start=(today - timedelta(days=500)).isoformat())
+        self.assertEqual((data['borrowed'], data['returned']), (5, 2))
+
+        response = self.client.get(reverse('stats-daily-loans'), {'start': today.isoformat(), 'end': (today - timedelta(days=1)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_most_borrowed_books_and_active_borrowers(self):
+        with self.assertNumQueries(1):
+            data = self.get('stats-most-borrowed-books', limit=1)
+        self.assertEqual(data['results'], [
+            {'id': self.popular.id, 'title': "Popular", 'author': "Author", 'isbn': "1111111111111", 'borrowed': 3},
+        ])
+        with self.assertNumQueries(1):
+            data = self.get('stats-active-borrowers')
+        self.assertEqual([(user['username'], user['active_loans']) for user in data['results']], [("reader", 2), ("other", 1)])
+
+        self.client.force_authenticate(user=self.reader)
+        self.assertEqual(self.client.get(reverse('stats-daily-loans')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rollup_job_recounts_recent_days(self):
+        self.client.force_authenticate(user=self.other)
+        self.client.post(reverse('return-book', args=[self.popular.id]))
+        self.client.post(reverse('borrow-book', args=[self.niche.id]))  # Still on loan to reader
+        self.client.post(reverse('borrow-book', args=[self.popular.id]))
+
+        # Picked up by the worker, which then schedules the next rollup
+        JobService.enqueue(STATS_ROLLUP_JOB)
+        JobService.run_next()
+        self.assertTrue(Job.objects.filter(name=STATS_ROLLUP_JOB, status='pending', run_at__gt=timezone.now()).exists())
+
+        self.client.force_authenticate(user=self.admin)
+        today = self.get('stats-daily-loans')['days'][-1]
+        self.assertEqual((today['date'], today['borrowed'], today['returned']), (timezone.localdate(), 1, 1))
+        self.assertEqual(self.get('stats-most-borrowed-books')['results'][0]['borrowed'], 4)
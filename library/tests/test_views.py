@@ -3,6 +3,7 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from ..models import Book, Loan
+from .base import IsolatedCacheMixin
 
 User = get_user_model()
 
@@ -102,7 +103,7 @@ class UserAPITest(APITestCase):
         self.user.refresh_from_db()
         self.assertTrue(self.user.is_active)
 
-class BookAPITest(APITestCase):
+class BookAPITest(IsolatedCacheMixin, APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username="testuser", password="testpass")
         self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
@@ -181,7 +182,22 @@ class LoanAPITest(APITestCase):
         url = reverse('borrow-book', args=[self.book.id])
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertTrue(Loan.objects.filter(user=self.user, book=self.book).exists())
+        loan = Loan.objects.get(user=self.user, book=self.book)
+        self.assertEqual(response.data['due_date'], loan.due_date.isoformat().replace('+00:00', 'Z'))
+
+    def test_borrow_unavailable_book(self):
+        self.book.availability = False
+        self.book.available_copies = 0
+        self.book.save()
+        url = reverse('borrow-book', args=[self.book.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Loan.objects.exists())
+
+    def test_borrow_missing_book(self):
+        url = reverse('borrow-book', args=[self.book.id + 1])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_return_book(self):
         Loan.objects.create(user=self.user, book=self.book)
@@ -197,4 +213,41 @@ class LoanAPITest(APITestCase):
         url = reverse('loan-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('results', response.data)
\ No newline at end of file
+        self.assertIn('results', response.data)
+
+class LoanQueryCountTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.admin = User.objects.create_user(username="admin", password="adminpass", role="admin")
+        self.books = [
+            Book.objects.create(
+                title=f"Book {index}",
+                author="Test Author",
+                isbn=f"{index:013d}",
+                page_count=200
+            )
+            for index in range(10)
+        ]
+
+    def test_loan_list_query_count_is_constant(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('loan-list')
+        Loan.objects.create(user=self.user, book=self.books[0])
+        with self.assertNumQueries(2):  # COUNT + one joined SELECT
+            self.client.get(url)
+
+        for book in self.books[1:]:
+            Loan.objects.create(user=self.user, book=book)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_borrow_and_return_query_count(self):
+        self.client.force_authenticate(user=self.user)
+        # Conditional UPDATEs of the book and the user + INSERT inside a savepoint, then the book for the response
+        with self.assertNumQueries(6):
+            self.client.post(reverse('borrow-book', args=[self.books[0].id]))
+        # Active loan lookup, then both UPDATEs and the next-hold lookup inside a savepoint
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('return-book', args=[self.books[0].id]))
+        self.assertEqual(response.data['book']['id'], self.books[0].id)
@@ -5,5 +5,8 @@ urlpatterns = [
     path('users/', include('library.routes.user_urls')),
     path('books/', include('library.routes.book_urls')),
     path('loans/', include('library.routes.loan_urls')),
+    path('holds/', include('library.routes.hold_urls')),
+    path('stats/', include('library.routes.stats_urls')),
+    path('async/', include('library.routes.async_urls')),
     path('', include('library.routes.password_urls')),  
 ]
@@ -0,0 +1,57 @@
+import csv
+import json
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+NOT_UTF8 = "Not valid UTF-8."
+
+
+def detect_format(filename, default='csv'):
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def decode_lines(binary_stream):
+    # Decodes one line at a time, so a bad byte is reported at its line instead of failing the import
+    for line_number, line in enumerate(binary_stream, start=1):
+        yield line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+
+
+def iter_csv_rows(binary_stream):
+    reader = csv.DictReader(decode_lines(binary_stream))
+    try:
+        for row in reader:
+            yield reader.line_num, row, None
+    except UnicodeDecodeError:
+        # A quoted field may span lines, so the rest of the file cannot be split reliably
+        yield reader.line_num + 1, None, f"{NOT_UTF8} The rest of the file was skipped."
+
+
+def iter_jsonl_rows(binary_stream):
+    for line_number, line in enumerate(binary_stream, start=1):
+        try:
+            line = line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            yield line_number, None, NOT_UTF8
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON."
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Expected a JSON object."
+            continue
+        yield line_number, row, None
+
+
+def iter_rows(binary_stream, file_format):
+    # Yields (line number, row, parse error) one line at a time, so large files are never loaded whole
+    if file_format == 'jsonl':
+        return iter_jsonl_rows(binary_stream)
+    return iter_csv_rows(binary_stream)
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    # Shared by every request in the process: at most PASSWORD_HASHING_WORKERS hashes run at
+    # once and the rest queue, instead of each request burning a core on its own thread.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                thread_name_prefix='password-hashing',
+            )
+        return _executor
+
+
+async def run_in_hashing_pool(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hashing_executor(), partial(func, *args, **kwargs))
+
+
+def verify_password(raw_password, encoded):
+    # Returns (is_correct, new_encoded); new_encoded is set when the hash should be upgraded
+    upgraded = []
+    is_correct = check_password(raw_password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return is_correct, upgraded[0] if upgraded else None
@@ -0,0 +1,41 @@
+import threading
+
+from django.core.mail import get_connection
+
+
+class SharedConnection:
+    # A mail connection kept open across consecutive sends in the process, so one-message jobs
+    # do not each pay for a connection. It is replaced after `limit` messages, and dropped when a
+    # send fails so the retry starts on a fresh one.
+    def __init__(self, factory=get_connection):
+        self.factory = factory
+        self.connection = None
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    def send(self, message, limit):
+        with self.lock:
+            if self.connection is not None and self.sent >= limit:
+                self._close()
+            if self.connection is None:
+                self.connection = self.factory()
+                self.connection.open()
+            try:
+                count = self.connection.send_messages([message])
+            except Exception:
+                self._close()
+                raise
+            self.sent += 1
+            return count
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            finally:
+                self.connection = None
+                self.sent = 0
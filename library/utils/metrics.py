@@ -0,0 +1,154 @@
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'services') + os.sep
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger('library.slow_queries')
+
+
+class Histogram:
+    # Per-process, like CacheStats: each worker exposes its own series
+    def __init__(self, name, documentation, buckets, labels=('view', 'method')):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels[label] for label in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, (list(counts), count, total)) for key, (counts, count, total) in self._series.items())
+        for key, (counts, count, total) in series:
+            labels = ','.join(f'{label}="{escape_label(value)}"' for label, value in zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+def percentile(values, pct):
+    # Nearest-rank percentile of a sorted list
+    index = max(0, min(len(values) - 1, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_DURATION = Histogram(
+    'library_request_duration_seconds', "Wall time per request.", DURATION_BUCKETS)
+REQUEST_DB_DURATION = Histogram(
+    'library_request_db_duration_seconds', "Time spent in database queries per request.", DURATION_BUCKETS)
+REQUEST_DB_QUERIES = Histogram(
+    'library_request_db_queries', "Database queries per request.", QUERY_COUNT_BUCKETS)
+REQUEST_SERIALIZATION_DURATION = Histogram(
+    'library_request_serialization_duration_seconds', "Time spent rendering the response body per request.",
+    DURATION_BUCKETS)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_SERIALIZATION_DURATION)
+
+
+def render_metrics():
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.view = None
+
+
+# Set by RequestMetricsMiddleware; copied into the threads that sync_to_async runs queries on
+current_request_metrics = ContextVar('current_request_metrics', default=None)
+
+
+@contextmanager
+def serialization_timer():
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.serialization_time += time.perf_counter() - started
+
+
+def service_method():
+    # Innermost BookService/LoanService/UserService method on the stack, e.g. 'LoanService.borrow_book'
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(SERVICES_DIR):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+def record_query(execute, sql, params, many, context):
+    # Installed on every connection as an execute wrapper, see install_query_wrapper()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_time += elapsed
+        threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+        if threshold is not None and elapsed * 1000 >= threshold:
+            slow_query_logger.warning(
+                "Slow query (%.1f ms) from %s in %s: %s",
+                elapsed * 1000,
+                service_method() or 'no service',
+                getattr(metrics, 'view', None) or 'no view',
+                sql,
+                extra={'duration_ms': elapsed * 1000, 'sql': sql, 'params': params},
+            )
+
+
+def install_query_wrapper(connection, **kwargs):
+    # Also the connection_created receiver; the wrapper list survives reconnects. Inserted first so
+    # that connection.execute_wrapper() blocks, which pop the last wrapper, leave it in place.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
@@ -0,0 +1,22 @@
+import threading
+import time
+
+
+class RateLimiter:
+    # Spaces out work to at most `rate` units per second on average, across every caller in the
+    # process: wait(n) blocks until the previous batch's share of time has passed.
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = None
+        self.lock = threading.Lock()
+
+    def wait(self, count, rate):
+        if rate <= 0:
+            return  # Unlimited
+        with self.lock:
+            now = self.clock()
+            if self.next_at is not None and self.next_at > now:
+                self.sleep(self.next_at - now)
+                now = self.next_at
+            self.next_at = now + count / rate
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from ..routers import pin_to_primary
+
+CATALOGUE_VERSION_KEY = 'library:catalogue:version'
+# Present for DATABASE_REPLICA_LAG seconds after a catalogue change
+CATALOGUE_CHANGED_KEY = 'library:catalogue:changed'
+
+
+class CacheStats:
+    # Per-process counters; each worker reports its own numbers
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {'hit': 0, 'miss': 0, 'not_modified': 0}
+
+    def record(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self.counts)
+        served = counts['hit'] + counts['not_modified']
+        total = served + counts['miss']
+        counts['hit_ratio'] = round(served / total, 4) if total else 0.0
+        return counts
+
+
+catalogue_cache_stats = CacheStats()
+
+
+def get_catalogue_cache():
+    return caches[getattr(settings, 'CATALOGUE_CACHE_ALIAS', 'default')]
+
+
+def get_catalogue_version():
+    cache = get_catalogue_cache()
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version number
+        cache.add(CATALOGUE_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(CATALOGUE_VERSION_KEY)
+    return version
+
+
+async def aget_catalogue_version():
+    cache = get_catalogue_cache()
+    version = await cache.aget(CATALOGUE_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOGUE_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = await cache.aget(CATALOGUE_VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version():
+    cache = get_catalogue_cache()
+    if settings.DATABASE_REPLICAS:
+        cache.set(CATALOGUE_CHANGED_KEY, True, timeout=settings.DATABASE_REPLICA_LAG)
+    try:
+        return cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        return get_catalogue_version()
+
+
+def request_digest(request):
+    # Blank filters are ignored by the views, and parameter order does not matter. GET is the
+    # query string of a Django request, and of a DRF one through its proxying.
+    params = sorted(
+        (key, sorted(value for value in values if value))
+        for key, values in request.GET.lists()
+    )
+    params = [(key, values) for key, values in params if values]
+    raw = f'{request.get_host()}|{request.path}|{params}'
+    return hashlib.md5(raw.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def catalogue_cache_key(version, request):
+    digest = request_digest(request)
+    return f'library:catalogue:{version}:{digest}', f'W/"{version}-{digest}"'
+
+
+def cache_catalogue_response(view_method):
+    # Caches successful GET responses under the current catalogue version. Any write that
+    # bumps the version makes every cached page and ETag stale at once.
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        cache = get_catalogue_cache()
+        key, etag = catalogue_cache_key(get_catalogue_version(), request)
+
+        if etag_matches(request, etag):
+            catalogue_cache_stats.record('not_modified')
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        cached = cache.get(key)
+        if cached is not None:
+            catalogue_cache_stats.record('hit')
+            return Response(cached, headers={'ETag': etag, 'X-Cache': 'HIT'})
+
+        catalogue_cache_stats.record('miss')
+        if settings.DATABASE_REPLICAS and cache.get(CATALOGUE_CHANGED_KEY):
+            # A lagging replica would put the old catalogue in the cache under the new version
+            pin_to_primary()
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300))
+            response['ETag'] = etag
+            response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+def acache_catalogue_response(view_method):
+    # cache_catalogue_response for the async views, which return rendered JSON: the body is cached
+    @wraps(view_method)
+    async def wrapper(self, request, *args, **kwargs):
+        cache = get_catalogue_cache()
+        key, etag = catalogue_cache_key(await aget_catalogue_version(), request)
+
+        if etag_matches(request, etag):
+            catalogue_cache_stats.record('not_modified')
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        cached = await cache.aget(key)
+        if cached is not None:
+            catalogue_cache_stats.record('hit')
+            return HttpResponse(cached, content_type='application/json', headers={'ETag': etag, 'X-Cache': 'HIT'})
+
+        catalogue_cache_stats.record('miss')
+        if settings.DATABASE_REPLICAS and await cache.aget(CATALOGUE_CHANGED_KEY):
+            pin_to_primary()
+        response = await view_method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, response.content, timeout=getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300))
+            response['ETag'] = etag
+            response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
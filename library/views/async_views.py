@@ -0,0 +1,192 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.exceptions import InvalidToken
+from ..authentication import ClaimsJWTAuthentication
+from ..filters import BookFilter
+from ..models import Book
+from ..pagination import BookKeysetPagination, KeysetPagination, get_paginator
+from ..renderers import FastJSONRenderer
+from ..repositories.book_repository import BookRepository
+from ..routers import read_alias
+from ..serializers.book_serializers import BookSerializer
+from ..serializers.fast import book_rows, book_values
+from ..serializers.loan_serializers import LoanSerializer
+from ..serializers.sparse import sparse_fieldset
+from ..services.book_service import BookService
+from ..services.loan_service import LoanService
+from ..utils.metrics import serialization_timer
+from ..utils.response_cache import acache_catalogue_response
+
+# Async counterparts of the book, loan and auth views for ASGI deployments. Reads use the async
+# ORM; writes go through the same services via sync_to_async, since they need transactions.
+
+
+def json_response(data, status=200):
+    with serialization_timer():
+        content = FastJSONRenderer().render(data)
+    return HttpResponse(content, status=status, content_type='application/json')
+
+
+def parse_json(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    authentication = ClaimsJWTAuthentication()
+
+    async def authorize(self, request, role=None):
+        # Returns (user, None), or (None, error response) like DRF's 401/403 handling
+        try:
+            result = await self.authentication.aauthenticate(request)
+        except (InvalidToken, AuthenticationFailed) as e:
+            return None, json_response(e.detail if isinstance(e.detail, dict) else {"detail": e.detail}, status=401)
+        if result is None:
+            return None, json_response({"detail": "Authentication credentials were not provided."}, status=401)
+        user = result[0]
+        if role is not None and user.role != role:
+            return None, json_response({"detail": "You do not have permission to perform this action."}, status=403)
+        return user, None
+
+
+def book_page(page, shape):
+    # The shapes BookListCreateView returns: sparse fieldsets through the serializer, else values() rows
+    return BookSerializer(page, many=True, **shape).data if shape else book_rows(page)
+
+
+class AsyncBookListCreateView(AsyncAPIView):
+    # As on BookListCreateView, for get_paginator
+    pagination_class = PageNumberPagination
+    keyset_pagination_class = BookKeysetPagination
+
+    @acache_catalogue_response
+    async def get(self, request):
+        query = Request(request)  # query_params for the sparse fieldset and pagination helpers
+        try:
+            shape = sparse_fieldset(query)
+            serializer = BookSerializer(**shape)
+        except ValidationError as e:
+            return json_response(e.detail, status=400)
+        paginator = get_paginator(self, query)
+        books = serializer.optimize_queryset(BookService.get_all_books(), always=getattr(paginator, 'ordering', ()))
+        filterset = BookFilter(request.GET, queryset=books)
+        if not filterset.is_valid():
+            return json_response(filterset.errors, status=400)
+        # Some filters (fuzzy search) query the database while building the queryset
+        books = await sync_to_async(lambda: filterset.qs)()
+        if not shape:
+            books = book_values(books)
+
+        if isinstance(paginator, KeysetPagination):
+            try:
+                page = await sync_to_async(paginator.paginate_queryset)(books, query)
+            except NotFound as e:
+                return json_response({"detail": e.detail}, status=404)
+            return json_response(paginator.get_paginated_response(book_page(page, shape)).data)
+
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            page = 0
+        count = await books.acount()
+        if page < 1 or (page - 1) * page_size >= max(count, 1):
+            return json_response({"detail": "Invalid page."}, status=404)
+
+        start = (page - 1) * page_size
+        rows = book_page([book async for book in books[start:start + page_size]], shape)
+        url = request.build_absolute_uri()
+        previous = None
+        if page > 1:
+            previous = remove_query_param(url, 'page') if page == 2 else replace_query_param(url, 'page', page - 1)
+        return json_response({
+            'count': count,
+            'next': replace_query_param(url, 'page', page + 1) if start + page_size < count else None,
+            'previous': previous,
+            'results': rows,
+        })
+
+    async def post(self, request):
+        user, error = await self.authorize(request, role='admin')
+        if error:
+            return error
+        serializer = BookSerializer(data=parse_json(request))
+        if not await sync_to_async(serializer.is_valid)():
+            return json_response(serializer.errors, status=400)
+        await sync_to_async(BookService.create_book)(**serializer.validated_data)
+        return json_response(serializer.data, status=201)
+
+
+class AsyncBookDetailView(AsyncAPIView):
+    @acache_catalogue_response
+    async def get(self, request, book_id):
+        book = await BookRepository.get_queryset(read_alias()).filter(id=book_id).afirst()
+        if book is None:
+            return HttpResponse(status=404)
+        return json_response(BookSerializer(book).data)
+
+    async def put(self, request, book_id):
+        user, error = await self.authorize(request, role='admin')
+        if error:
+            return error
+        book = await BookRepository.get_queryset().filter(id=book_id).afirst()
+        if book is None:
+            return HttpResponse(status=404)
+        serializer = BookSerializer(book, data=parse_json(request))
+        if not await sync_to_async(serializer.is_valid)():
+            return json_response(serializer.errors, status=400)
+        try:
+            book = await sync_to_async(BookService.update_book)(book_id, **serializer.validated_data)
+        except ValueError as e:
+            return json_response({"detail": str(e)}, status=400)
+        return json_response(BookSerializer(book).data)
+
+    async def delete(self, request, book_id):
+        user, error = await self.authorize(request, role='admin')
+        if error:
+            return error
+        if await sync_to_async(BookService.delete_book)(book_id):
+            return HttpResponse(status=204)
+        return HttpResponse(status=404)
+
+
+class AsyncBorrowBookView(AsyncAPIView):
+    async def post(self, request, book_id):
+        user, error = await self.authorize(request, role='user')
+        if error:
+            return error
+        try:
+            loan = await sync_to_async(LoanService.borrow_book)(user, book_id)
+        except Book.DoesNotExist as e:
+            return json_response({"detail": str(e)}, status=404)
+        except PermissionDenied as e:
+            return json_response({"detail": str(e)}, status=403)
+        if loan:
+            return json_response(LoanSerializer(loan).data, status=201)
+        return json_response({"detail": "Book not available."}, status=400)
+
+
+class AsyncReturnBookView(AsyncAPIView):
+    async def post(self, request, book_id):
+        user, error = await self.authorize(request, role='user')
+        if error:
+            return error
+        loan = await sync_to_async(LoanService.return_book)(user, book_id)
+        if loan:
+            return json_response(LoanSerializer(loan).data)
+        return json_response({"detail": "No active loan found for this book."}, status=400)
@@ -1,12 +1,22 @@
+import json
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from drf_yasg.utils import swagger_auto_schema
 from ..serializers.user_serializers import UserRegistrationSerializer
+from ..authentication import ClaimsRefreshToken
+from ..utils.hashing import run_in_hashing_pool, verify_password
+
+User = get_user_model()
 
 class UserRegistrationView(APIView):
     permission_classes = [AllowAny]
@@ -23,7 +33,7 @@ class UserRegistrationView(APIView):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)  # Generate JWT token
+            refresh = ClaimsRefreshToken.for_user(user)  # Generate JWT token
             return Response({
                 "user": UserRegistrationSerializer(user).data,
                 "refresh": str(refresh),
@@ -32,6 +42,8 @@ class UserRegistrationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
     def validate(self, attrs):
         data = super().validate(attrs)
         data['user'] = UserRegistrationSerializer(self.user).data
@@ -49,4 +61,36 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         }
     )
     def post(self, request, *args, **kwargs):
-        return super().post(request, *args, **kwargs)
\ No newline at end of file
+        return super().post(request, *args, **kwargs)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    # Same contract as CustomTokenObtainPairView, but password hashing runs in the bounded
+    # hashing pool so the worker keeps serving other requests while a login is verified.
+    async def post(self, request):
+        try:
+            credentials = json.loads(request.body or b'{}')
+            username, password = str(credentials['username']), str(credentials['password'])
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({"detail": "Username and password are required."}, status=400)
+
+        user = await User.objects.filter(username=username).afirst()
+        if user is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            await run_in_hashing_pool(make_password, password)
+            is_correct, upgraded = False, None
+        else:
+            is_correct, upgraded = await run_in_hashing_pool(verify_password, password, user.password)
+        if not is_correct or not user.is_active:
+            return JsonResponse({"detail": "No active account found with the given credentials"}, status=401)
+
+        if upgraded:
+            # Same transparent rehash as ModelBackend on the synchronous login
+            user.password = upgraded
+            await User.objects.filter(pk=user.pk).aupdate(password=upgraded)
+        refresh = ClaimsRefreshToken.for_user(user)
+        return JsonResponse({
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+            "user": UserRegistrationSerializer(user).data,
+        })
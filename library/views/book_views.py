@@ -4,18 +4,27 @@ from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
-from ..services.book_service import BookService
+from rest_framework.parsers import MultiPartParser
+from ..services.book_service import EXPORT_COLUMNS, BookService
 from ..serializers.book_serializers import BookSerializer
+from ..serializers.sparse import sparse_fieldset
+from ..serializers.fast import book_rows, book_values
 from ..filters import BookFilter
+from ..pagination import BookKeysetPagination, get_paginator
 from ..permissions import IsAdminUser
 from rest_framework.permissions import AllowAny
 from ..utils.swagger_decorators import hide_from_docs_yasg
+from ..utils.book_import import IMPORT_FORMATS, detect_format, iter_rows
+from ..utils.export import EXPORT_FORMATS, export_response
+from ..utils.response_cache import cache_catalogue_response, catalogue_cache_stats, get_catalogue_version
+from drf_yasg import openapi
 
 class BookListCreateView(APIView):
     permission_classes = [AllowAny]
     filter_backends = [DjangoFilterBackend]
     filterset_class = BookFilter
     pagination_class = PageNumberPagination
+    keyset_pagination_class = BookKeysetPagination
     ordering = ['id'] 
     
     # @swagger_auto_schema(
@@ -26,13 +35,22 @@ class BookListCreateView(APIView):
         dev_description="List all books",
         dev_response={200: BookSerializer(many=True)}
     )
+    @cache_catalogue_response
     def get(self, request):
-        books = BookService.get_all_books()
+        shape = sparse_fieldset(request)
+        paginator = get_paginator(self, request)
+        books = BookSerializer(**shape).optimize_queryset(
+            BookService.get_all_books(), always=getattr(paginator, 'ordering', ())
+        )
         filtered_books = DjangoFilterBackend().filter_queryset(request, books, self)
-        paginator = self.pagination_class()
-        page = paginator.paginate_queryset(filtered_books, request)
-        serializer = BookSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        if shape:
+            page = paginator.paginate_queryset(filtered_books, request)
+            data = BookSerializer(page, many=True, **shape).data
+        else:
+            # Default shape: rows straight from values(), identical to BookSerializer output
+            page = paginator.paginate_queryset(book_values(filtered_books), request)
+            data = book_rows(page)
+        return paginator.get_paginated_response(data)
 
     @swagger_auto_schema(
         operation_description="Create a new book",
@@ -56,8 +74,9 @@ class BookDetailView(APIView):
     
     @swagger_auto_schema(
         operation_description="Retrieve a book by ID",
-        responses={200: BookSerializer, 404: "Not Found"}
+        responses={200: BookSerializer, 304: "Not Modified", 404: "Not Found"}
     )
+    @cache_catalogue_response
     def get(self, request, book_id):
         book = BookService.get_book_by_id(book_id)
         if book:
@@ -78,8 +97,11 @@ class BookDetailView(APIView):
         if book:
             serializer = BookSerializer(book, data=request.data)
             if serializer.is_valid():
-                BookService.update_book(book_id, **serializer.validated_data)
-                return Response(serializer.data)
+                try:
+                    book = BookService.update_book(book_id, **serializer.validated_data)
+                except ValueError as e:
+                    return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                return Response(BookSerializer(book).data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -93,4 +115,56 @@ class BookDetailView(APIView):
         
         if BookService.delete_book(book_id):
             return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+class BookImportView(APIView):
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_description="Bulk import books from a CSV or JSONL file, upserting on ISBN",
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter('file_format', openapi.IN_FORM, type=openapi.TYPE_STRING, enum=list(IMPORT_FORMATS)),
+        ],
+        responses={200: "Import report with per-row errors", 400: "Bad Request"}
+    )
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "No file uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response({"detail": f"Unsupported format '{file_format}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = BookService.import_books(iter_rows(upload.file, file_format))
+        return Response(report, status=status.HTTP_200_OK)
+
+class BookExportView(APIView):
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BookFilter
+
+    @swagger_auto_schema(
+        operation_description="Stream the catalogue as CSV or NDJSON, honouring the book list filters",
+        manual_parameters=[
+            openapi.Parameter('export_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+        ],
+        responses={200: "Streamed export file", 400: "Bad Request"}
+    )
+    def get(self, request):
+        file_format = request.query_params.get('export_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response({"detail": f"Unsupported format '{file_format}'."}, status=status.HTTP_400_BAD_REQUEST)
+        books = DjangoFilterBackend().filter_queryset(request, BookService.get_all_books(), self)
+        return export_response(books, EXPORT_COLUMNS, file_format, 'books')
+
+class CatalogueCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Catalogue response cache hit/miss counters for this worker process",
+        responses={200: "Cache statistics"}
+    )
+    def get(self, request):
+        return Response({'version': get_catalogue_version(), **catalogue_cache_stats.snapshot()})
\ No newline at end of file
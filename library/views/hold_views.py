@@ -0,0 +1,86 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from drf_yasg.utils import swagger_auto_schema
+from ..services.hold_service import HoldService
+from ..serializers.hold_serializers import HoldSerializer
+from ..permissions import IsAdminUser, IsRegisteredUser
+from ..models import Book
+
+class PlaceHoldView(APIView):
+    permission_classes = [IsRegisteredUser]  # Only registered users can place holds
+
+    @swagger_auto_schema(
+        operation_description="Join the queue for a book that has no copy available. Returned copies are "
+                              "lent to the first holder automatically; poll the hold for its position.",
+        responses={201: HoldSerializer, 200: "Already holding this book", 400: "Book is available", 404: "Book not found"}
+    )
+    def post(self, request, book_id):
+        try:
+            hold, created = HoldService.place_hold(request.user, book_id)
+        except Book.DoesNotExist as e:
+            return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(HoldSerializer(hold).data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+class HoldListView(APIView):
+    permission_classes = [IsRegisteredUser]
+
+    @swagger_auto_schema(
+        operation_description="List your waiting holds with their queue positions",
+        responses={200: HoldSerializer(many=True)}
+    )
+    def get(self, request):
+        return Response(HoldSerializer(HoldService.get_user_holds(request.user), many=True).data)
+
+class HoldDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_hold(self, request, hold_id):
+        # Holders see their own holds, admins see all of them
+        hold = HoldService.get_hold(hold_id)
+        if hold and (hold.user_id == request.user.id or request.user.role == 'admin'):
+            return hold
+        return None
+
+    @swagger_auto_schema(
+        operation_description="Retrieve a hold and its position in the queue",
+        responses={200: HoldSerializer, 404: "Not Found"}
+    )
+    def get(self, request, hold_id):
+        hold = self.get_hold(request, hold_id)
+        if hold:
+            return Response(HoldSerializer(hold).data)
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    @swagger_auto_schema(
+        operation_description="Change the priority tier of a hold (Admin only)",
+        request_body=HoldSerializer,
+        responses={200: HoldSerializer, 400: "Bad Request", 404: "Not Found"}
+    )
+    def patch(self, request, hold_id):
+        self.permission_classes = [IsAdminUser]
+        self.check_permissions(request)
+
+        hold = self.get_hold(request, hold_id)
+        if hold:
+            serializer = HoldSerializer(hold, data=request.data, partial=True)
+            if serializer.is_valid():
+                hold = HoldService.set_priority(hold, serializer.validated_data.get('priority', hold.priority))
+                return Response(HoldSerializer(hold).data)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    @swagger_auto_schema(
+        operation_description="Cancel a waiting hold",
+        responses={204: "No Content", 400: "Hold is no longer waiting", 404: "Not Found"}
+    )
+    def delete(self, request, hold_id):
+        hold = self.get_hold(request, hold_id)
+        if not hold:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if HoldService.cancel_hold(hold):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({"detail": "Hold is no longer waiting."}, status=status.HTTP_400_BAD_REQUEST)
@@ -1,29 +1,38 @@
+from django.core.exceptions import PermissionDenied
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
-from ..services.loan_service import LoanService
-from ..serializers.loan_serializers import LoanSerializer, LoanCreateSerializer
+from ..services.loan_service import EXPORT_COLUMNS, LoanService
+from ..serializers.loan_serializers import LoanSerializer
+from ..serializers.sparse import sparse_fieldset
+from ..serializers.fast import loan_rows, loan_values
 from ..filters import LoanFilter
+from ..pagination import LoanKeysetPagination, get_paginator
 from ..permissions import IsAdminUser, IsRegisteredUser
+from ..models import Book
+from ..utils.export import EXPORT_FORMATS, export_response
+from drf_yasg import openapi
 
 class BorrowBookView(APIView):
     permission_classes = [IsRegisteredUser]  # Only registered users can borrow books
 
     @swagger_auto_schema(
         operation_description="Borrow a book",
-        responses={201: LoanSerializer, 400: "Book not available"}
+        responses={201: LoanSerializer, 400: "Book not available", 403: "Refused by the borrowing policy", 404: "Book not found"}
     )
     def post(self, request, book_id):
-        serializer = LoanCreateSerializer(data={}, context={'book_id': book_id})
-        if serializer.is_valid():
+        try:
             loan = LoanService.borrow_book(request.user, book_id)
-            if loan:
-                return Response(LoanSerializer(loan).data, status=status.HTTP_201_CREATED)
-            return Response({"detail": "Book not available."}, status=status.HTTP_400_BAD_REQUEST)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        except Book.DoesNotExist as e:
+            return Response({"detail": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PermissionDenied as e:
+            return Response({"detail": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        if loan:
+            return Response(LoanSerializer(loan).data, status=status.HTTP_201_CREATED)
+        return Response({"detail": "Book not available."}, status=status.HTTP_400_BAD_REQUEST)
 
 class ReturnBookView(APIView):
     permission_classes = [IsRegisteredUser]  # Only registered users can return books
@@ -43,6 +52,7 @@ class LoanListView(APIView):
     filter_backends = [DjangoFilterBackend]
     filterset_class = LoanFilter
     pagination_class = PageNumberPagination 
+    keyset_pagination_class = LoanKeysetPagination
 
 
     @swagger_auto_schema(
@@ -50,9 +60,53 @@ class LoanListView(APIView):
         responses={200: LoanSerializer(many=True)}
     )
     def get(self, request):
-        loans = LoanService.get_all_loans()
-        filtered_loans = DjangoFilterBackend().filter_queryset(request, loans, self)
+        shape = sparse_fieldset(request)
+        paginator = get_paginator(self, request)
+        loans = LoanSerializer(**shape).optimize_queryset(
+            LoanService.get_all_loans(), always=getattr(paginator, 'ordering', ())
+        )
+        backend = DjangoFilterBackend()
+        filtered_loans = backend.filter_queryset(request, loans, self)
+        filterset = backend.get_filterset(request, loans, self)
+        if filterset.is_valid() and LoanService.needs_archive(filterset.form.cleaned_data):
+            return self.list_with_archive(request, shape, filtered_loans)
+        if shape:
+            page = paginator.paginate_queryset(filtered_loans, request)
+            data = LoanSerializer(page, many=True, **shape).data
+        else:
+            # Default shape: rows straight from values(), identical to LoanSerializer output
+            page = paginator.paginate_queryset(loan_values(filtered_loans), request)
+            data = loan_rows(page)
+        return paginator.get_paginated_response(data)
+
+    def list_with_archive(self, request, shape, filtered_loans):
+        # Live and archived loans are paged together by page number; cursors cannot seek in a UNION
         paginator = self.pagination_class()
-        page = paginator.paginate_queryset(filtered_loans, request)
-        serializer = LoanSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
+        archived = LoanFilter(
+            request.query_params, queryset=LoanSerializer(**shape).optimize_queryset(LoanService.get_archived_loans())
+        ).qs
+        page = paginator.paginate_queryset(LoanService.get_loan_history(filtered_loans, archived), request)
+        if shape:
+            data = LoanSerializer(LoanService.fetch_history_page(page, filtered_loans, archived), many=True, **shape).data
+        else:
+            data = loan_rows(LoanService.fetch_history_page(page, loan_values(filtered_loans), loan_values(archived)))
+        return paginator.get_paginated_response(data)
+
+class LoanExportView(APIView):
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = LoanFilter
+
+    @swagger_auto_schema(
+        operation_description="Stream the loan history as CSV or NDJSON, honouring the loan list filters",
+        manual_parameters=[
+            openapi.Parameter('export_format', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(EXPORT_FORMATS)),
+        ],
+        responses={200: "Streamed export file", 400: "Bad Request"}
+    )
+    def get(self, request):
+        file_format = request.query_params.get('export_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response({"detail": f"Unsupported format '{file_format}'."}, status=status.HTTP_400_BAD_REQUEST)
+        loans = DjangoFilterBackend().filter_queryset(request, LoanService.get_all_loans(), self)
+        return export_response(loans, EXPORT_COLUMNS, file_format, 'loans')
\ No newline at end of file
@@ -0,0 +1,19 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from ..utils.metrics import render_metrics
+
+
+class MetricsView(View):
+    # Prometheus scrape endpoint, behind "Authorization: Bearer <METRICS_TOKEN>". It lists every
+    # view with its latency and query profile, so without a token it is only open under DEBUG.
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        if not token:
+            if not settings.DEBUG:
+                return HttpResponse(status=403)
+        elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401)
+        return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
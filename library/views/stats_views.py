@@ -0,0 +1,73 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from ..services.stats_service import StatsService
+from ..serializers.stats_serializers import StatsQuerySerializer
+from ..permissions import IsAdminUser
+
+# The stats views answer from rollup tables and counters, never from raw loans; see StatsService
+
+RANGE_PARAMETERS = [
+    openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+    openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+]
+LIMIT_PARAMETER = openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER)
+
+class DailyLoanStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Loans borrowed and returned per day, the last 30 days by default (Admin only)",
+        manual_parameters=RANGE_PARAMETERS,
+        responses={200: "Daily loan counts", 400: "Bad Request"}
+    )
+    def get(self, request):
+        query = StatsQuerySerializer(data=request.query_params)
+        if query.is_valid():
+            start, end = query.validated_data['start'], query.validated_data['end']
+            days = list(StatsService.get_daily_loans(start, end))
+            return Response({
+                'start': start,
+                'end': end,
+                'borrowed': sum(day['borrowed'] for day in days),
+                'returned': sum(day['returned'] for day in days),
+                'days': days,
+            })
+        return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class MostBorrowedBooksView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="The most borrowed books in a date range, the last 30 days by default (Admin only)",
+        manual_parameters=RANGE_PARAMETERS + [LIMIT_PARAMETER],
+        responses={200: "Books with their borrow counts", 400: "Bad Request"}
+    )
+    def get(self, request):
+        query = StatsQuerySerializer(data=request.query_params)
+        if query.is_valid():
+            start, end = query.validated_data['start'], query.validated_data['end']
+            books = [
+                {'id': row['book_id'], 'title': row['book__title'], 'author': row['book__author'],
+                 'isbn': row['book__isbn'], 'borrowed': row['borrowed']}
+                for row in StatsService.get_most_borrowed_books(start, end, query.validated_data['limit'])
+            ]
+            return Response({'start': start, 'end': end, 'results': books})
+        return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ActiveBorrowersView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Users with the most books on loan right now (Admin only)",
+        manual_parameters=[LIMIT_PARAMETER],
+        responses={200: "Users with their active loan counts", 400: "Bad Request"}
+    )
+    def get(self, request):
+        query = StatsQuerySerializer(data=request.query_params)
+        if query.is_valid():
+            users = StatsService.get_most_active_borrowers(query.validated_data['limit'])
+            return Response({'results': list(users)})
+        return Response(query.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -4,24 +4,43 @@ from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from ..services.user_service import UserService
 from ..serializers.user_serializers import (
-    UserSerializer, UserUpdateSerializer, UserProfileSerializer
+    UserSerializer, UserUpdateSerializer, UserProfileSerializer,
+    UserBulkCreateSerializer, UserBulkActionSerializer, UserBulkRoleSerializer
 )
 from ..permissions import IsAdminUser, IsRegisteredUser
+from ..filters import UserFilter
+from ..pagination import UserKeysetPagination
+from ..serializers.sparse import sparse_fieldset
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
 
 class UserListView(APIView):
     permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = UserFilter
+    pagination_class = UserKeysetPagination
 
     @swagger_auto_schema(
-        operation_description="Retrieve a list of all users (Admin only)",
+        operation_description="Retrieve a page of users, ordered by id (Admin only)",
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('include_count', openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN),
+        ],
         responses={200: UserSerializer(many=True)}
     )
     def get(self, request):
-        users = UserService.get_all_users()
-        serializer = UserSerializer(users, many=True)
-        return Response({
-            'message': 'Users retrieved successfully',
-            'data': serializer.data
-        })
+        shape = sparse_fieldset(request)
+        paginator = self.pagination_class()
+        # Only the serialized columns are read; address, profile_picture etc. stay in the database
+        users = UserService.get_all_users().only(*UserSerializer.Meta.fields)
+        users = UserSerializer(**shape).optimize_queryset(users, always=paginator.ordering)
+        filtered_users = DjangoFilterBackend().filter_queryset(request, users, self)
+        page = paginator.paginate_queryset(filtered_users, request)
+        serializer = UserSerializer(page, many=True, **shape)
+        response = paginator.get_paginated_response(serializer.data)
+        response.data = {'message': 'Users retrieved successfully', **response.data}
+        return response
 
 class UserDetailView(APIView):
     permission_classes = [IsAdminUser]
@@ -50,10 +69,10 @@ class UserDetailView(APIView):
         if user:
             serializer = UserUpdateSerializer(user, data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                user = UserService.update_user(user_id, **serializer.validated_data)
                 return Response({
                     'message': 'User updated successfully',
-                    'data': serializer.data
+                    'data': UserUpdateSerializer(user).data
                 })
             return Response({'message': 'Bad request', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'message': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -125,4 +144,80 @@ class UserReactivateView(APIView):
     def post(self, request, user_id):
         if UserService.reactivate_user(user_id):
             return Response({"detail": "User reactivated successfully."}, status=status.HTTP_200_OK)
-        return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+
+class UserBulkCreateView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Create many users at once, with an outcome per item (Admin only)",
+        request_body=UserBulkCreateSerializer,
+        responses={200: "Per-item outcomes", 400: "Bad Request"}
+    )
+    def post(self, request):
+        serializer = UserBulkCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({'message': 'Bad request', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            report = UserService.bulk_create_users(serializer.validated_data['users'])
+        except ValueError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'message': 'Bulk create completed', 'data': report})
+
+class UserBulkActionView(APIView):
+    # Subclasses declare the change applied to the users selected by ids or by UserFilter params:
+    # fixed field values in `changes`, plus fields taken from the request in `change_fields`
+    permission_classes = [IsAdminUser]
+    serializer_class = UserBulkActionSerializer
+    changes = {}
+    change_fields = ()
+    success_message = None
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response({'message': 'Bad request', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        changes = {**self.changes, **{field: data[field] for field in self.change_fields}}
+        try:
+            report = UserService.bulk_update_users(changes, data.get('ids'), data.get('filters'))
+        except ValueError as e:
+            return Response({'message': 'Bad request', 'errors': e.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'message': self.success_message, 'data': report})
+
+class UserBulkDeactivateView(UserBulkActionView):
+    changes = {'is_active': False}
+    success_message = 'Users deactivated successfully'
+
+    @swagger_auto_schema(
+        operation_description="Deactivate users by ids or filters (Admin only)",
+        request_body=UserBulkActionSerializer,
+        responses={200: "Per-id outcomes", 400: "Bad Request"}
+    )
+    def post(self, request):
+        return super().post(request)
+
+class UserBulkReactivateView(UserBulkActionView):
+    changes = {'is_active': True}
+    success_message = 'Users reactivated successfully'
+
+    @swagger_auto_schema(
+        operation_description="Reactivate users by ids or filters (Admin only)",
+        request_body=UserBulkActionSerializer,
+        responses={200: "Per-id outcomes", 400: "Bad Request"}
+    )
+    def post(self, request):
+        return super().post(request)
+
+class UserBulkRoleView(UserBulkActionView):
+    serializer_class = UserBulkRoleSerializer
+    change_fields = ('role',)
+    success_message = 'User roles updated successfully'
+
+    @swagger_auto_schema(
+        operation_description="Change the role of users by ids or filters (Admin only)",
+        request_body=UserBulkRoleSerializer,
+        responses={200: "Per-id outcomes", 400: "Bad Request"}
+    )
+    def post(self, request):
+        return super().post(request)
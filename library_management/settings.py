@@ -28,7 +28,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = env('SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = env('DEBUG')
+DEBUG = env.bool('DEBUG', default=False)
 
 ALLOWED_HOSTS = []
 
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'library',
     'django_extensions',
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'library.middleware.RequestMetricsMiddleware',  # First, so its wall time covers the others
+    'library.middleware.PrimaryPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,6 +97,110 @@ DATABASES = {
     }
 }
 
+# Read replicas
+# Comma-separated database URLs. Catalogue, loan listing, export and stats reads go to one of them;
+# everything else, and any request that writes, stays on the primary. See library.routers.
+DATABASE_REPLICAS = []
+for _number, _url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    # Tests run against the primary alone
+    DATABASES[f'replica_{_number}'] = {**dj_database_url.parse(_url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{_number}')
+DATABASE_ROUTERS = ['library.routers.PrimaryReplicaRouter']
+# Seconds a write may take to reach the replicas. Clients that wrote, and catalogue pages rendered
+# after a catalogue change, read from the primary for this long.
+DATABASE_REPLICA_LAG = env.int('DATABASE_REPLICA_LAG', default=5)
+
+# Cache
+# LocMem by default; point CACHE_URL at Redis (redis://host:6379/0) to share the
+# catalogue cache and its version counter between workers.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://library'),
+}
+
+CATALOGUE_CACHE_ALIAS = 'default'
+CATALOGUE_CACHE_TIMEOUT = env.int('CATALOGUE_CACHE_TIMEOUT', default=300)
+
+# Password hashing
+# The preferred hasher encodes new passwords; the others only verify existing hashes, which are
+# re-encoded on the next successful login. Costs are tunable per deployment, see library.hashers.
+
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='argon2')
+_PASSWORD_HASHER_CLASSES = {
+    'argon2': 'library.hashers.ConfigurableArgon2PasswordHasher',
+    'scrypt': 'library.hashers.ConfigurableScryptPasswordHasher',
+    'pbkdf2': 'library.hashers.ConfigurablePBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=19456)  # KiB
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=1)
+SCRYPT_WORK_FACTOR = env.int('SCRYPT_WORK_FACTOR', default=2 ** 14)
+SCRYPT_BLOCK_SIZE = env.int('SCRYPT_BLOCK_SIZE', default=8)
+SCRYPT_PARALLELISM = env.int('SCRYPT_PARALLELISM', default=1)
+PBKDF2_ITERATIONS = env.int('PBKDF2_ITERATIONS', default=870000)
+
+# Threads that hash passwords for the async views; bounds the CPU a burst of logins can take
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=2)
+
+# Loan history
+# archive_loans moves loans returned longer ago than this out of library_loan
+
+LOAN_ARCHIVE_AFTER_MONTHS = env.int('LOAN_ARCHIVE_AFTER_MONTHS', default=12)
+
+# Borrowing policy
+# Checked by LoanService.borrow_book, see library.policies. Roles missing from MAX_ACTIVE_LOANS
+# have no limit; only accounts in BORROWING_ACCOUNT_STATUSES may borrow.
+
+MAX_ACTIVE_LOANS = {
+    'user': env.int('MAX_ACTIVE_LOANS', default=5),
+}
+BORROWING_ACCOUNT_STATUSES = env.list('BORROWING_ACCOUNT_STATUSES', default=['active'])
+BLOCK_BORROWING_WHEN_OVERDUE = env.bool('BLOCK_BORROWING_WHEN_OVERDUE', default=True)
+
+# Due dates and overdue notices
+# New loans are due after LOAN_PERIOD_DAYS. The run_worker command scans for loans that went
+# overdue every OVERDUE_SCAN_INTERVAL seconds and emails their borrowers, one job per notice,
+# EMAIL_BATCH_SIZE messages per connection and on average at most EMAIL_RATE_LIMIT messages per
+# second (0: no limit).
+
+LOAN_PERIOD_DAYS = env.int('LOAN_PERIOD_DAYS', default=21)
+OVERDUE_SCAN_INTERVAL = env.int('OVERDUE_SCAN_INTERVAL', default=3600)
+JOB_MAX_ATTEMPTS = env.int('JOB_MAX_ATTEMPTS', default=5)
+
+EMAIL_CONFIG = env.email_url('EMAIL_URL', default='consolemail://')
+vars().update(EMAIL_CONFIG)
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='library@localhost')
+EMAIL_BATCH_SIZE = env.int('EMAIL_BATCH_SIZE', default=50)
+EMAIL_RATE_LIMIT = env.float('EMAIL_RATE_LIMIT', default=10)
+
+# Circulation stats
+# run_worker refreshes the rollups behind /api/stats/ every STATS_ROLLUP_INTERVAL seconds
+
+STATS_ROLLUP_INTERVAL = env.int('STATS_ROLLUP_INTERVAL', default=300)
+
+# Request metrics
+# Per-view query counts and timings are scraped from /metrics; queries slower than the threshold
+# are logged to library.slow_queries with their SQL and the service method that issued them.
+# /metrics needs METRICS_TOKEN as a bearer token; unless DEBUG is on, it is closed while unset.
+
+SLOW_QUERY_THRESHOLD_MS = env.float('SLOW_QUERY_THRESHOLD_MS', default=200)
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'library.slow_queries': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -143,12 +250,16 @@ AUTH_USER_MODEL = 'library.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'library.authentication.ClaimsJWTAuthentication',
         
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'library.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
@@ -160,6 +271,9 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# How long each process trusts its last check that a user's token claims are still current
+AUTH_CLAIMS_CACHE_TTL = env.int('AUTH_CLAIMS_CACHE_TTL', default=5)
+
 
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {